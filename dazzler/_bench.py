@@ -0,0 +1,229 @@
+"""
+Micro benchmarks of the serialization hot paths on synthetic data.
+
+The results are json so the runs of different versions can be compared.
+"""
+import inspect
+import platform
+import statistics
+import time
+import typing
+
+from .system import (
+    Page, Requirement, Trigger, coerce_binding
+)
+from .system._binding import hydrate
+from .system._component import prepare_aspects
+from ._version import __version__
+
+# Minimum seconds of a measure when calibrating the number of calls.
+MIN_MEASURE_TIME = 0.2
+
+
+def _core():
+    # Imported on use, the components are generated.
+    from .components import core
+    return core
+
+
+def _deep_tree(depth: int = 100):
+    core = _core()
+    tree = core.Container('leaf', identity='leaf')
+    for i in range(depth):
+        tree = core.Container(tree, identity=f'deep-{i}', class_name='deep')
+    return tree
+
+
+def _wide_tree(width: int = 1000):
+    core = _core()
+    return core.Container([
+        core.Container(
+            f'item {i}',
+            identity=f'wide-{i}',
+            style={'color': 'red', 'padding': i},
+        )
+        for i in range(width)
+    ], identity='wide')
+
+
+def _page(count: int = 200):
+    core = _core()
+    page = Page(
+        __name__,
+        core.Container([
+            core.Container(identity=f'component-{i}') for i in range(count)
+        ]),
+        url='/bench',
+    )
+
+    async def handler(_):
+        pass
+
+    for i in range(count):
+        page.bind(
+            f'clicks@component-{i}', f'children@component-{i + 1}'
+        )(handler)
+        page.tie(f'children@component-{i}', f'title@component-{i + 1}')
+    return page
+
+
+def _requirements(count: int = 500):
+    return [
+        Requirement(
+            internal=f'/static/file-{i}.{"js" if i % 2 else "css"}',
+            external=f'https://cdn.example.com/file-{i}',
+            package='bench',
+            integrity='sha384-bench',
+        ) for i in range(count)
+    ]
+
+
+def prepare_deep():
+    tree = _deep_tree()
+    # pylint: disable=protected-access
+    return tree._prepare
+
+
+def prepare_wide():
+    tree = _wide_tree()
+    # pylint: disable=protected-access
+    return tree._prepare
+
+
+def prepare_aspects_wide():
+    aspects = {
+        'children': [_wide_tree(10) for _ in range(50)],
+        'data': [{'x': i, 'y': [i] * 10} for i in range(500)],
+        'style': {f'key-{i}': i for i in range(100)},
+    }
+    return lambda: prepare_aspects(aspects)
+
+
+def hydrate_payload():
+    # pylint: disable=protected-access
+    payload = {
+        'value': _wide_tree()._prepare(),
+        'states': [
+            {'identity': f'state-{i}', 'value': [i, {'x': i}]}
+            for i in range(200)
+        ],
+    }
+    return lambda: hydrate(payload)
+
+
+def page_prepare():
+    page = _page()
+    return lambda: page.prepare(None)
+
+
+def requirement_prepare():
+    requirements = _requirements()
+    return lambda: [x.prepare(external=True) for x in requirements]
+
+
+def coerce_bindings():
+    keys = [f'value@input-{i}' for i in range(500)]
+    return lambda: coerce_binding(keys, Trigger)
+
+
+#: Benchmark name: setup function returning the function to measure.
+BENCHMARKS: typing.Dict[str, typing.Callable[[], typing.Callable]] = {
+    'prepare_deep': prepare_deep,
+    'prepare_wide': prepare_wide,
+    'prepare_aspects_wide': prepare_aspects_wide,
+    'hydrate': hydrate_payload,
+    'page_prepare': page_prepare,
+    'requirement_prepare': requirement_prepare,
+    'coerce_binding': coerce_bindings,
+}
+
+
+async def _time(func: typing.Callable, number: int, is_async: bool):
+    start = time.perf_counter()
+    if is_async:
+        for _ in range(number):
+            await func()
+    else:
+        for _ in range(number):
+            func()
+    return time.perf_counter() - start
+
+
+async def measure(func: typing.Callable, number: int = 0, repeat: int = 5):
+    """
+    Measure the time of a call to the function.
+
+    :param func: Function to measure, can return an awaitable.
+    :param number: Number of calls per measure, 0 to calibrate so a measure
+        takes at least 0.2 seconds.
+    :param repeat: Number of measures.
+    :return: The statistics of a call in microseconds.
+    """
+    # Warm up and detect the coroutines.
+    result = func()
+    is_async = inspect.isawaitable(result)
+    if is_async:
+        await result
+
+    if not number:
+        number = 1
+        while await _time(func, number, is_async) < MIN_MEASURE_TIME:
+            number *= 2
+    times = [
+        await _time(func, number, is_async) / number * 1_000_000
+        for _ in range(repeat)
+    ]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': round(min(times), 3),
+        'median': round(statistics.median(times), 3),
+        'mean': round(statistics.mean(times), 3),
+        'max': round(max(times), 3),
+    }
+
+
+async def run_benchmarks(
+    names: typing.Sequence[str] = (),
+    number: int = 0,
+    repeat: int = 5,
+) -> dict:
+    """
+    Run the benchmarks.
+
+    :param names: Benchmarks to run, all by default.
+    :param number: Number of calls per measure, 0 to calibrate.
+    :param repeat: Number of measures.
+    :return: The results with the versions.
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        results[name] = await measure(BENCHMARKS[name](), number, repeat)
+    return {
+        'dazzler': __version__,
+        'python': platform.python_version(),
+        'benchmarks': results,
+    }
+
+
+def compare_results(
+    previous: dict,
+    current: dict,
+    threshold: float = 0.1,
+) -> typing.List[typing.Tuple[str, float, bool]]:
+    """
+    Compare the minimum times of the benchmarks of two runs.
+
+    :param previous: Results of the previous run.
+    :param current: Results of the current run.
+    :param threshold: Ratio slower than the previous to be a regression.
+    :return: Name, ratio of the current to the previous and regressed.
+    """
+    comparison = []
+    for name, result in current['benchmarks'].items():
+        before = previous['benchmarks'].get(name)
+        if not before or not before['min']:
+            continue
+        ratio = result['min'] / before['min']
+        comparison.append((name, ratio, ratio > 1 + threshold))
+    return comparison
@@ -21,6 +21,50 @@ class DazzlerConfig(Config):
         auto_global=True,
     )
 
+    workers = ConfigProperty(
+        default=0,
+        comment='Number of processes to start, the workers share the '
+                'listening socket of the master and are restarted if they '
+                'crash. 0 to run the application in the main process.',
+        config_type=int,
+        auto_global=True,
+    )
+
+    pid_file = ConfigProperty(
+        default='',
+        comment='File to write the pid of the workers master process, '
+                'used by the restart command.',
+        config_type=str,
+    )
+
+    drain_timeout = ConfigProperty(
+        default=30.0,
+        comment='Seconds to let the running bindings finish when a worker '
+                'is stopped before closing the websockets.',
+        config_type=float,
+    )
+
+    unix_socket = ConfigProperty(
+        default='',
+        comment='Path of a unix socket to listen on instead of host/port.',
+        config_type=str,
+    )
+
+    socket_activation = ConfigProperty(
+        default=False,
+        comment='Listen on the sockets passed by systemd socket activation '
+                'instead of host/port.',
+        config_type=bool,
+    )
+
+    server_timing = ConfigProperty(
+        default=False,
+        comment='Add a Server-Timing header to the responses of the pages '
+                'with the durations of the middlewares, layout, '
+                'serialization and bindings.',
+        config_type=bool,
+    )
+
     port_range = ConfigProperty(
         default=False,
         comment='Try to open the server starting from port until success.',
@@ -67,6 +111,30 @@ class DazzlerConfig(Config):
         config_type=str,
     )
 
+    page_cache_size = ConfigProperty(
+        default=1000,
+        comment='Maximum number of prepared page payloads to keep in memory.',
+        config_type=int,
+    )
+
+    class Json(Nestable):
+        library = ConfigProperty(
+            default='json',
+            comment='Library to encode the responses, websocket messages '
+                    'and sessions: "json", "orjson" or "auto" to use '
+                    'orjson if installed. orjson encodes NaN and Infinity '
+                    'as null and rejects the integers larger than 64 bits.'
+        )
+        large_payload = ConfigProperty(
+            default=1048576,
+            config_type=int,
+            comment='Estimated size in bytes of a payload above which it is '
+                    'encoded in chunks, letting other connections run '
+                    'between the chunks. 0 to disable.'
+        )
+
+    json: Json
+
     class Session(Nestable):
         enable = ConfigProperty(
             config_type=bool,
@@ -99,6 +167,38 @@ class DazzlerConfig(Config):
                     'after this number of seconds. (Default=7 days)',
             default=604800
         )
+        workers = ConfigProperty(
+            config_type=int,
+            comment='Number of tasks running the session operations, the '
+                    'operations of a session always run in order on the '
+                    'same task. Match the backend connection pool size.',
+            default=10,
+        )
+        cache = ConfigProperty(
+            config_type=bool,
+            comment='Load the session data once per request or websocket '
+                    'connection and buffer the writes.',
+            default=False,
+        )
+        flush_delay = ConfigProperty(
+            config_type=float,
+            comment='Seconds to buffer the session writes before saving '
+                    'them, they are also saved at the end of the request. '
+                    '0 to save every write.',
+            default=0.1,
+        )
+        cache_duration = ConfigProperty(
+            config_type=float,
+            comment='Seconds before the cached session data is loaded '
+                    'again, for the changes made by other processes.',
+            default=1.0,
+        )
+        expire_refresh = ConfigProperty(
+            config_type=float,
+            comment='Minimum seconds between the refreshes of a session '
+                    'expiration by the reads. (Redis)',
+            default=60.0,
+        )
 
     session: Session
 
@@ -169,9 +269,156 @@ class DazzlerConfig(Config):
             config_type=float,
             comment='Interval at which to send ping data.'
         )
+        reconnect_jitter = ConfigProperty(
+            default=2.0,
+            config_type=float,
+            comment='Maximum random delay in seconds before the clients '
+                    'reconnect after a graceful restart, spread the '
+                    'reconnections over the new workers.'
+        )
+        inline_page = ConfigProperty(
+            default=False,
+            config_type=bool,
+            comment='Include the page layout, bindings and requirements in '
+                    'the index document instead of fetching them with '
+                    'another request.'
+        )
 
     renderer: Renderer
 
+    class Bindings(Nestable):
+        batch_window = ConfigProperty(
+            default=0.0,
+            config_type=float,
+            comment='Delay in seconds to wait for more set_aspect calls from '
+                    'a binding before sending them as a single message.'
+        )
+        outbox_size = ConfigProperty(
+            default=1000,
+            config_type=int,
+            comment='Maximum number of messages waiting to be sent on a '
+                    'websocket, bindings waits when it is full. Pending '
+                    'updates of the same component are merged.'
+        )
+        outbox_delta_aspects = ConfigProperty(
+            default=[
+                'append', 'prepend', 'concat', 'insert', 'delete_index',
+                'delete_identity',
+            ],
+            config_type=list,
+            comment='Aspects changing the current value of a component like '
+                    'ListBox.append, the pending updates setting them are '
+                    'never merged.'
+        )
+        codecs = ConfigProperty(
+            default=['json'],
+            config_type=list,
+            comment='Websocket codecs to negotiate with the renderer in '
+                    'order of preference, json is always available as the '
+                    'fallback. Add "msgpack" for binary messages, requires '
+                    '"pip install dazzler[msgpack]".'
+        )
+
+    bindings: Bindings
+
+    class Broadcast(Nestable):
+        backend = ConfigProperty(
+            default='',
+            comment='Share app.broadcast between the processes of the '
+                    'application. Choices: Redis, PostgreSQL, Memory '
+                    '(single process)',
+            config_type=str,
+        )
+        channel = ConfigProperty(
+            default='dazzler_broadcast',
+            comment='Name of the pub/sub channel.',
+            config_type=str,
+        )
+
+    broadcast: Broadcast
+
+    class Metrics(Nestable):
+        enable = ConfigProperty(
+            default=False,
+            comment='Serve the metrics of the server, bindings, websockets '
+                    'and sessions on /dazzler/metrics in the Prometheus '
+                    'text format.',
+            config_type=bool,
+        )
+
+    metrics: Metrics
+
+    class Profiler(Nestable):
+        sample_rate = ConfigProperty(
+            default=0.0,
+            comment='Fraction of the bindings executions to profile, '
+                    '0 to disable. The profiles are dumped on SIGUSR1 and '
+                    'when the application stops.',
+            config_type=float,
+        )
+        signal_sample_rate = ConfigProperty(
+            default=0.01,
+            comment='Fraction of the bindings executions to profile when '
+                    'the profiling is enabled with SIGUSR2.',
+            config_type=float,
+        )
+        mode = ConfigProperty(
+            default='cprofile',
+            comment='"cprofile" to dump pstats files or "sampling" to dump '
+                    'collapsed stacks for flame graphs.',
+            config_type=str,
+        )
+        interval = ConfigProperty(
+            default=0.005,
+            comment='Seconds between the stack samples of sampling mode.',
+            config_type=float,
+        )
+        output_directory = ConfigProperty(
+            default='profiles',
+            comment='Directory to write the profiles of the bindings in.',
+            config_type=str,
+        )
+
+    profiler: Profiler
+
+    class Watchdog(Nestable):
+        enable = ConfigProperty(
+            default=False,
+            comment='Watch the event loop from a thread, log and count the '
+                    'stalls with the stack and the running binding, '
+                    'middleware or route.',
+            config_type=bool,
+        )
+        threshold = ConfigProperty(
+            default=0.1,
+            comment='Seconds the event loop can be blocked before a stall '
+                    'is reported.',
+            config_type=float,
+        )
+        interval = ConfigProperty(
+            default=0.02,
+            comment='Seconds between the event loop heartbeats.',
+            config_type=float,
+        )
+
+    watchdog: Watchdog
+
+    class Tracing(Nestable):
+        enable = ConfigProperty(
+            default=False,
+            comment='Record spans of the requests, middlewares, bindings, '
+                    'session operations, get_aspect and set_aspect in the '
+                    'Chrome trace event format.',
+            config_type=bool,
+        )
+        output_directory = ConfigProperty(
+            default='traces',
+            comment='Directory to write the trace file of each process in.',
+            config_type=str,
+        )
+
+    tracing: Tracing
+
     class Authentication(Nestable):
         enable = ConfigProperty(
             default=False,
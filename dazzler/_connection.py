@@ -0,0 +1,216 @@
+"""Bindings websocket connection of a page."""
+import asyncio
+import functools
+import sys
+import time
+
+import aiohttp
+from aiohttp import web
+
+from .system import Page, UNDEFINED
+from .system._codecs import WebsocketCodec
+from .system._limiter import TriggerLimiter
+from .system._outbox import Outbox
+
+
+class Connection:
+    """
+    Handle the messages of a bindings websocket.
+
+    Runs the triggered bindings with their concurrency policy and answers
+    their ``get-aspect`` and storage requests.
+    """
+    def __init__(
+        self,
+        server,
+        request: web.Request,
+        page: Page,
+        websocket: web.WebSocketResponse,
+        codec: WebsocketCodec,
+    ):
+        """
+        :param server: The server of the application.
+        :type server: dazzler._server.Server
+        :param request: The websocket request.
+        :param page: The page connected to.
+        :param websocket: The prepared websocket.
+        :param codec: The negotiated codec.
+        """
+        self.server = server
+        self.request = request
+        self.page = page
+        self.websocket = websocket
+        config = server.dazzler.config
+        self.outbox = Outbox(
+            websocket, config.bindings.outbox_size, codec,
+            config.bindings.outbox_delta_aspects,
+        )
+        self.limiter = TriggerLimiter()
+        #: Running tasks of the connection.
+        self.pendings = []
+        self._request_queue = asyncio.Queue()
+        # Running binding task by trigger key.
+        self._running = {}
+        # Queues of the bindings waiting for an answer by request id.
+        self._requests = {}
+        self._done = asyncio.Event()
+
+    async def run(self):
+        """Handle the messages until the websocket is closed."""
+        self.create_task(self._request_loop())
+        self.create_task(self.outbox.run())
+        if self.server.dazzler.config.renderer.ping:
+            self.create_task(self._pong())
+
+        try:
+            async for msg in self.websocket:  # type: aiohttp.WSMessage
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    # The renderer may always send json text messages.
+                    # noinspection PyNoneFunctionAssignment
+                    await self.handle_message(
+                        msg.json(loads=self.server.dazzler.json.loads)
+                    )
+                elif msg.type == aiohttp.WSMsgType.BINARY:
+                    await self.handle_message(
+                        self.outbox.codec.loads(msg.data)
+                    )
+                else:
+                    self.server.logger.debug(
+                        f'No handler for msg type: {msg.type}'
+                    )
+        finally:
+            self._done.set()
+            self.limiter.cancel()
+            for pending in list(self.pendings):
+                pending.cancel()
+
+    async def handle_message(self, data: dict):
+        """
+        Handle a message received from the renderer.
+
+        :param data: The decoded message.
+        :return:
+        """
+        kind = data.get('kind')
+        if kind == 'binding':
+            self.dispatch_binding(data)
+        elif kind == 'get-aspect':
+            value = data.get('value', UNDEFINED)
+            queue = self._requests.pop(data['request_id'])
+            if value is UNDEFINED:
+                await queue.put((UNDEFINED, data.get('error')))
+            else:
+                await queue.put((value, UNDEFINED))
+        elif kind == 'get-storage':
+            value = data.get('value', UNDEFINED)
+            queue = self._requests.pop(data['request_id'])
+            await queue.put((value, UNDEFINED))
+
+    def dispatch_binding(self, data: dict):
+        """
+        Submit a triggered binding to the limiter of it's trigger.
+
+        :param data: The binding message.
+        :return:
+        """
+        dazzler = self.server.dazzler
+        binding = self.page.get_binding(data['key']) \
+            or dazzler.header.get_binding(data['key']) \
+            or dazzler.footer.get_binding(data['key'])
+
+        trigger = binding.get_trigger(data['key'])
+        key = f'{data["trigger"]["aspect"]}@{data["trigger"]["identity"]}'
+        self.limiter.submit(
+            key,
+            trigger.interval if trigger else 0,
+            functools.partial(self.call_binding, binding, data, key)
+        )
+
+    def call_binding(self, binding, data: dict, key: str):
+        """
+        Start a binding task according to the concurrency of the binding.
+
+        :param binding: The binding to call.
+        :param data: The binding message.
+        :param key: Key of the trigger.
+        :return:
+        """
+        concurrency = binding.concurrency
+        previous = self._running.get(key)
+        if previous is not None and concurrency != 'parallel':
+            if concurrency == 'drop':
+                return
+            if concurrency == 'latest':
+                previous.cancel()
+
+        coroutine = binding(
+            self.request, data, self.websocket, self._request_queue,
+            self.create_task, self.outbox,
+        )
+        if previous is not None and concurrency == 'queue':
+            coroutine = self._run_after(previous, coroutine)
+
+        task = self.create_task(coroutine)
+        task.add_done_callback(functools.partial(
+            self._observe_binding, data['key'], time.perf_counter()
+        ))
+        self.server.binding_tasks.add(task)
+        if concurrency != 'parallel':
+            self._running[key] = task
+            task.add_done_callback(functools.partial(self._release, key))
+
+    def create_task(self, coroutine) -> asyncio.Task:
+        """
+        Create a task cancelled when the connection is closed.
+
+        :param coroutine: The coroutine to run.
+        :return:
+        """
+        task = self.server.loop.create_task(coroutine)
+        self.pendings.append(task)
+        task.add_done_callback(self._task_done)
+        return task
+
+    def _task_done(self, task: asyncio.Task):
+        self.pendings.remove(task)
+        if not task.cancelled():
+            exception = task.exception()
+
+            if exception:
+                task.print_stack(file=sys.stderr)
+                self.server.logger.error(exception)
+
+    @staticmethod
+    async def _run_after(previous: asyncio.Task, coroutine):
+        try:
+            await asyncio.wait([previous])
+        except asyncio.CancelledError:
+            coroutine.close()
+            raise
+        return await coroutine
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._running.get(key) is task:
+            del self._running[key]
+
+    def _observe_binding(self, key: str, start: float, task: asyncio.Task):
+        if task.cancelled():
+            return
+        metrics = self.server.dazzler.metrics
+        if task.exception():
+            metrics.binding_errors.inc(key)
+        metrics.binding_duration.observe(time.perf_counter() - start, key)
+
+    async def _request_loop(self):
+        while not self._done.is_set():
+            req = await self._request_queue.get()
+            if req['kind'] in ('get-aspect', 'get-storage'):
+                self._requests[req['request_id']] = req.pop('queue')
+            await self.outbox.put(req)
+
+    async def _pong(self):
+        while not self._done.is_set():
+            await asyncio.sleep(
+                self.server.dazzler.config.renderer.ping_interval
+            )
+            await self.outbox.put({'kind': 'ping'})
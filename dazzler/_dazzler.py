@@ -3,6 +3,7 @@ import importlib
 import itertools
 import json
 import shutil
+import signal
 import sys
 import asyncio
 import os
@@ -19,6 +20,11 @@ from .tools import get_member
 from .system.session import (
     SessionMiddleware, FileSessionBackEnd
 )
+from .system.broadcast import BroadcastBus, MemoryBroadcastBus
+from .system.metrics import Metrics
+from .system._profiler import BindingProfiler
+from .system._watchdog import LoopWatchdog
+from .system._tracing import Tracer
 from .system import (
     Package,
     generate_components,
@@ -30,7 +36,8 @@ from .system import (
     Route,
     RouteMethod,
 )
-from .contrib import redis, postgresql
+from .system._json import JsonSerializer
+from .contrib import redis, postgresql, postgresql_broadcast
 from .electron import (
     ElectronBuilder, run_electron, is_compiled, ELECTRON_TARGETS
 )
@@ -39,10 +46,14 @@ from ._server import Server
 from ._version import __version__
 from .errors import (
     PageConflictError, ServerStartedError, SessionError, AuthError,
-    NoInstanceFoundError
+    NoInstanceFoundError, BroadcastError, WorkerError
 )
 from ._assets import assets_path
 from ._reloader import start_reloader
+from ._workers import run_workers, notify_ready
+from ._sockets import get_listen_sockets
+from ._loadtest import LoadTest, format_report
+from ._bench import BENCHMARKS, run_benchmarks, compare_results
 
 
 class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
@@ -54,6 +65,7 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
         - ``dazzler --application app``, start an application.
         - ``dazzler generate path/to/components output_dir``
         - ``dazzler copy-requirements -p dazzler_core -p dazzler_extra``
+        - ``dazzler restart``, gracefully restart the workers.
     """
     config: DazzlerConfig
     config_class = DazzlerConfig
@@ -69,6 +81,10 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
             '--reloaded',
             action='store_true'
         ),
+        precept.Argument(
+            '--worker',
+            action='store_true'
+        ),
     ]
     server: Server
     auth: typing.Optional[DazzlerAuth]
@@ -102,6 +118,10 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
 
         self.requirements: typing.List[Requirement] = []
         self.middlewares: typing.List[Middleware] = []
+        self.metrics = Metrics()
+        self.profiler = BindingProfiler(self)
+        self.watchdog = LoopWatchdog(self)
+        self.tracer = Tracer(self)
         self.server = Server(self, loop=self.loop)
         self.pages = {}
         self.stop_event = asyncio.Event()
@@ -114,6 +134,8 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
         self.auth = None
         self.header = PagePart()
         self.footer = PagePart()
+        self.json = JsonSerializer()
+        self.broadcast_bus: typing.Optional[BroadcastBus] = None
 
     def add_page(self, *pages: Page):
         if self._started:
@@ -129,9 +151,46 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
                     raise PageConflictError(f'Duplicate page url: {page}')
             self.pages[page.name] = page
 
+    async def broadcast(
+        self,
+        identity: typing.Union[str, typing.Pattern],
+        page: typing.Union[str, Page] = None,
+        **aspects
+    ) -> int:
+        """
+        Set aspects of a component on every connected client.
+
+        The update is encoded once and sent to all the websockets, the
+        other processes of the application receive it through the
+        broadcast bus (``broadcast.backend`` config).
+
+        :param identity: Identity of the component to update, a compiled
+            regex to update all the matching components.
+        :param page: Only update the clients of this page.
+        :param aspects: The aspects to set on the component.
+        :return: The number of clients updated in this process.
+        """
+        return await self.server.broadcast(identity, page, **aspects)
+
     async def stop(self):
-        if self.server.site:
-            await self.server.site.stop()
+        if self.server.runner:
+            for site in list(self.server.runner.sites):
+                await site.stop()
+        self.stop_event.set()
+
+    async def shutdown(self):
+        """
+        Gracefully stop the server.
+
+        Stop accepting on the sockets shared with the other workers, let the
+        running bindings finish for ``drain_timeout`` seconds and tell the
+        clients to reconnect, then close the connections, run the shutdown
+        handlers and dispatch ``DAZZLER_STOP``.
+        """
+        if self.server.runner:
+            self.server.stop_listening()
+            await self.server.drain(self.config.drain_timeout)
+            await self.server.runner.cleanup()
         self.stop_event.set()
 
     # pylint: disable=arguments-differ
@@ -142,6 +201,7 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
             debug=False,
             reload=False,
             reloaded=False,
+            worker=False,
             start_event=None,
             **kwargs
     ):
@@ -173,6 +233,10 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
 
         reloader = None
 
+        if app.config.workers and not worker and not reload:
+            await run_workers(app)
+            return
+
         if reload:
             app.config.development.reload = True
             reloader = self.loop.create_task(
@@ -182,12 +246,26 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
         if not reload or (reload and reloaded):
             if debug:
                 app.config.debug = debug
-            await app.setup_server(debug=app.config.debug)
+            await app.setup_server(
+                debug=app.config.debug, copy_requirements=not worker
+            )
 
             await app.server.start(
                 app.config.host, app.config.port,
+                path=app.config.unix_socket or None,
+                sockets=get_listen_sockets(app.config.socket_activation),
             )
 
+        if worker:
+            stop = asyncio.Event()
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                self.loop.add_signal_handler(sig, stop.set)
+            notify_ready()
+            if blocking:
+                await stop.wait()
+                await app.shutdown()
+            return
+
         # Test needs it to run without loop
         # Otherwise the server closes when the event loop ends.
         if blocking and not reloader:
@@ -201,11 +279,27 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
             # Maybe add something later here.
             await asyncio.sleep(100)
 
-    async def setup_server(self, debug=False):
+    async def setup_server(self, debug=False, copy_requirements=True):
+        self.json = JsonSerializer(
+            self.config.json.library, self.config.json.large_payload
+        )
+        self.profiler.sample_rate = self.config.profiler.sample_rate
+        self.profiler.mode = self.config.profiler.mode
+        self.profiler.interval = self.config.profiler.interval
+        self.profiler.output_directory = \
+            self.config.profiler.output_directory
+        self.profiler.signal_sample_rate = \
+            self.config.profiler.signal_sample_rate
+        self.watchdog.enable = self.config.watchdog.enable
+        self.watchdog.threshold = self.config.watchdog.threshold
+        self.watchdog.interval = self.config.watchdog.interval
+        self.tracer.enable = self.config.tracing.enable
+        self.tracer.output_directory = self.config.tracing.output_directory
         await self._handle_configs()
 
-        # Copy all requirements to make sure all is latest.
-        await self.copy_requirements()
+        if copy_requirements:
+            # Copy all requirements to make sure all is latest.
+            await self.copy_requirements()
 
         await self.events.dispatch(DAZZLER_SETUP, application=self)
 
@@ -250,6 +344,8 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
             debug=debug,
         )
 
+        await self.server.prepare_cache()
+
         self._prepared = True
         self.server.app.on_startup.append(self._on_startup)
         self.server.app.on_shutdown.append(self._on_shutdown)
@@ -382,6 +478,133 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
         )
         await asyncio.gather(*futures)
 
+    @precept.Command(
+        description='Gracefully restart the workers of a running '
+                    'application, the pid of the master process is read '
+                    'from the pid_file config.'
+    )
+    async def restart(self):
+        if not self.config.pid_file \
+                or not os.path.exists(self.config.pid_file):
+            raise WorkerError(
+                'No workers pid file found, set the pid_file config and '
+                'start the application with --workers.'
+            )
+        with open(self.config.pid_file) as f:
+            pid = int(f.read().strip())
+        self.logger.info(f'Restarting workers of {pid}')
+        os.kill(pid, signal.SIGHUP)
+
+    @precept.Command(
+        precept.Argument('page', help='Name of the page to load.'),
+        precept.Argument(
+            '--url',
+            help='Url of the running application, '
+                 'default to the host and port configs.',
+        ),
+        precept.Argument(
+            '-c', '--clients', type=int, default=10,
+            help='Number of simulated clients.',
+        ),
+        precept.Argument(
+            '-d', '--duration', type=float, default=10.0,
+            help='Seconds to send the triggers for.',
+        ),
+        precept.Argument(
+            '--think', type=float, default=0.0,
+            help='Seconds to wait between the triggers of a client.',
+        ),
+        precept.Argument(
+            '--timeout', type=float, default=5.0,
+            help='Seconds to wait for the response of a binding.',
+        ),
+        precept.Argument(
+            '-t', '--triggers', nargs='+',
+            help='Keys of the triggers to replay (aspect@identity), '
+                 'all the page triggers by default.',
+        ),
+        precept.Argument(
+            '--json', action='store_true', dest='as_json',
+            help='Output the results as json.',
+        ),
+        description='Load test the bindings of a page of a running '
+                    'application with simulated websocket clients.'
+    )
+    async def loadtest(
+        self, page, url, clients, duration, think, timeout, triggers,
+        as_json,
+    ):
+        stats = await LoadTest(
+            url or f'http://{self.config.host}:{self.config.port}',
+            page,
+            clients=clients,
+            duration=duration,
+            think=think,
+            timeout=timeout,
+            triggers=triggers or (),
+        ).run()
+        report = stats.report()
+        if as_json:
+            print(self.json.dumps(report))
+        else:
+            print(format_report(report))
+
+    @precept.Command(
+        precept.Argument(
+            '-b', '--benchmarks', nargs='+', choices=list(BENCHMARKS),
+            help='Benchmarks to run, all by default.',
+        ),
+        precept.Argument(
+            '-n', '--number', type=int, default=0,
+            help='Number of calls per measure, calibrated by default.',
+        ),
+        precept.Argument(
+            '-r', '--repeat', type=int, default=5,
+            help='Number of measures of each benchmark.',
+        ),
+        precept.Argument(
+            '-o', '--output',
+            help='Write the json results to this file.',
+        ),
+        precept.Argument(
+            '--compare',
+            help='Json results of a previous run to compare with, exit '
+                 'with an error if a benchmark regressed.',
+        ),
+        precept.Argument(
+            '--threshold', type=float, default=0.1,
+            help='Ratio slower than the previous run to fail the '
+                 'comparison.',
+        ),
+        description='Benchmark the serialization hot paths of the '
+                    'framework, output the results as json.'
+    )
+    async def bench(
+        self, benchmarks, number, repeat, output, compare, threshold
+    ):
+        results = await run_benchmarks(benchmarks or (), number, repeat)
+        dumped = json.dumps(results, indent=2)
+        print(dumped)
+        if output:
+            with open(output, 'w') as f:
+                f.write(dumped)
+        if not compare:
+            return
+        with open(compare) as f:
+            previous = json.load(f)
+        regressed = False
+        for name, ratio, regression in compare_results(
+                previous, results, threshold
+        ):
+            message = f'{name}: {ratio:.2f}x the previous time'
+            if regression:
+                regressed = True
+                self.logger.error(message)
+            else:
+                self.logger.info(message)
+        if regressed:
+            sys.exit(1)
+
     @precept.Command(
         precept.Argument('app'),
         description='Run the electron app locally in development.'
@@ -454,6 +677,9 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
                 self._remove_requirement(requirement)
                 deleted_files.add(requirement)
 
+        self.server.clear_index_cache()
+        self.server.clear_page_cache()
+
         if not hot:
             await self.copy_requirements()
         await self.server.send_reload(
@@ -574,6 +800,40 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
             0, SessionMiddleware(self, backend=backend)
         )
 
+    async def _enable_broadcast(self):
+        channel = self.config.broadcast.channel
+        if self.config.broadcast.backend == 'Memory':
+            self.broadcast_bus = MemoryBroadcastBus(self, channel)
+        elif self.config.broadcast.backend == 'Redis':
+            # Use the pool of the redis middleware if there is one.
+            if not any(
+                isinstance(x, redis.RedisMiddleware)
+                for x in self.middlewares
+            ):
+                self.middlewares.append(redis.RedisMiddleware(self))
+            self.broadcast_bus = redis.RedisBroadcastBus(
+                self, channel=channel
+            )
+        elif self.config.broadcast.backend == 'PostgreSQL':
+            pg_config = postgresql.PostgresConfig()
+            if os.path.exists(self.config_path):
+                pg_config.read_file(self.config_path)
+
+            if not any(
+                isinstance(x, postgresql.PostgresMiddleware)
+                for x in self.middlewares
+            ):
+                self.middlewares.append(
+                    postgresql.PostgresMiddleware(self, pg_config))
+            self.broadcast_bus = postgresql_broadcast.PostgresBroadcastBus(
+                self, pg_config, channel=channel
+            )
+        else:
+            raise BroadcastError(
+                f'Invalid broadcast backend: {self.config.broadcast.backend}'
+                '\nPlease choose from "Redis", "PostgreSQL", "Memory"'
+            )
+
     async def _handle_configs(self):
         # Gather pages in the pages directory
         # FIXME pages_directory support for electron
@@ -623,6 +883,9 @@ class Dazzler(precept.Precept):  # pylint: disable=too-many-instance-attributes
         if self.config.authentication.enable:
             await self._enable_auth()
 
+        if self.config.broadcast.backend and not self.broadcast_bus:
+            await self._enable_broadcast()
+
 
 def cli():
     dazzler = Dazzler('__main__')
@@ -0,0 +1,314 @@
+"""
+Load test a running application with simulated websocket clients.
+
+The clients speak the bindings protocol directly, they replay the triggers
+of a page and answer the ``get-aspect`` & ``get-storage`` requests with the
+aspects values of the page layout.
+"""
+import asyncio
+import json
+import numbers
+import random
+import time
+import typing
+import uuid
+
+from aiohttp import client, WSMsgType
+
+from .errors import LoadTestError
+from .system._page import collect_aspects
+
+# Name of the resident memory metric.
+MEMORY_METRIC = 'process_resident_memory_bytes'
+
+
+def percentile(values: typing.Sequence[float], rank: float) -> float:
+    """
+    Nearest rank percentile.
+
+    :param values: Sorted values.
+    :param rank: The percentile between 0 and 100.
+    :return:
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(rank / 100 * len(values)) - 1))
+    return values[index]
+
+
+class LoadStats:
+    """Results of a load test."""
+    def __init__(self):
+        self.sent = 0
+        self.received = 0
+        self.bindings = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.latencies: typing.List[float] = []
+        self.duration = 0.0
+        self.memory_before: typing.Optional[float] = None
+        self.memory_after: typing.Optional[float] = None
+
+    def report(self) -> dict:
+        latencies = sorted(self.latencies)
+        duration = self.duration or 1
+        return {
+            'duration': round(self.duration, 3),
+            'bindings': self.bindings,
+            'bindings_per_second': round(self.bindings / duration, 2),
+            'messages_sent': self.sent,
+            'messages_received': self.received,
+            'messages_per_second': round(
+                (self.sent + self.received) / duration, 2
+            ),
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'latency': {
+                f'p{rank}': round(percentile(latencies, rank) * 1000, 3)
+                for rank in (50, 90, 99)
+            } if latencies else {},
+            'latency_max': round(latencies[-1] * 1000, 3)
+            if latencies else 0,
+            'memory_before': self.memory_before,
+            'memory_after': self.memory_after,
+        }
+
+
+class LoadClient:
+    """A simulated browser connected to a page."""
+    def __init__(
+        self,
+        ws: client.ClientWebSocketResponse,
+        bindings: typing.List[dict],
+        aspects: dict,
+        stats: LoadStats,
+    ):
+        self.ws = ws
+        self.bindings = bindings
+        self.aspects = {k: dict(v) for k, v in aspects.items()}
+        self.storage = {'local': {}, 'session': {}}
+        self.stats = stats
+        self._response: typing.Optional[asyncio.Future] = None
+
+    async def send(self, message: dict):
+        self.stats.sent += 1
+        await self.ws.send_str(json.dumps(message))
+
+    async def trigger(self, binding: dict, timeout: float):
+        """
+        Send a binding message and wait for the first aspects update.
+
+        :param binding: Prepared binding of the page.
+        :param timeout: Seconds to wait for the update.
+        :return:
+        """
+        trigger = binding['trigger']
+        value = self.aspects.get(trigger['identity'], {}).get(
+            trigger['aspect']
+        )
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            value += 1
+        elif value is None:
+            value = 1
+        self.aspects.setdefault(trigger['identity'], {})[
+            trigger['aspect']
+        ] = value
+
+        self._response = asyncio.get_event_loop().create_future()
+        start = time.perf_counter()
+        await self.send({
+            'kind': 'binding',
+            'key': binding['key'],
+            'page': binding.get('page'),
+            'trace_id': uuid.uuid4().hex,
+            'trigger': {**trigger, 'value': value},
+            'states': [
+                {
+                    **state,
+                    'value': self.aspects.get(
+                        state['identity'], {}
+                    ).get(state['aspect']),
+                } for state in binding['states']
+            ],
+        })
+        try:
+            await asyncio.wait_for(self._response, timeout)
+            self.stats.latencies.append(time.perf_counter() - start)
+            self.stats.bindings += 1
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+        finally:
+            self._response = None
+
+    def _set_aspects(self, update: dict):
+        if update.get('regex'):
+            return
+        self.aspects.setdefault(update['identity'], {}).update(
+            update['payload']
+        )
+
+    async def receive(self):
+        """Handle the server messages until the websocket is closed."""
+        async for msg in self.ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            self.stats.received += 1
+            data = json.loads(msg.data)
+            kind = data.get('kind')
+            if kind in ('set-aspect', 'set-aspects'):
+                for update in data.get('updates', [data]):
+                    self._set_aspects(update)
+                if self._response is not None and not self._response.done():
+                    self._response.set_result(True)
+            elif kind == 'get-aspect':
+                await self.send({
+                    'kind': 'get-aspect',
+                    'request_id': data['request_id'],
+                    'value': self.aspects.get(
+                        data['identity'], {}
+                    ).get(data['aspect']),
+                })
+            elif kind == 'get-storage':
+                await self.send({
+                    'kind': 'get-storage',
+                    'request_id': data['request_id'],
+                    'value': self.storage[data['storage']].get(
+                        data['identity']
+                    ),
+                })
+            elif kind == 'set-storage':
+                self.storage[data['storage']][data['identity']] = \
+                    data['payload']
+
+
+class LoadTest:
+    """
+    Open ``clients`` websockets on a page and replay its triggers for
+    ``duration`` seconds, every client waits for the response of a binding
+    before sending the next one.
+    """
+    def __init__(
+        self,
+        url: str,
+        page: str,
+        clients: int = 10,
+        duration: float = 10.0,
+        think: float = 0.0,
+        timeout: float = 5.0,
+        triggers: typing.Sequence[str] = (),
+    ):
+        """
+        :param url: Base url of the application.
+        :param page: Name of the page to load.
+        :param clients: Number of simulated clients.
+        :param duration: Seconds to send the triggers for.
+        :param think: Seconds to wait between the triggers of a client.
+        :param timeout: Seconds to wait for the response of a binding.
+        :param triggers: Keys of the triggers to replay, all by default.
+        """
+        self.url = url.rstrip('/')
+        self.page = page
+        self.clients = clients
+        self.duration = duration
+        self.think = think
+        self.timeout = timeout
+        self.triggers = triggers
+        self.stats = LoadStats()
+
+    async def get_memory(
+        self, session: client.ClientSession
+    ) -> typing.Optional[float]:
+        """Read the server memory from the metrics if enabled."""
+        async with session.get(f'{self.url}/dazzler/metrics') as response:
+            if response.status != 200:
+                return None
+            for line in (await response.text()).splitlines():
+                if line.startswith(MEMORY_METRIC):
+                    return float(line.split()[-1])
+        return None
+
+    async def get_page(self, session: client.ClientSession):
+        """Get the bindings and the aspects of the page layout."""
+        async with session.get(f'{self.url}/dazzler/page-map') as response:
+            pages = {x['name']: x for x in await response.json()}
+        if self.page not in pages:
+            raise LoadTestError(
+                f'Page {self.page} not found, '
+                f'choose from {", ".join(pages)}'
+            )
+        async with session.post(
+                f'{self.url}{pages[self.page]["url"]}'
+        ) as response:
+            payload = await response.json()
+        bindings = [
+            {**x, 'page': self.page} for x in payload['bindings'].values()
+            if not x['regex'] and not x['call'] and (
+                not self.triggers or x['key'] in self.triggers
+            )
+        ]
+        aspects = {}
+        collect_aspects(payload['layout'], aspects)
+        return bindings, aspects
+
+    async def run_client(self, session, bindings, aspects, deadline):
+        try:
+            async with session.ws_connect(
+                    f'{self.url}/{self.page}/ws'
+            ) as ws:
+                load_client = LoadClient(ws, bindings, aspects, self.stats)
+                receiver = asyncio.ensure_future(load_client.receive())
+                try:
+                    while time.perf_counter() < deadline:
+                        await load_client.trigger(
+                            random.choice(bindings), self.timeout
+                        )
+                        if self.think:
+                            await asyncio.sleep(self.think)
+                finally:
+                    receiver.cancel()
+        except client.ClientError:
+            self.stats.errors += 1
+
+    async def run(self) -> LoadStats:
+        """Run the load test and return the stats."""
+        async with client.ClientSession() as session:
+            bindings, aspects = await self.get_page(session)
+            if not bindings:
+                raise LoadTestError(f'No trigger to replay on {self.page}')
+            self.stats.memory_before = await self.get_memory(session)
+            start = time.perf_counter()
+            deadline = start + self.duration
+            await asyncio.gather(*(
+                self.run_client(session, bindings, aspects, deadline)
+                for _ in range(self.clients)
+            ))
+            self.stats.duration = time.perf_counter() - start
+            self.stats.memory_after = await self.get_memory(session)
+        return self.stats
+
+
+def _megabytes(size: float) -> str:
+    return f'{size / 1024 / 1024:.1f} MB'
+
+
+def format_report(report: dict) -> str:
+    """Format the report of a load test for the console."""
+    lines = [
+        f'Duration: {report["duration"]}s',
+        f'Bindings: {report["bindings"]} '
+        f'({report["bindings_per_second"]}/s)',
+        f'Messages: {report["messages_sent"]} sent, '
+        f'{report["messages_received"]} received '
+        f'({report["messages_per_second"]}/s)',
+        f'Timeouts: {report["timeouts"]}, errors: {report["errors"]}',
+    ]
+    if report['latency']:
+        lines.append('Latency: ' + ', '.join(
+            f'{k}={v}ms' for k, v in report['latency'].items()
+        ) + f', max={report["latency_max"]}ms')
+    if report['memory_before'] is not None:
+        lines.append(
+            f'Server memory: {_megabytes(report["memory_before"])} -> '
+            f'{_megabytes(report["memory_after"] or 0)}'
+        )
+    return '\n'.join(lines)
@@ -114,15 +114,25 @@ async def watch(
         await asyncio.sleep(interval)
 
 
-async def run_reloaded(app, start_event):
-    run_stop = asyncio.Event()
+def get_application_path(app) -> str:
+    """
+    Get the path of the application to use with ``--application``.
 
+    :param app: The dazzler instance.
+    :type app: dazzler.Dazzler
+    :return: The importable module path of the application.
+    """
     if app.module_name == '__main__':
         # Main can't be called so get the path from the file instead.
         app_path = pathlib.Path(app.module_file).relative_to(os.getcwd())
-        app_path = str(app_path).replace('.py', '').replace(os.sep, '.')
-    else:
-        app_path = app.module_name
+        return str(app_path).replace('.py', '').replace(os.sep, '.')
+    return app.module_name
+
+
+async def run_reloaded(app, start_event):
+    run_stop = asyncio.Event()
+
+    app_path = get_application_path(app)
 
     app.logger.debug(f'Starting app in reloaded mode: {app_path}')
 
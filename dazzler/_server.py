@@ -1,20 +1,40 @@
 import asyncio
+import collections
+import hashlib
 import os
-import sys
+import socket
+import time
 from ssl import SSLContext
-from typing import Optional, List
+from typing import Optional, List, Pattern, Union
 import weakref
 
-import aiohttp
-
 from aiohttp import web, WSCloseCode
 
-from .system import Page, UNDEFINED, Route, filter_dev_requirements
+from .system import Page, Route, filter_dev_requirements
 from .system._component import prepare_aspects
+from .system._outbox import Outbox, aspects_message
+from .system._codecs import get_codecs, select_codec
+from .system._tracing import parse_traceparent
+from .system._timing import ServerTiming, server_timing, REQUEST_KEY
 
 from .tools import replace_all, format_tag, transform_dict_keys
 from ._renderer import package as renderer
 from ._assets import index_html_path
+from ._connection import Connection
+
+
+class ListenerSite(web.SockSite):
+    """
+    Site on an opened socket, it can stop accepting the new connections
+    while the accepted connections keep running.
+    """
+    def close_listener(self):
+        """
+        Stop accepting on the socket of this process, the other processes
+        sharing the socket keep accepting the pending connections.
+        """
+        if self._server is not None:
+            self._server.close()
 
 
 class Server:
@@ -27,10 +47,10 @@ class Server:
         - ``/dazzler/requirements/``
 
     """
-    runner: web.AppRunner
+    runner: Optional[web.AppRunner]
     loop: asyncio.AbstractEventLoop
     app: web.Application
-    site: Optional[web.TCPSite]
+    site: Optional[web.BaseSite]
 
     def __init__(self, dazzler, loop=None, app: web.Application = None):
         """
@@ -46,9 +66,68 @@ class Server:
             self.index = f.read()
         self.logger = self.dazzler.logger
         self.websockets = weakref.WeakSet()
+        # Running binding tasks of all the connections.
+        self.binding_tasks = weakref.WeakSet()
+        # Bindings websocket connections by page name.
+        self.connections = collections.defaultdict(weakref.WeakSet)
         self.debug = False
+        #: The server is draining, the new websockets are told to reconnect.
+        self.draining = False
         self.site = None
+        self.runner = None
         self.app['dazzler'] = dazzler
+        self._index_cache = {}
+        self._page_cache = collections.OrderedDict()
+        # Messages and bytes sent by the closed websockets by page name.
+        self._closed_counts = collections.Counter()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        metrics = self.dazzler.metrics
+
+        def by_page(value):
+            def collect():
+                return {
+                    (page,): value(page, connections)
+                    for page, connections in self.connections.items()
+                }
+            return collect
+
+        def sent(name, attribute):
+            return by_page(
+                lambda page, connections: self._closed_counts[(page, name)]
+                + sum(getattr(x.outbox, attribute) for x in connections)
+            )
+
+        metrics.gauge(
+            'dazzler_websockets',
+            'Number of connected websockets by page.',
+            ['page'],
+            collect=by_page(lambda _, connections: len(connections)),
+        )
+        metrics.counter(
+            'dazzler_websocket_messages_total',
+            'Number of messages sent on the websockets by page.',
+            ['page'],
+            collect=sent('sent', 'sent'),
+        )
+        metrics.counter(
+            'dazzler_websocket_sent_bytes_total',
+            'Size of the messages sent on the websockets by page.',
+            ['page'],
+            collect=sent('bytes', 'bytes_sent'),
+        )
+        metrics.gauge(
+            'dazzler_websocket_pending_tasks',
+            'Number of running tasks of the websockets (bindings, '
+            'outbox, requests loop) by page.',
+            ['page'],
+            collect=by_page(
+                lambda _, connections: sum(
+                    len(x.pendings) for x in connections
+                )
+            ),
+        )
 
     def setup_routes(self, routes: List[Route] = None, debug: bool = False):
         """
@@ -62,6 +141,11 @@ class Server:
         prefix = self.dazzler.config.route_prefix
         self.debug = debug
 
+        if self.dazzler.config.metrics.enable:
+            self.app.middlewares.append(self._metrics_middleware)
+        if self.dazzler.config.watchdog.enable:
+            self.app.middlewares.append(self._watchdog_middleware)
+
         # Dazzler api.
         self.app.add_routes([
             web.get(
@@ -76,7 +160,9 @@ class Server:
                 f'{prefix}/dazzler/electron-config',
                 self._apply_middleware(self.route_get_electron_config)
             ),
-        ] + [
+        ] + ([
+            web.get(f'{prefix}/dazzler/metrics', self.route_metrics),
+        ] if self.dazzler.config.metrics.enable else []) + [
             x.method.get_method()(
                 x.path, self._apply_middleware(x.handler), name=x.name
             )
@@ -108,108 +194,63 @@ class Server:
         :param page: The incoming page.
         :return:
         """
-        ws = web.WebSocketResponse()
+        codecs = get_codecs(
+            self.dazzler.config.bindings.codecs, self.dazzler.json
+        )
+        ws = web.WebSocketResponse(
+            protocols=[codec.protocol for codec in codecs]
+        )
 
         await ws.prepare(request)
+        codec = select_codec(codecs, ws.ws_protocol)
 
-        self.websockets.add(ws)
+        if self.draining:
+            # Opened on a connection accepted before the drain started.
+            await codec.send(ws, self._reconnect_message())
+            await ws.close(
+                code=WSCloseCode.GOING_AWAY, message='Server restart'
+            )
+            return ws
 
-        request_queue = asyncio.Queue()
-        pendings = []
-        aspect_requests = {}
-        storage_requests = {}
-        done = asyncio.Event()
-
-        async def request_loop():
-            while not done.is_set():
-                req = await request_queue.get()
-                kind = req['kind']
-                if kind == 'get-aspect':
-                    aspect_requests[req['request_id']] = req.pop('queue')
-                elif kind == 'get-storage':
-                    storage_requests[req['request_id']] = req.pop('queue')
-                await ws.send_json(req)
-
-        def done_callback(task: asyncio.Task):
-            pendings.remove(task)
-            if not task.cancelled():
-                exception = task.exception()
-
-                if exception:
-                    task.print_stack(file=sys.stderr)
-                    self.logger.error(exception)
-
-        def create_task(coroutine):
-            task = self.loop.create_task(coroutine)
-            pendings.append(task)
-            task.add_done_callback(done_callback)
-            return task
-
-        async def handler():
-            async for msg in ws:  # type: aiohttp.WSMessage
-                if msg.type == aiohttp.WSMsgType.TEXT:
-                    # noinspection PyNoneFunctionAssignment
-                    data = msg.json()
-                    kind = data.get('kind')
-
-                    if kind == 'binding':
-                        binding = page.get_binding(data['key'])
-                        if not binding:
-                            binding =\
-                                self.dazzler.header.get_binding(data['key']) \
-                                or self.dazzler.footer.get_binding(data['key'])
-
-                        create_task(
-                            binding(
-                                request, data, ws, request_queue, create_task
-                            )
-                        )
-
-                    elif kind == 'get-aspect':
-                        request_id = data['request_id']
-                        value = data.get('value', UNDEFINED)
-                        req = aspect_requests.pop(request_id)
-
-                        if value is UNDEFINED:
-                            await req.put((UNDEFINED, data.get('error')))
-                        else:
-                            await req.put((value, UNDEFINED))
-
-                    elif kind == 'get-storage':
-                        request_id = data['request_id']
-                        value = data.get('value', UNDEFINED)
-                        queue = storage_requests.pop(request_id)
-                        await queue.put((value, UNDEFINED))
-                else:
-                    self.logger.debug(f'No handler for msg type: {msg.type}')
-
-            done.set()
-
-        async def pong():
-            while not done.is_set():
-                await asyncio.sleep(self.dazzler.config.renderer.ping_interval)
-                await ws.send_json({'kind': 'ping'})
+        self.websockets.add(ws)
+        connection = Connection(self, request, page, ws, codec)
+        self.connections[page.name].add(connection)
 
         try:
-            ops = [handler(), request_loop()]
-            if self.dazzler.config.renderer.ping:
-                ops.append(pong())
-            await asyncio.gather(*ops)
+            await connection.run()
         finally:
-            for pending in pendings:
-                pending.cancel()
             self.websockets.discard(ws)
+            self.connections[page.name].discard(connection)
+            outbox = connection.outbox
+            self._closed_counts[(page.name, 'sent')] += outbox.sent
+            self._closed_counts[(page.name, 'bytes')] += outbox.bytes_sent
+            self.logger.debug(
+                f'Websocket closed, sent: {outbox.sent}, '
+                f'merged: {outbox.merged}, '
+                f'high water mark: {outbox.high_water_mark}, '
+                f'dropped triggers: {connection.limiter.dropped}'
+            )
 
         return ws
 
-    async def route_page(self, _: web.Request, page: Page = None):
+    def prepare_index(self, page: Page):
         """
-        Index route for a page.
+        Render the index document of a page and keep it in memory.
 
-        :param _:
-        :param page: The page to serve.
-        :return:
+        The document only depends on the page, the debug mode and the
+        ``prefer_external`` config, it is rendered once and served from
+        the cache until :py:meth:`clear_index_cache` is called.
+
+        :param page: The page to render the index for.
+        :return: The rendered index, its ETag and the position to insert
+            the inlined page payload at.
         """
+        external = self.dazzler.config.requirements.prefer_external
+        key = (page.name, self.debug, external)
+        cached = self._index_cache.get(key)
+        if cached:
+            return cached
+
         script = {
             'src': '/dazzler/requirements/static/index.js',
             'data-retries': str(self.dazzler.config.renderer.retries),
@@ -225,9 +266,7 @@ class Server:
         scripts = []
         css = []
         for requirement in renderer.get_requirements(self.debug):
-            tag = requirement.tag(
-                external=self.dazzler.config.requirements.prefer_external
-            )
+            tag = requirement.tag(external=external)
             if requirement.kind == 'js':
                 scripts.append(tag)
             elif requirement.kind == 'css':
@@ -250,19 +289,61 @@ class Server:
             header=page.html_header,
             footer=page.html_footer,
             lang=page.lang,
-        )
-        return web.Response(body=index, content_type='text/html')
+        ).encode()
+        head, _, tail = index.partition(b'%(page_payload)')
+        index = head + tail
+        etag = hashlib.sha256(index).hexdigest()
 
-    # noinspection PyMethodMayBeStatic
-    async def route_page_json(self, request: web.Request, page: Page = None):
+        cached = self._index_cache[key] = (index, etag, len(head))
+        return cached
+
+    def clear_index_cache(self):
+        """Remove the rendered index documents so they are rendered again."""
+        self._index_cache.clear()
+
+    async def route_page(self, request: web.Request, page: Page = None):
         """
-        Serve the bindings and layout associated with page.
+        Index route for a page.
 
         :param request:
-        :param page:
+        :param page: The page to serve.
         :return:
         """
-        request['page'] = page
+        index, etag, offset = self.prepare_index(page)
+        payload = None
+
+        if self.dazzler.config.renderer.inline_page:
+            request['page'] = page
+            payload, payload_etag = await self.cache_page(request, page)
+            etag = hashlib.sha256(f'{etag}{payload_etag}'.encode()).hexdigest()
+
+        if any(x.value == etag for x in request.if_none_match or ()):
+            response = web.Response(status=304)
+        else:
+            if payload is not None:
+                index = b''.join((
+                    index[:offset],
+                    b'<script type="application/json" id="dazzler-page">',
+                    # Escape the tags so the payload cannot close the script.
+                    payload.replace(b'<', b'\\u003c'),
+                    b'</script>',
+                    index[offset:],
+                ))
+            response = web.Response(
+                body=index, content_type='text/html', charset='utf-8'
+            )
+        response.etag = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    async def prepare_page(self, request: web.Request, page: Page):
+        """
+        Prepare the page payload with the app requirements, header & footer.
+
+        :param request: The request to prepare for.
+        :param page: The page to prepare.
+        :return: The prepared payload.
+        """
         prepared = await page.prepare(
             request,
             self.debug,
@@ -280,11 +361,8 @@ class Server:
             # Reload mode needs the websocket even if no binding.
             prepared['reload'] = True
 
-        for part, part_name, included in (
-            (self.dazzler.header, 'header', page.include_app_header),
-            (self.dazzler.footer, 'footer', page.include_app_footer)
-        ):
-            if not part.layout or not included:
+        for part, part_name, included in self._page_parts(page):
+            if not included:
                 continue
             p = await part.prepare(request)
             if part_name == 'header':
@@ -294,7 +372,109 @@ class Server:
             prepared['bindings'].update(p['bindings'])
             prepared['ties'] += p['ties']
 
-        return web.json_response(prepared)
+        return prepared
+
+    async def get_page_cache_key(self, request: web.Request, page: Page):
+        """
+        Get the key of the prepared page payload in the cache.
+
+        :param request: The request to get the key for.
+        :param page: The page to be prepared.
+        :return: The key or None if the payload cannot be cached.
+        """
+        key = [page.name, self.debug]
+        for part, _, included in (
+            (page, 'page', True),
+            *self._page_parts(page),
+        ):
+            if not included:
+                continue
+            part_key = await part.get_cache_key(request)
+            if part_key is None:
+                return None
+            key.append(part_key)
+        return tuple(key)
+
+    async def cache_page(self, request: web.Request, page: Page):
+        """
+        Prepare and serialize the page payload, keep it in the cache if the
+        layouts allows it.
+
+        :param request: The request to prepare for.
+        :param page: The page to prepare.
+        :return: The serialized payload and its ETag.
+        """
+        key = await self.get_page_cache_key(request, page)
+        cached = self._page_cache.get(key) if key is not None else None
+        if cached:
+            self._page_cache.move_to_end(key)
+            return cached
+
+        with server_timing(request, 'layout'):
+            prepared = await self.prepare_page(request, page)
+        with server_timing(request, 'serialize'):
+            body = await self.dazzler.json.dumpb_async(prepared)
+        cached = body, hashlib.sha256(body).hexdigest()
+
+        if key is not None:
+            self._page_cache[key] = cached
+            while len(self._page_cache) > self.dazzler.config.page_cache_size:
+                self._page_cache.popitem(last=False)
+
+        return cached
+
+    async def prepare_cache(self):
+        """
+        Render the index of every page and prepare the payload of the pages
+        that doesn't have a function layout.
+        """
+        for page in self.dazzler.pages.values():
+            self.prepare_index(page)
+            if not any(
+                callable(part.layout)
+                for part, _, included in (
+                    (page, 'page', True),
+                    *self._page_parts(page)
+                ) if included
+            ):
+                await self.cache_page(None, page)
+
+    def clear_page_cache(self):
+        """Remove the prepared page payloads so they are prepared again."""
+        self._page_cache.clear()
+
+    async def route_page_json(self, request: web.Request, page: Page = None):
+        """
+        Serve the bindings and layout associated with page.
+
+        :param request:
+        :param page:
+        :return:
+        """
+        request['page'] = page
+        body, etag = await self.cache_page(request, page)
+
+        if any(x.value == etag for x in request.if_none_match or ()):
+            response = web.Response(status=304)
+        else:
+            response = web.Response(
+                body=body, content_type='application/json'
+            )
+        response.etag = etag
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    def _page_parts(self, page: Page):
+        return (
+            (
+                self.dazzler.header, 'header',
+                bool(self.dazzler.header.layout and page.include_app_header)
+            ),
+            (
+                self.dazzler.footer, 'footer',
+                bool(self.dazzler.footer.layout and page.include_app_footer)
+            ),
+        )
 
     async def route_get_page(self, request: web.Request):
         page = request.query.get('page')
@@ -309,7 +489,7 @@ class Server:
                 'name': page_name,
                 'title': page.title,
             } for page_name, page in self.dazzler.pages.items()
-        ])
+        ], dumps=self.dazzler.json.dumps)
 
     async def route_get_electron_config(self, request: web.Request):
         config = self.dazzler.config
@@ -335,16 +515,57 @@ class Server:
                 }
                 for page in pages if page.name in windows
             ]
-        })
+        }, dumps=self.dazzler.json.dumps)
 
-    @staticmethod
-    async def route_call(request: web.Request, page: Page):
-        data = await request.json()
+    async def route_call(self, request: web.Request, page: Page):
+        data = await request.json(loads=self.dazzler.json.loads)
         binding = page.get_binding(data['key'])
-        ctx = await binding(request, data, None, None, None)
-        return web.json_response({
-            'output': prepare_aspects(ctx._output),
-        })
+        start = time.perf_counter()
+        try:
+            with server_timing(request, 'binding'):
+                ctx = await binding(request, data, None, None, None)
+        except Exception:
+            self.dazzler.metrics.binding_errors.inc(data['key'])
+            raise
+        self.dazzler.metrics.binding_duration.observe(
+            time.perf_counter() - start, data['key']
+        )
+        with server_timing(request, 'serialize'):
+            body = await self.dazzler.json.dumpb_async({
+                'output': prepare_aspects(ctx._output),
+            })
+        return web.Response(body=body, content_type='application/json')
+
+    async def route_metrics(self, _):
+        return web.Response(
+            text=self.dazzler.metrics.render(),
+            headers={'Content-Type': self.dazzler.metrics.content_type},
+        )
+
+    @web.middleware
+    async def _metrics_middleware(self, request: web.Request, handler):
+        start = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            route = request.match_info.route
+            if route.name:
+                name = route.name
+            elif route.resource is not None:
+                name = route.resource.canonical
+            else:
+                name = 'unmatched'
+            self.dazzler.metrics.request_duration.observe(
+                time.perf_counter() - start, name
+            )
+
+    @web.middleware
+    async def _watchdog_middleware(self, request: web.Request, handler):
+        route = request.match_info.route
+        name = route.name or getattr(route.resource, 'canonical', None) \
+            or 'unmatched'
+        with self.dazzler.watchdog.scope(f'route {name}'):
+            return await handler(request)
 
     async def start(
             self, host: str, port: int,
@@ -353,6 +574,8 @@ class Server:
             backlog: int = 128,
             reuse_address: Optional[bool] = None,
             reuse_port: Optional[bool] = None,
+            path: Optional[str] = None,
+            sockets: Optional[List[socket.socket]] = None,
     ):
         """
         Start the server
@@ -364,6 +587,9 @@ class Server:
         :param backlog:
         :param reuse_address:
         :param reuse_port:
+        :param path: Listen on this unix socket instead of host/port.
+        :param sockets: Listen on these already opened sockets instead of
+            host/port, eg: systemd socket activation.
         :return:
         """
         self.app.on_shutdown.append(self._on_shutdown)
@@ -371,6 +597,28 @@ class Server:
         self.runner = web.AppRunner(self.app)
         await self.runner.setup()
 
+        if sockets:
+            for sock in sockets:
+                site = ListenerSite(
+                    self.runner, sock,
+                    shutdown_timeout=shutdown_timeout,
+                    ssl_context=ssl_context, backlog=backlog,
+                )
+                await site.start()
+                self.site = self.site or site
+                self.logger.info(f'Started server {site.name}')
+            return
+
+        if path:
+            self.site = web.UnixSite(
+                self.runner, path,
+                shutdown_timeout=shutdown_timeout,
+                ssl_context=ssl_context, backlog=backlog,
+            )
+            await self.site.start()
+            self.logger.info(f'Started server {self.site.name}')
+            return
+
         started = False
         current_port = port
 
@@ -398,6 +646,66 @@ class Server:
             await ws.close(code=WSCloseCode.GOING_AWAY,
                            message='Server shutdown')
 
+    def stop_listening(self):
+        """
+        Stop accepting the new connections on the sockets inherited from the
+        workers master or systemd, the new workers accept them instead.
+
+        The connections already accepted keep running until
+        ``runner.cleanup()``.
+        """
+        if not self.runner:
+            return
+        for site in self.runner.sites:
+            if isinstance(site, ListenerSite):
+                site.close_listener()
+
+    def _reconnect_message(self) -> dict:
+        return {
+            'kind': 'reconnect',
+            'jitter': self.dazzler.config.renderer.reconnect_jitter,
+        }
+
+    async def drain(self, timeout: float):
+        """
+        Wait for the running bindings to finish then tell the clients to
+        reconnect and close the websockets.
+
+        The websockets opened while draining are told to reconnect right
+        away. Call :py:meth:`stop_listening` before to stop accepting the
+        new connections.
+
+        :param timeout: Maximum time in seconds to wait for the bindings.
+        :return:
+        """
+        self.draining = True
+        deadline = self.loop.time() + timeout
+        running = [x for x in self.binding_tasks if not x.done()]
+        while running and self.loop.time() < deadline:
+            await asyncio.wait(running, timeout=deadline - self.loop.time())
+            # Bindings can start other bindings.
+            running = [x for x in self.binding_tasks if not x.done()]
+        if running:
+            self.logger.warning(
+                f'{len(running)} bindings still running after '
+                f'{timeout} seconds, they will be cancelled.'
+            )
+
+        outboxes = self.get_outboxes()
+        message = self._reconnect_message()
+        for outbox in outboxes:
+            await outbox.put(message)
+        if outboxes:
+            await asyncio.wait(
+                [self.loop.create_task(x.join()) for x in outboxes],
+                timeout=max(deadline - self.loop.time(), 1.0)
+            )
+
+        await asyncio.gather(*(
+            ws.close(code=WSCloseCode.GOING_AWAY, message='Server restart')
+            for ws in set(self.websockets)
+        ))
+
     async def send_reload(self, filenames, hot, refresh, deleted):
         for ws in set(self.websockets):
             await ws.send_json({
@@ -406,25 +714,120 @@ class Server:
                 'hot': hot,
                 'refresh': refresh,
                 'deleted': deleted
-            })
+            }, dumps=self.dazzler.json.dumps)
+
+    async def broadcast(
+        self,
+        identity: Union[str, Pattern],
+        page: Union[str, Page] = None,
+        **aspects
+    ) -> int:
+        """
+        Set aspects of a component for every connected websocket, the
+        other processes receive it through the broadcast bus if enabled.
 
-    def _apply_middleware(self, handler):
-        if not self.dazzler.middlewares:
-            return handler
+        The connections of this process are updated before the broadcast is
+        published, an error from the bus is raised after.
 
-        async def apply(request: web.Request, *args, **kwargs):
+        :param identity: Identity of the component to update, a compiled
+            regex to update all the matching components.
+        :param page: Only update the connections to this page.
+        :param aspects: The aspects to set on the component.
+        :return: The number of connections updated in this process.
+        """
+        regex = isinstance(identity, Pattern)
+        if isinstance(page, Page):
+            page = page.name
+        message = aspects_message([{
+            'identity': identity.pattern if regex else str(identity),
+            'regex': regex,
+            'payload': prepare_aspects(aspects),
+        }])
+        # Send to the local connections first, even if the bus is down.
+        sent = await self.broadcast_message(message, page)
+        if self.dazzler.broadcast_bus:
+            await self.dazzler.broadcast_bus.publish(message, page)
+        return sent
+
+    def get_outboxes(self, page: Union[str, Page] = None) -> List[Outbox]:
+        """
+        Get the outboxes of the connected websockets.
 
-            callbacks = []
-            for middleware in self.dazzler.middlewares:
-                callback = await middleware(request)
-                if callback:
-                    callbacks.append(callback)
+        :param page: Only the connections to this page.
+        :return:
+        """
+        if page is None:
+            pages = list(self.connections.values())
+        else:
+            name = page if isinstance(page, str) else page.name
+            pages = [self.connections.get(name, ())]
+        return [x.outbox for connections in pages for x in list(connections)]
+
+    async def broadcast_message(
+        self, message: dict, page: Union[str, Page] = None
+    ) -> int:
+        """
+        Send a message to every connected websocket.
 
-            response = await handler(request, *args, **kwargs)
+        The message is encoded once for each codec in use, the encoded
+        message is queued in the outboxes of all the connections.
 
-            for callback in callbacks:
-                await callback(response)
+        :param message: The message to send.
+        :param page: Only send to the connections to this page.
+        :return: The number of connections the message was sent to.
+        """
+        outboxes = self.get_outboxes(page)
+        encoded = {}
+        puts = []
+        for outbox in outboxes:
+            codec = outbox.codec
+            if codec.name not in encoded:
+                encoded[codec.name] = await codec.encode(message)
+            puts.append(outbox.put_encoded(encoded[codec.name]))
+
+        await asyncio.gather(*puts)
+        return len(outboxes)
 
+    def _apply_middleware(self, handler):
+        timing = self.dazzler.config.server_timing
+        if not self.dazzler.middlewares and not self.dazzler.tracer.enable \
+                and not timing:
+            return handler
+
+        async def apply(request: web.Request, *args, **kwargs):
+            tracer = self.dazzler.tracer
+            start = time.perf_counter()
+            if timing:
+                request[REQUEST_KEY] = ServerTiming()
+            with tracer.span(
+                f'{request.method} {request.path}', 'http',
+                trace_id=parse_traceparent(request.headers.get('traceparent'))
+            ):
+                callbacks = []
+                watchdog = self.dazzler.watchdog
+                for middleware in self.dazzler.middlewares:
+                    name = f'middleware {middleware.__class__.__name__}'
+                    with watchdog.scope(name), \
+                            tracer.span(name, 'middleware'), \
+                            server_timing(request, middleware.timing_name):
+                        callback = await middleware(request)
+                    if callback:
+                        callbacks.append((middleware, name, callback))
+
+                response = await handler(request, *args, **kwargs)
+
+                for middleware, name, callback in callbacks:
+                    with watchdog.scope(name), \
+                            tracer.span(name, 'middleware'), \
+                            server_timing(request, middleware.timing_name):
+                        await callback(response)
+
+            if timing and not response.prepared:
+                request[REQUEST_KEY].add(
+                    'total', time.perf_counter() - start
+                )
+                response.headers['Server-Timing'] = \
+                    request[REQUEST_KEY].header()
             return response
 
         return apply
@@ -0,0 +1,136 @@
+"""
+Listening sockets opened before the server starts.
+
+- Systemd socket activation, the sockets are passed as file descriptors
+  starting at 3 with the ``LISTEN_PID`` and ``LISTEN_FDS`` environment
+  variables.
+- Sockets opened by the workers master and inherited by the workers, every
+  generation of workers accepts on the same sockets so a draining worker
+  can stop accepting without refusing the connections.
+"""
+import os
+import socket
+import stat
+import typing
+
+from .errors import ListenerError
+
+# First file descriptor passed by systemd.
+SD_LISTEN_FDS_START = 3
+# File descriptors inherited from the workers master, comma separated.
+INHERITED_FDS_ENV = 'DAZZLER_LISTEN_FDS'
+
+
+def _from_fds(fds: typing.Iterable[int]) -> typing.List[socket.socket]:
+    sockets = []
+    for fileno in fds:
+        # Family and type are detected from the file descriptor.
+        sock = socket.socket(fileno=fileno)
+        sock.setblocking(False)
+        sockets.append(sock)
+    return sockets
+
+
+def get_activation_sockets() -> typing.List[socket.socket]:
+    """
+    Get the sockets passed by systemd socket activation.
+
+    The environment variables are removed so the sockets are not
+    adopted again by a subprocess.
+
+    :return: The listening sockets, empty if not activated.
+    """
+    pid = os.environ.pop('LISTEN_PID', None)
+    count = os.environ.pop('LISTEN_FDS', None)
+    os.environ.pop('LISTEN_FDNAMES', None)
+    if not pid or not count or int(pid) != os.getpid():
+        return []
+    return _from_fds(
+        range(SD_LISTEN_FDS_START, SD_LISTEN_FDS_START + int(count))
+    )
+
+
+def get_inherited_sockets() -> typing.List[socket.socket]:
+    """
+    Get the sockets opened by the workers master.
+
+    :return: The listening sockets, empty if not started by a master.
+    """
+    fds = os.environ.pop(INHERITED_FDS_ENV, None)
+    if not fds:
+        return []
+    return _from_fds(int(x) for x in fds.split(','))
+
+
+def get_listen_sockets(socket_activation: bool = False):
+    """
+    Get the sockets to listen on, inherited from the workers master or
+    passed by systemd.
+
+    :param socket_activation: Adopt the systemd sockets.
+    :return: The listening sockets, empty to open the server sockets.
+    """
+    sockets = get_inherited_sockets()
+    if not sockets and socket_activation:
+        sockets = get_activation_sockets()
+        if not sockets:
+            raise ListenerError(
+                'socket_activation is enabled but no socket was passed, '
+                'LISTEN_FDS is not set for this process.'
+            )
+    return sockets
+
+
+def create_tcp_sockets(
+    host: str, port: int, backlog: int = 128
+) -> typing.List[socket.socket]:
+    """
+    Create the listening sockets of a host, one for every address it
+    resolves to.
+
+    :param host: Host name or address to listen on.
+    :param port: Port to listen on.
+    :param backlog: Number of pending connections to queue.
+    :return: The listening sockets.
+    """
+    infos = socket.getaddrinfo(
+        host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+    )
+    sockets = []
+    try:
+        for family, kind, proto, _, address in dict.fromkeys(infos):
+            sock = socket.socket(family, kind, proto)
+            sockets.append(sock)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if family == socket.AF_INET6:
+                # Listen on the IPv4 address with its own socket.
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 1)
+            sock.bind(address)
+            sock.listen(backlog)
+            sock.setblocking(False)
+    except OSError:
+        for sock in sockets:
+            sock.close()
+        raise
+    return sockets
+
+
+def create_unix_socket(path: str, backlog: int = 128) -> socket.socket:
+    """
+    Create a listening unix socket, replace the stale socket file
+    of a previous run.
+
+    :param path: Path of the socket file.
+    :param backlog: Number of pending connections to queue.
+    :return: The listening socket.
+    """
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
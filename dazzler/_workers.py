@@ -0,0 +1,298 @@
+"""
+Prefork mode, run the application in multiple processes sharing the
+listening sockets.
+"""
+import asyncio
+import collections
+import itertools
+import os
+import signal
+import socket
+import sys
+import typing
+
+from ._reloader import get_application_path
+from ._sockets import (
+    get_listen_sockets, create_tcp_sockets, create_unix_socket,
+    INHERITED_FDS_ENV,
+)
+from .errors import WorkerError
+
+
+# Delay before restarting a worker that exited unexpectedly.
+RESTART_DELAY = 1.0
+# The delay doubles for every failed start of a worker up to this delay.
+MAX_RESTART_DELAY = 30.0
+# Consecutive failed starts after which a worker is not restarted.
+MAX_START_FAILURES = 5
+# Time added to the drain timeout before the workers are killed.
+KILL_DELAY = 10.0
+# Environment variable with the pipe the workers write to once started.
+READY_FD_ENV = 'DAZZLER_READY_FD'
+
+
+def worker_arguments(app) -> typing.List[str]:
+    """
+    Command line arguments to start a worker of the application.
+
+    :param app: The dazzler instance.
+    :type app: dazzler.Dazzler
+    :return:
+    """
+    raw_args = app.cli.raw_args
+    if raw_args is sys.argv:
+        # Parsed from the command line, skip the program name.
+        raw_args = raw_args[1:]
+    args = [sys.executable, '-m', 'dazzler']
+    raw_args = iter(raw_args)
+    for arg in raw_args:
+        # Replaced by the arguments of the worker.
+        if arg in ('-a', '--application'):
+            next(raw_args, None)
+        elif arg != '--worker' and not arg.startswith('--application='):
+            args.append(arg)
+    return args + ['--application', get_application_path(app), '--worker']
+
+
+def notify_ready():
+    """Tell the master process the worker has started."""
+    ready_fd = os.environ.pop(READY_FD_ENV, None)
+    if ready_fd is not None:
+        os.write(int(ready_fd), b'1')
+        os.close(int(ready_fd))
+
+
+class Workers:
+    """
+    Start ``config.workers`` processes of the application accepting on the
+    same listening sockets.
+
+    - The requirements are copied once before starting the workers.
+    - The master opens the host/port, unix socket or adopts the systemd
+      sockets, the workers inherit them.
+    - The workers that exit unexpectedly are restarted, the delay doubles
+      for every failed start and a worker that fails to start
+      ``MAX_START_FAILURES`` times is not restarted.
+    - SIGTERM/SIGINT stops the workers.
+    - SIGHUP starts a new generation of workers, the previous generation
+      is stopped once the new workers are listening. The previous workers
+      stop accepting before they drain, the pending connections are
+      accepted by the new workers.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(self, app):
+        """
+        :param app: The dazzler instance.
+        """
+        self.app = app
+        self.args = worker_arguments(app)
+        self.processes: typing.Dict[
+            int, typing.Set[asyncio.subprocess.Process]
+        ] = collections.defaultdict(set)
+        self.generation = 0
+        self._generations = itertools.count(1)
+        self._supervisors: typing.List[asyncio.Task] = []
+        self._restarting = False
+        self.sockets: typing.List[socket.socket] = []
+
+    async def run(self):
+        """Run the workers until the app is stopped."""
+        config = self.app.config
+        self.sockets = get_listen_sockets(config.socket_activation)
+        unix_socket = None
+        if not self.sockets and config.unix_socket:
+            unix_socket = config.unix_socket
+            self.sockets = [create_unix_socket(unix_socket)]
+
+        if not self.sockets:
+            self.sockets = self._listen_tcp()
+
+        loop = asyncio.get_event_loop()
+        pid_file = self.app.config.pid_file
+
+        # Shared by all the workers, only need to do it once.
+        await self.app.copy_requirements()
+
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.app.stop_event.set)
+        loop.add_signal_handler(
+            signal.SIGHUP, lambda: loop.create_task(self.restart())
+        )
+        if pid_file:
+            with open(pid_file, 'w') as f:
+                f.write(str(os.getpid()))
+
+        self.app.logger.info(f'Starting {self.app.config.workers} workers.')
+        self.generation = next(self._generations)
+        try:
+            if not await self._start(self.generation):
+                raise WorkerError(
+                    'The workers failed to start, see the errors above.'
+                )
+            await self.app.stop_event.wait()
+        finally:
+            # Stop the supervisors restarting the workers.
+            self.app.stop_event.set()
+            for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                loop.remove_signal_handler(sig)
+            await self._stop(
+                itertools.chain(*self.processes.values())
+            )
+            await asyncio.gather(*self._supervisors)
+            for sock in self.sockets:
+                sock.close()
+            if unix_socket and os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            if pid_file and os.path.exists(pid_file):
+                os.remove(pid_file)
+
+    def _listen_tcp(self) -> typing.List[socket.socket]:
+        config = self.app.config
+        port = config.port
+        while True:
+            try:
+                sockets = create_tcp_sockets(config.host, port)
+            except OSError as err:
+                self.app.logger.error(err)
+                if not config.port_range:
+                    raise
+                port += 1
+            else:
+                self.app.logger.info(
+                    f'Workers listening on http://{config.host}:{port}/'
+                )
+                return sockets
+
+    async def restart(self):
+        """
+        Replace the workers by a new generation without downtime.
+
+        The new workers start accepting on the sockets before the previous
+        workers are stopped, the previous workers stop accepting, finish
+        their running bindings and tell the clients to reconnect.
+        """
+        if self._restarting:
+            self.app.logger.warning('Workers restart already in progress.')
+            return
+        self._restarting = True
+        previous = self.generation
+        try:
+            self.generation = next(self._generations)
+            self.app.logger.info(
+                f'Restarting workers, generation {self.generation}.'
+            )
+            if not await self._start(self.generation):
+                self.app.logger.error(
+                    'New workers failed to start, keeping the previous ones.'
+                )
+                failed = self.generation
+                self.generation = previous
+                await self._stop(self.processes.pop(failed, ()))
+                return
+            await self._stop(self.processes.pop(previous, ()))
+        finally:
+            self._restarting = False
+
+    def _is_current(self, generation: int) -> bool:
+        return not self.app.stop_event.is_set() \
+            and generation == self.generation
+
+    async def _start(self, generation: int) -> bool:
+        loop = asyncio.get_event_loop()
+        started = [
+            loop.create_future() for _ in range(self.app.config.workers)
+        ]
+        self._supervisors = [
+            task for task in self._supervisors if not task.done()
+        ] + [
+            loop.create_task(self._supervise(generation, ready))
+            for ready in started
+        ]
+        return all(await asyncio.gather(*started))
+
+    async def _spawn(self) -> typing.Tuple[asyncio.subprocess.Process, bool]:
+        read_fd, write_fd = os.pipe()
+        env = {**os.environ, READY_FD_ENV: str(write_fd)}
+        fds = [sock.fileno() for sock in self.sockets]
+        if fds:
+            env[INHERITED_FDS_ENV] = ','.join(str(x) for x in fds)
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.args,
+                pass_fds=(write_fd, *fds),
+                env=env,
+            )
+        finally:
+            os.close(write_fd)
+        try:
+            # Empty if the worker exited before it started.
+            ready = await self.app.executor.execute(os.read, read_fd, 1)
+        finally:
+            os.close(read_fd)
+        return proc, bool(ready)
+
+    async def _supervise(self, generation: int, ready: asyncio.Future):
+        failures = 0
+        while self._is_current(generation):
+            proc, started = await self._spawn()
+            self.processes[generation].add(proc)
+            if not ready.done():
+                ready.set_result(started)
+            if not self._is_current(generation) and proc.returncode is None:
+                # Stopped while starting.
+                proc.terminate()
+            self.app.logger.debug(
+                f'Started worker {proc.pid} generation {generation}'
+            )
+            code = await proc.wait()
+            self.processes.get(generation, set()).discard(proc)
+            if not self._is_current(generation):
+                return
+            failures = 0 if started else failures + 1
+            if failures >= MAX_START_FAILURES:
+                self.app.logger.error(
+                    f'Worker {proc.pid} exited with code {code}, it failed '
+                    f'to start {failures} times and will not be restarted.'
+                )
+                return
+            delay = min(RESTART_DELAY * 2 ** failures, MAX_RESTART_DELAY)
+            self.app.logger.error(
+                f'Worker {proc.pid} exited with code {code}, '
+                f'restarting in {delay} seconds.'
+            )
+            try:
+                await asyncio.wait_for(self.app.stop_event.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _stop(self, processes: typing.Iterable):
+        running = [p for p in processes if p.returncode is None]
+        for proc in running:
+            proc.terminate()
+        if not running:
+            return
+        loop = asyncio.get_event_loop()
+        _, pending = await asyncio.wait(
+            [loop.create_task(p.wait()) for p in running],
+            timeout=self.app.config.drain_timeout + KILL_DELAY
+        )
+        if pending:
+            self.app.logger.warning(
+                f'Killing {len(pending)} workers after timeout.'
+            )
+            for proc in running:
+                if proc.returncode is None:
+                    proc.kill()
+            await asyncio.gather(*pending)
+
+
+async def run_workers(app):
+    """
+    Run the application in ``config.workers`` processes.
+
+    :param app: The dazzler instance.
+    :type app: dazzler.Dazzler
+    :return:
+    """
+    await Workers(app).run()
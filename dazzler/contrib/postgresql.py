@@ -77,6 +77,18 @@ SET data = data - %s
 WHERE session_id = %s;
 '''
 
+_get_session_data_statement = '''
+SELECT data
+FROM ${schema}.${table}
+WHERE session_id = %s
+'''
+
+_save_session_values_statement = '''
+UPDATE ${schema}.${table}
+SET data = (data || %s::jsonb) - %s::text[]
+WHERE session_id = %s;
+'''
+
 _user_pw_select_statement = '''
 select username, password, salt
 from ${schema}.${table}
@@ -402,6 +414,16 @@ class PostgresSessionBackend(SessionBackEnd):
             schema=config.postgres.session.schema_name,
             table=config.postgres.session.table_name,
         )
+        self._get_data_statement = _sql_formatter(
+            _get_session_data_statement,
+            schema=config.postgres.session.schema_name,
+            table=config.postgres.session.table_name,
+        )
+        self._save_values_statement = _sql_formatter(
+            _save_session_values_statement,
+            schema=config.postgres.session.schema_name,
+            table=config.postgres.session.table_name,
+        )
         app.events.subscribe(DAZZLER_SETUP, self._setup)
 
     async def _setup(self, _):
@@ -447,7 +469,7 @@ class PostgresSessionBackend(SessionBackEnd):
                         self._update_statement,
                         [
                             [key],
-                            self._json(value),
+                            self._json(value, dumps=self.app.json.dumps),
                             session_id
                         ]
                     )
@@ -487,6 +509,39 @@ class PostgresSessionBackend(SessionBackEnd):
                     self.app.logger.exception(err)
                     raise err
 
+    async def load_all(self, session_id: str) -> dict:
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(
+                        self._get_data_statement,
+                        [session_id]
+                    )
+                    value = await cursor.fetchone()
+                    return value[0] if value else {}
+                except Exception as err:
+                    self.app.logger.exception(err)
+                    raise err
+
+    async def save_many(
+            self, session_id: str, values: dict, deleted: typing.List[str]
+    ):
+        # Merge the keys in a single update, the other keys are kept.
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(
+                        self._save_values_statement,
+                        [
+                            self._json(values, dumps=self.app.json.dumps),
+                            list(deleted),
+                            session_id
+                        ]
+                    )
+                except Exception as err:
+                    self.app.logger.exception(err)
+                    raise err
+
     async def on_new_session(self, session_id: str):
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cursor:
@@ -0,0 +1,75 @@
+"""
+Broadcast bus with PostgreSQL ``LISTEN``/``NOTIFY``.
+
+:Configuration:
+    .. code-block:: toml
+
+        [broadcast]
+        backend = 'PostgreSQL'
+"""
+from dazzler.errors import BroadcastError
+from dazzler.system.broadcast import BroadcastBus
+
+from .postgresql import PostgresConfig, _get_pool_from_app
+
+#: PostgreSQL rejects the notification payloads of this size or longer.
+NOTIFY_MAX_SIZE = 8000
+
+
+class PostgresBroadcastBus(BroadcastBus):
+    """
+    Broadcast bus with PostgreSQL ``LISTEN``/``NOTIFY``.
+
+    A dedicated connection listen on the channel, the notifications are
+    sent with the pool. PostgreSQL limits the notifications to 8000 bytes,
+    larger broadcasts raise a :py:class:`~dazzler.errors.BroadcastError`.
+
+    :type pool: aiopg.Pool
+    """
+    def __init__(
+        self,
+        app,
+        config: PostgresConfig = None,
+        pool=None,
+        channel: str = 'dazzler_broadcast',
+    ):
+        super().__init__(app, channel)
+        if not config:
+            config = PostgresConfig()
+            if app.config_path:
+                config.read_file(app.config_path)
+        self.config = config
+        self.pool = pool
+        self._connection = None
+
+    async def subscribe(self):
+        import aiopg
+        if not self.pool:
+            self.pool = await _get_pool_from_app(self.app, self.config)
+        self._connection = await aiopg.connect(dsn=self.config.postgres.dsn)
+        async with self._connection.cursor() as cursor:
+            await cursor.execute(f'LISTEN "{self.channel}"')
+
+    async def listen(self):
+        while True:
+            notification = await self._connection.notifies.get()
+            yield notification.payload
+
+    async def send(self, data: str):
+        size = len(data.encode())
+        if size >= NOTIFY_MAX_SIZE:
+            raise BroadcastError(
+                f'Broadcast of {size} bytes is too large for a PostgreSQL '
+                f'notification (less than {NOTIFY_MAX_SIZE} bytes), use '
+                f'the Redis broadcast backend for larger updates.'
+            )
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute(
+                    'SELECT pg_notify(%s, %s)', [self.channel, data]
+                )
+
+    async def unsubscribe(self):
+        if self._connection:
+            await self._connection.close()
+            self._connection = None
@@ -1,11 +1,13 @@
-import json
+import collections
 import os
-from typing import Any
+import time
+from typing import Any, List
 
 from aiohttp import web
 
 from dazzler.events import DAZZLER_SETUP, DAZZLER_STOP
 from dazzler.system import Middleware, UNDEFINED
+from dazzler.system.broadcast import BroadcastBus
 from dazzler.system.session import SessionBackEnd
 
 
@@ -43,6 +45,10 @@ class RedisSessionBackend(SessionBackEnd):
 
     Values are serialized to json first to keep the types.
 
+    The commands of an operation are sent in a single pipeline, the
+    expiration of a session is refreshed by the reads at most once every
+    ``session.expire_refresh`` seconds and by every write.
+
     Install with ``pip install dazzler[redis]``
 
     :seealso: https://aioredis.readthedocs.io/
@@ -52,6 +58,8 @@ class RedisSessionBackend(SessionBackEnd):
     def __init__(self, app, redis=None):
         super().__init__(app)
         self.redis = redis
+        # Last refresh of the expiration by session id, oldest first.
+        self._refreshed = collections.OrderedDict()
         app.events.subscribe(DAZZLER_SETUP, self._setup)
         app.events.subscribe(DAZZLER_STOP, self._cleanup)
 
@@ -65,24 +73,109 @@ class RedisSessionBackend(SessionBackEnd):
         else:
             self.redis = await get_redis_pool()
 
-    async def set(self, session_id: str, key: str, value: Any):
-        transaction = self.redis.multi_exec()
+    def _dumps(self, value: Any) -> str:
         # Serialize to keep the type.
-        transaction.hset(session_id, key, json.dumps({'v': value}))
-        transaction.expire(
-            session_id, self.app.config.session.duration
-        )
-        await transaction.execute()
+        return self.app.json.dumps({'v': value})
 
-    async def get(self, session_id: str, key: str):
-        if not await self.redis.hexists(session_id, key):
+    def _loads(self, data) -> Any:
+        if data is None:
             return UNDEFINED
-        data = await self.redis.hget(session_id, key)
-        await self.redis.expire(
-            session_id, self.app.config.session.duration
-        )
-        data = json.loads(data)
-        return data['v']
+        return self.app.json.loads(data)['v']
+
+    def _expire(self, pipeline, session_id: str, force: bool = False):
+        now = time.monotonic()
+        interval = self.app.config.session.expire_refresh
+        refreshed = self._refreshed.get(session_id)
+        if not force and refreshed is not None and now - refreshed < interval:
+            return
+        self._refreshed[session_id] = now
+        self._refreshed.move_to_end(session_id)
+        while self._refreshed and \
+                now - next(iter(self._refreshed.values())) >= interval:
+            self._refreshed.popitem(last=False)
+        pipeline.expire(session_id, self.app.config.session.duration)
+
+    async def _write(self, session_id: str, values: dict, deleted=()):
+        pipeline = self.redis.pipeline()
+        if values:
+            pipeline.hmset_dict(session_id, {
+                key: self._dumps(value) for key, value in values.items()
+            })
+        if deleted:
+            pipeline.hdel(session_id, *deleted)
+        # A write may create the hash again after it expired or all its
+        # keys were deleted, always set the expiration.
+        self._expire(pipeline, session_id, force=True)
+        await pipeline.execute()
+
+    async def set(self, session_id: str, key: str, value: Any):
+        await self._write(session_id, {key: value})
+
+    async def set_many(self, session_id: str, values: dict):
+        await self._write(session_id, values)
+
+    async def get(self, session_id: str, key: str):
+        pipeline = self.redis.pipeline()
+        pipeline.hget(session_id, key)
+        self._expire(pipeline, session_id)
+        data, *_ = await pipeline.execute()
+        return self._loads(data)
+
+    async def get_many(self, session_id: str, keys: List[str]) -> dict:
+        if not keys:
+            return {}
+        pipeline = self.redis.pipeline()
+        pipeline.hmget(session_id, *keys)
+        self._expire(pipeline, session_id)
+        values, *_ = await pipeline.execute()
+        return {
+            key: self._loads(value) for key, value in zip(keys, values)
+        }
 
     async def delete(self, session_id: str, key: str):
         await self.redis.hdel(session_id, key)
+
+    async def load_all(self, session_id: str) -> dict:
+        pipeline = self.redis.pipeline()
+        pipeline.hgetall(session_id, encoding='utf-8')
+        self._expire(pipeline, session_id)
+        data, *_ = await pipeline.execute()
+        return {key: self._loads(value) for key, value in data.items()}
+
+    async def save_many(
+            self, session_id: str, values: dict, deleted: List[str]
+    ):
+        await self._write(session_id, values, deleted)
+
+
+class RedisBroadcastBus(BroadcastBus):
+    """
+    Broadcast bus with redis pub/sub.
+
+    Uses the pool of the :py:class:`RedisMiddleware` if available.
+
+    Install with ``pip install dazzler[redis]``
+
+    :type redis: aioredis.Redis
+    """
+    def __init__(self, app, redis=None, channel: str = 'dazzler_broadcast'):
+        super().__init__(app, channel)
+        self.redis = redis
+        self._subscription = None
+
+    async def subscribe(self):
+        if not self.redis:
+            self.redis = self.app.server.app.get('redis') \
+                or await get_redis_pool()
+        self._subscription, = await self.redis.subscribe(self.channel)
+
+    async def listen(self):
+        while await self._subscription.wait_message():
+            yield await self._subscription.get(encoding='utf-8')
+
+    async def send(self, data: str):
+        await self.redis.publish(self.channel, data)
+
+    async def unsubscribe(self):
+        if not self.redis.closed:
+            await self.redis.unsubscribe(self.channel)
@@ -54,5 +54,25 @@ class AuthError(DazzlerError):
     """Error related to authentication system."""
 
 
+class BroadcastError(DazzlerError):
+    """Error related to the broadcast bus."""
+
+
+class JsonLibraryError(DazzlerError):
+    """The configured json library is not available."""
+
+
 class ElectronBuildError(DazzlerError):
     """Error from building the electron binary"""
+
+
+class WorkerError(DazzlerError):
+    """Error related to the prefork workers."""
+
+
+class ListenerError(DazzlerError):
+    """Error with the listening sockets of the server."""
+
+
+class LoadTestError(DazzlerError):
+    """The load test cannot run against the page."""
@@ -22,6 +22,7 @@ from ._undefined import UNDEFINED, Undefined  # noqa: F401
 from ._page import Page, PagePart  # noqa: F401
 from ._middleware import Middleware  # noqa: F401
 from ._route import Route, RouteMethod  # noqa: F401
+from ._timing import server_timing  # noqa: F401
 
 
 __all__ = [  # noqa: F405
@@ -49,4 +50,5 @@ __all__ = [  # noqa: F405
     'Middleware',
     'Route',
     'RouteMethod',
+    'server_timing',
 ]
@@ -10,6 +10,7 @@ from .session import Session
 from ._undefined import UNDEFINED
 from ._component import prepare_aspects
 from ._package import Package
+from ._outbox import Outbox, aspects_message
 
 
 from ..errors import TriggerLoopError, GetAspectError, BindingError
@@ -19,6 +20,8 @@ __all__ = [
     'CallContext', 'coerce_binding'
 ]
 
+CONCURRENCY_POLICIES = ('parallel', 'latest', 'queue', 'drop')
+
 
 def is_component(aspect):
     return isinstance(aspect, dict) \
@@ -97,16 +100,38 @@ class Trigger(_Bind):
         regex=False,
         once=None,
         skip_initial=False,
+        debounce: float = None,
+        throttle: float = None,
     ):
+        """
+        :param identity: The identity of the component to bind.
+        :param aspect: Aspect name to trigger.
+        :param regex: Identity and aspects are matched as regex.
+        :param once: Trigger only once.
+        :param skip_initial: Don't trigger with the initial value.
+        :param debounce: Wait for the aspect to stop changing for this
+            many seconds before triggering with the latest value.
+        :param throttle: Trigger at most once every this many seconds,
+            with the latest value.
+        """
         super().__init__(identity, aspect, regex)
         self.once = once
         self.skip_initial = skip_initial
+        self.debounce = debounce
+        self.throttle = throttle
+
+    @property
+    def interval(self) -> float:
+        """Minimum time between two triggers enforced by the server."""
+        return max(self.debounce or 0, self.throttle or 0)
 
     def prepare(self) -> dict:
         return {
             **super().prepare(),
             'once': self.once,
             'skip_initial': self.skip_initial,
+            'debounce': self.debounce,
+            'throttle': self.throttle,
         }
 
 
@@ -157,11 +182,13 @@ class BoundAspect:
             trigger: typing.Union[TriggerList, Trigger],
             states: StateList = None,
             call: bool = False,
+            concurrency: str = 'parallel',
     ):
         self.handler = handler
         self.trigger = trigger
         self.states = states or []
         self.call = call
+        self.concurrency = concurrency
 
     def prepare(self) -> list:
         """
@@ -185,6 +212,18 @@ class BoundAspect:
             return [self.trigger]
         return self.trigger
 
+    def get_trigger(self, key: str) -> typing.Optional[Trigger]:
+        """
+        Get a trigger of the binding by key.
+
+        :param key: The key of the trigger ``aspect@identity``.
+        :return: The trigger or None if not found.
+        """
+        for trigger in self.triggers:
+            if str(trigger) == key:
+                return trigger
+        return None
+
     async def __call__(self, *args, **kwargs):
         return await self.handler(*args, **kwargs)
 
@@ -229,6 +268,8 @@ class BaseContext:
         self.auth = self.dazzler.auth
         self.user = request.get('user')
         self.session: Session = request.get('session')
+        #: Id of the trace sent by the browser with the binding.
+        self.trace_id: typing.Optional[str] = None
 
     async def set_aspect(self, identity, **aspects):
         raise NotImplementedError
@@ -249,18 +290,25 @@ class BindingContext(BaseContext):
             states: typing.Dict[str, BoundValue],
             websocket: web.WebSocketResponse,
             request_queue: asyncio.Queue,
-            create_task: typing.Callable
+            create_task: typing.Callable,
+            outbox: Outbox = None,
     ):
         super().__init__(identity, request, trigger, states)
         self.websocket = websocket
+        self.outbox = outbox
         self.create_task = create_task
         self._request_queue = request_queue
         self._response_queue = asyncio.Queue()
+        self._updates = []
+        self._flush_handle = None
 
     async def set_aspect(self, identity, **aspects):
         """
         Update aspects of a component on the front end.
 
+        The updates are sent together once the binding yields to the event
+        loop, or after ``bindings.batch_window`` seconds if configured.
+
         :param identity: Identity of the component to update.
         :param aspects: The aspects to set on the component.
         :return:
@@ -277,13 +325,54 @@ class BindingContext(BaseContext):
         if regex:
             identity = identity.pattern
 
-        await self.websocket.send_json({
-            'kind': 'set-aspect',
+        self._updates.append({
             'identity': str(identity),
             'regex': regex,
             'payload': prepare_aspects(aspects)
         })
 
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(
+                self.dazzler.config.bindings.batch_window,
+                self._schedule_flush
+            )
+
+    async def flush(self):
+        """
+        Send the pending aspects updates to the frontend.
+
+        :return:
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        updates, self._updates = self._updates, []
+
+        if not updates:
+            return
+
+        with self.dazzler.tracer.span(
+                'set_aspect', 'set_aspect', updates=len(updates)
+        ):
+            if self.outbox is not None:
+                await self.outbox.set_aspects(updates)
+            else:
+                await self.websocket.send_json(
+                    aspects_message(updates), dumps=self.dazzler.json.dumps
+                )
+
+    def _schedule_flush(self):
+        self._flush_handle = None
+        self.create_task(self.flush())
+
+    def discard(self):
+        """Drop the pending aspects updates."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._updates = []
+
     async def get_aspect(self, identity: str, aspect: str):
         """
         Request the value of an aspect from the frontend.
@@ -293,17 +382,23 @@ class BindingContext(BaseContext):
         :return:
         """
 
-        response_queue = asyncio.Queue()
+        # Send the pending updates first so the value is up to date.
+        await self.flush()
 
-        await self._request_queue.put({
-            'request_id': uuid.uuid4().hex,
-            'queue': response_queue,
-            'identity': identity,
-            'aspect': aspect,
-            'kind': 'get-aspect'
-        })
+        with self.dazzler.tracer.span(
+                f'get_aspect {aspect}@{identity}', 'get_aspect'
+        ):
+            response_queue = asyncio.Queue()
 
-        value, error = await response_queue.get()
+            await self._request_queue.put({
+                'request_id': uuid.uuid4().hex,
+                'queue': response_queue,
+                'identity': identity,
+                'aspect': aspect,
+                'kind': 'get-aspect'
+            })
+
+            value, error = await response_queue.get()
         if value is UNDEFINED:
             raise GetAspectError(
                 error or f'Undefined aspect {aspect}@{identity}'
@@ -312,6 +407,7 @@ class BindingContext(BaseContext):
         return hydrate(value)
 
     async def _get_storage(self, storage, identity):
+        await self.flush()
         response_queue = asyncio.Queue()
 
         await self._request_queue.put({
@@ -329,6 +425,7 @@ class BindingContext(BaseContext):
         return value
 
     async def _set_storage(self, storage, identity, payload):
+        await self.flush()
         await self._request_queue.put({
             'request_id': uuid.uuid4().hex,
             'identity': identity,
@@ -358,15 +455,24 @@ class Binding:
             trigger: Trigger,
             states: StateList = None,
             call: bool = False,
+            concurrency: str = 'parallel',
     ):
+        if concurrency not in CONCURRENCY_POLICIES:
+            raise BindingError(
+                f'Invalid concurrency: {concurrency}, '
+                f'choose from {", ".join(CONCURRENCY_POLICIES)}'
+            )
         self.trigger = trigger
         self.states = states or []
         self.call = call
+        self.concurrency = concurrency
 
     def __call__(self, func):
 
         @functools.wraps(func)
-        async def bound(request, data, ws, request_queue, create_task):
+        async def bound(
+            request, data, ws, request_queue, create_task, outbox=None
+        ):
             trigger = BoundValue(
                 data['trigger']['identity'],
                 data['trigger']['aspect'],
@@ -394,12 +500,36 @@ class Binding:
                     states,
                     ws,
                     request_queue,
-                    create_task
+                    create_task,
+                    outbox,
                 )
-            await func(context)
+            dazzler = context.dazzler
+            with dazzler.tracer.span(
+                f'binding {data["key"]}', 'binding',
+                trace_id=data.get('trace_id'),
+            ) as span:
+                context.trace_id = span.trace_id if span \
+                    else data.get('trace_id')
+                coroutine = func(context)
+                if dazzler.profiler.sample():
+                    coroutine = dazzler.profiler.profile(
+                        data['key'], coroutine
+                    )
+                try:
+                    with dazzler.watchdog.scope(f'binding {data["key"]}'):
+                        await coroutine
+                except asyncio.CancelledError:
+                    # Superseded or disconnected, the updates are stale.
+                    if not self.call:
+                        context.discard()
+                    raise
+                if not self.call:
+                    await context.flush()
             return context
 
-        return BoundAspect(bound, self.trigger, self.states, self.call)
+        return BoundAspect(
+            bound, self.trigger, self.states, self.call, self.concurrency
+        )
 
 
 def coerce_binding(value, binding_type: typing.Type = Trigger):
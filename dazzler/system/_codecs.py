@@ -0,0 +1,146 @@
+"""Websocket messages codecs."""
+import typing
+
+from aiohttp import web
+
+from ._json import JsonSerializer
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class WebsocketCodec:
+    """
+    Encode and decode the messages of the bindings websocket.
+
+    The codec is negotiated with the renderer as the
+    ``dazzler.<name>`` websocket subprotocol.
+    """
+    name = ''
+    #: Send the messages as binary frames.
+    binary = False
+
+    def __init__(self, serializer: JsonSerializer = None):
+        """
+        :param serializer: The json serializer of the application.
+        """
+        self.serializer = serializer or JsonSerializer()
+
+    @property
+    def protocol(self) -> str:
+        return f'dazzler.{self.name}'
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def dumps(self, message: typing.Any) -> typing.Union[str, bytes]:
+        raise NotImplementedError
+
+    def loads(self, data: typing.Union[str, bytes]) -> typing.Any:
+        raise NotImplementedError
+
+    async def encode(self, message) -> typing.Union[str, bytes]:
+        return self.dumps(message)
+
+    async def send(self, websocket: web.WebSocketResponse, message):
+        """
+        Encode and send a message on the websocket.
+
+        :param websocket: The websocket to send the message on.
+        :param message: Message to encode.
+        :return:
+        """
+        await self.write(websocket, await self.encode(message))
+
+    async def write(
+        self, websocket: web.WebSocketResponse, data: typing.Union[str, bytes]
+    ):
+        """
+        Send an already encoded message on the websocket.
+
+        :param websocket: The websocket to send the message on.
+        :param data: Message encoded with this codec.
+        :return:
+        """
+        if self.binary:
+            await websocket.send_bytes(data)
+        else:
+            await websocket.send_str(data)
+
+
+class JsonCodec(WebsocketCodec):
+    """Text json messages, always available."""
+    name = 'json'
+
+    def dumps(self, message):
+        return self.serializer.dumps(message)
+
+    def loads(self, data):
+        return self.serializer.loads(data)
+
+    async def encode(self, message):
+        # Large messages are encoded in chunks.
+        return await self.serializer.dumps_async(message)
+
+
+class MsgpackCodec(WebsocketCodec):
+    """Binary MessagePack messages, requires ``msgpack`` to be installed."""
+    name = 'msgpack'
+    binary = True
+
+    @property
+    def available(self):
+        return msgpack is not None
+
+    def dumps(self, message):
+        return msgpack.packb(message, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+JSON_CODEC = JsonCodec()
+
+codecs = {
+    codec.name: codec
+    for codec in (JsonCodec, MsgpackCodec)
+}
+
+
+def get_codecs(
+    names: typing.List[str], serializer: JsonSerializer = None
+) -> typing.List[WebsocketCodec]:
+    """
+    Get the available codecs in order of preference.
+
+    :param names: Name of the codecs to use.
+    :param serializer: Json serializer of the application.
+    :return: The available codecs, json is added last as the fallback
+        if it is not in the names.
+    """
+    found = [
+        codecs[name](serializer) for name in names if name in codecs
+    ]
+    found = [codec for codec in found if codec.available]
+    if not any(codec.name == JsonCodec.name for codec in found):
+        found.append(JsonCodec(serializer))
+    return found
+
+
+def select_codec(
+    available: typing.List[WebsocketCodec], protocol: str
+) -> WebsocketCodec:
+    """
+    Select the codec of the negotiated websocket protocol.
+
+    :param available: Codecs from :py:func:`get_codecs`.
+    :param protocol: The negotiated protocol, may be empty.
+    :return: The codec of the protocol or the json codec.
+    """
+    for codec in available:
+        if codec.protocol == protocol:
+            return codec
+    return next(x for x in available if x.name == JsonCodec.name)
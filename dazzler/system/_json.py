@@ -0,0 +1,167 @@
+"""Json serialization with an optional faster library."""
+import asyncio
+import itertools
+import json
+import typing
+
+from ..errors import JsonLibraryError
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+# Size of the chunks when a large payload is encoded in parts.
+CHUNK_SIZE = 65536
+
+
+def estimate_size(data, sample: int = 4, budget: int = 1000) -> int:
+    """
+    Estimate the json encoded size of data without encoding it.
+
+    Only the first ``sample`` items of each container are visited and
+    extrapolated to the rest of the container.
+
+    :param data: The data to estimate.
+    :param sample: Number of items to visit in every container.
+    :param budget: Maximum number of values to visit.
+    :return: The estimated size in bytes.
+    """
+    remaining = [budget]
+
+    def estimate_dict(value: dict):
+        length = len(value)
+        if not length:
+            return 2
+        if remaining[0] <= 0:
+            return 2 + length * 16
+        items = list(itertools.islice(value.items(), sample))
+        total = sum(estimate(k) + estimate(v) + 2 for k, v in items)
+        return 2 + total * length // len(items)
+
+    def estimate_list(value: typing.Sequence):
+        length = len(value)
+        if not length:
+            return 2
+        if remaining[0] <= 0:
+            return 2 + length * 8
+        items = value[:sample]
+        total = sum(estimate(v) + 1 for v in items)
+        return 2 + total * length // len(items)
+
+    estimators = {
+        str: lambda value: len(value) + 2,
+        dict: estimate_dict,
+        list: estimate_list,
+        tuple: estimate_list,
+    }
+
+    def estimate(value):
+        remaining[0] -= 1
+        for cls in type(value).__mro__:
+            estimator = estimators.get(cls)
+            if estimator is not None:
+                return estimator(value)
+        return 8
+
+    return estimate(data)
+
+
+class JsonSerializer:
+    """
+    Encode and decode json with the configured library.
+
+    Available as ``app.json``, used for the responses, websocket messages
+    and sessions.
+    """
+    def __init__(self, library: str = 'json', large_payload: int = 0):
+        """
+        :param library: ``json``, ``orjson`` or ``auto`` to use orjson
+            if installed.
+        :param large_payload: Estimated size above which the payloads are
+            encoded in chunks by the async methods, 0 to disable.
+        """
+        if library == 'auto':
+            library = 'orjson' if orjson is not None else 'json'
+        if library == 'orjson' and orjson is None:
+            raise JsonLibraryError(
+                'orjson is not installed, "pip install orjson"'
+            )
+        if library not in ('json', 'orjson'):
+            raise JsonLibraryError(f'Invalid json library: {library}')
+        self.library = library
+        self.large_payload = large_payload
+
+    def dumpb(self, data) -> bytes:
+        if self.library == 'orjson':
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    def dumps(self, data) -> str:
+        if self.library == 'orjson':
+            return self.dumpb(data).decode()
+        return json.dumps(data, separators=(',', ':'))
+
+    def loads(self, data: typing.Union[str, bytes]):
+        if self.library == 'orjson':
+            return orjson.loads(data)
+        return json.loads(data)
+
+    async def dumpb_async(self, data) -> bytes:
+        """
+        Encode data, yielding to the event loop between chunks
+        if it is a large payload.
+
+        :param data: The data to encode.
+        :return: The encoded data.
+        """
+        if not self.large_payload \
+                or estimate_size(data) < self.large_payload:
+            return self.dumpb(data)
+        chunks = []
+        await self._encode_chunks(data, chunks)
+        return b''.join(chunks)
+
+    async def dumps_async(self, data) -> str:
+        return (await self.dumpb_async(data)).decode()
+
+    def _key(self, key) -> bytes:
+        if not isinstance(key, str):
+            # Same as json for int, float, bool & None keys.
+            key = json.dumps(key)
+        return self.dumpb(key)
+
+    async def _encode_chunks(self, value, chunks: typing.List[bytes]):
+        size = estimate_size(value)
+        if size <= CHUNK_SIZE or not isinstance(value, (dict, list, tuple)):
+            chunks.append(self.dumpb(value))
+            await asyncio.sleep(0)
+            return
+
+        is_dict = isinstance(value, dict)
+        items = list(value.items()) if is_dict else value
+        item_size = max(size // len(items), 1)
+
+        chunks.append(b'{' if is_dict else b'[')
+        if item_size > CHUNK_SIZE:
+            # Large items are split themselves.
+            for i, item in enumerate(items):
+                if i:
+                    chunks.append(b',')
+                if is_dict:
+                    key, item = item
+                    chunks.append(self._key(key))
+                    chunks.append(b':')
+                await self._encode_chunks(item, chunks)
+        else:
+            step = max(CHUNK_SIZE // item_size, 1)
+            for i in range(0, len(items), step):
+                batch = items[i:i + step]
+                if i:
+                    chunks.append(b',')
+                encoded = self.dumpb(dict(batch) if is_dict else batch)
+                # Strip the brackets of the encoded batch.
+                chunks.append(encoded[1:-1])
+                await asyncio.sleep(0)
+        chunks.append(b'}' if is_dict else b']')
@@ -0,0 +1,57 @@
+"""Rate limit of the bindings triggers."""
+import asyncio
+import typing
+
+
+class TriggerLimiter:
+    """
+    Enforce the debounce and throttle of the triggers for a connection.
+
+    A trigger is called at most once per interval, the calls in between
+    are delayed to the end of the interval and only the latest is kept.
+    """
+    def __init__(self):
+        self._pending: typing.Dict[str, asyncio.TimerHandle] = {}
+        self._last: typing.Dict[str, float] = {}
+        #: Number of calls replaced by a later call.
+        self.dropped = 0
+
+    def submit(self, key: str, interval: float, callback: typing.Callable):
+        """
+        Call the callback now or at the end of the interval.
+
+        :param key: Key of the trigger, ``aspect@identity``.
+        :param interval: Minimum time in seconds between two calls.
+        :param callback: Function to call.
+        :return:
+        """
+        if not interval:
+            callback()
+            return
+
+        loop = asyncio.get_event_loop()
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.cancel()
+            self.dropped += 1
+
+        last = self._last.get(key)
+        delay = 0 if last is None else last + interval - loop.time()
+
+        if delay <= 0:
+            self._call(key, callback)
+        else:
+            self._pending[key] = loop.call_later(
+                delay, self._call, key, callback
+            )
+
+    def _call(self, key, callback):
+        self._pending.pop(key, None)
+        self._last[key] = asyncio.get_event_loop().time()
+        callback()
+
+    def cancel(self):
+        """Cancel all the delayed calls."""
+        for handle in self._pending.values():
+            handle.cancel()
+        self._pending.clear()
@@ -21,6 +21,9 @@ class Middleware:
 
                 return set_cookie
     """
+    #: Name of the middleware duration in the Server-Timing header.
+    timing_name = 'middleware'
+
     async def __call__(
             self,
             request: web.Request,
@@ -0,0 +1,170 @@
+"""Outgoing websocket messages."""
+import asyncio
+import collections
+import itertools
+import typing
+
+from aiohttp import web
+
+from ._codecs import WebsocketCodec, JSON_CODEC
+
+
+def aspects_message(updates: typing.List[dict]) -> dict:
+    """
+    Create the message to send for aspects updates.
+
+    :param updates: List of ``set-aspect`` updates with
+        identity, regex and payload.
+    :return: A ``set-aspect`` message if there is only one update,
+        otherwise a ``set-aspects`` message with all the updates.
+    """
+    if len(updates) == 1:
+        return {'kind': 'set-aspect', **updates[0]}
+    return {'kind': 'set-aspects', 'updates': updates}
+
+
+#: Aspects of the core components changing the current value.
+DELTA_ASPECTS = (
+    'append', 'prepend', 'concat', 'insert', 'delete_index',
+    'delete_identity',
+)
+
+
+class Outbox:
+    """
+    Bounded queue of messages to send on a websocket.
+
+    Pending aspects updates to the same component are merged, the latest
+    value of an aspect wins. An update is only merged if no other message
+    than updates of other components was queued after the pending update
+    and neither set a delta aspect. Producers waits when the outbox is full.
+    """
+    def __init__(
+        self,
+        websocket: web.WebSocketResponse,
+        max_size: int = 1000,
+        codec: WebsocketCodec = JSON_CODEC,
+        delta_aspects: typing.Iterable[str] = DELTA_ASPECTS,
+    ):
+        """
+        :param websocket: The websocket to send the messages to.
+        :param max_size: Maximum number of pending messages.
+        :param codec: Codec to encode the messages with.
+        :param delta_aspects: Aspects applied as a change to the current
+            value, every update setting them is sent.
+        """
+        self.websocket = websocket
+        self.codec = codec
+        self.max_size = max_size
+        self.delta_aspects = frozenset(delta_aspects)
+        self._pending = collections.OrderedDict()
+        # Keys of the pending updates by identity that can still be merged.
+        self._mergeable = {}
+        self._keys = itertools.count()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        #: Highest number of pending messages.
+        self.high_water_mark = 0
+        #: Number of updates merged into a pending update.
+        self.merged = 0
+        #: Number of messages sent.
+        self.sent = 0
+        #: Size of the messages sent.
+        self.bytes_sent = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def put(self, message: dict):
+        """
+        Queue a message to send.
+
+        :param message: Message to send.
+        :return:
+        """
+        await self._put(next(self._keys), (False, message))
+        self._mergeable.clear()
+
+    async def put_encoded(self, data: typing.Union[str, bytes]):
+        """
+        Queue a message already encoded with the codec of the outbox.
+
+        :param data: The encoded message.
+        :return:
+        """
+        await self._put(next(self._keys), (False, data))
+        self._mergeable.clear()
+
+    async def set_aspects(self, updates: typing.List[dict]):
+        """
+        Queue aspects updates, merging with the pending updates
+        of the same identity.
+
+        :param updates: List of updates with identity, regex and payload.
+        :return:
+        """
+        for update in updates:
+            identity = update['identity']
+            delta = self.delta_aspects.intersection(update['payload'])
+            if not update['regex'] and not delta:
+                pending = self._pending.get(self._mergeable.get(identity))
+                if pending is not None:
+                    pending[1]['payload'].update(update['payload'])
+                    self.merged += 1
+                    continue
+            key = next(self._keys)
+            await self._put(
+                key, (True, {**update, 'payload': dict(update['payload'])})
+            )
+            if update['regex']:
+                # Could set any of the pending components.
+                self._mergeable.clear()
+            elif delta:
+                self._mergeable.pop(identity, None)
+            else:
+                self._mergeable[identity] = key
+
+    async def _put(self, key, item):
+        while len(self._pending) >= self.max_size:
+            self._space.clear()
+            await self._space.wait()
+        self._pending[key] = item
+        self._idle.clear()
+        self.high_water_mark = max(self.high_water_mark, len(self._pending))
+        self._ready.set()
+
+    async def run(self):
+        """Send the pending messages until cancelled."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            items = list(self._pending.values())
+            self._pending.clear()
+            self._mergeable.clear()
+            self._space.set()
+
+            # Consecutive updates are sent together.
+            for is_update, group in itertools.groupby(
+                    items, key=lambda x: x[0]
+            ):
+                messages = [x[1] for x in group]
+                if is_update:
+                    messages = [aspects_message(messages)]
+                for message in messages:
+                    if not isinstance(message, (str, bytes)):
+                        message = await self.codec.encode(message)
+                    await self.codec.write(self.websocket, message)
+                    self.sent += 1
+                    self.bytes_sent += len(
+                        message.encode() if isinstance(message, str)
+                        else message
+                    )
+            if not self._pending:
+                self._idle.set()
+
+    async def join(self):
+        """Wait until all the pending messages are sent."""
+        await self._idle.wait()
@@ -1,3 +1,4 @@
+import inspect
 import os
 import typing
 from aiohttp import web
@@ -19,14 +20,45 @@ LayoutType = typing.Union[
     typing.List[Component]
 ]
 
+CacheKeyType = typing.Callable[
+    [web.Request],
+    typing.Union[typing.Hashable, typing.Awaitable[typing.Hashable]]
+]
+
+
+def collect_aspects(layout, aspects: dict):
+    """
+    Collect the aspects of the components of a prepared layout by identity.
+
+    :param layout: Prepared layout.
+    :param aspects: Dict to add the aspects to.
+    :return:
+    """
+    if isinstance(layout, list):
+        for item in layout:
+            collect_aspects(item, aspects)
+    elif isinstance(layout, dict):
+        if 'identity' in layout and 'aspects' in layout:
+            aspects[layout['identity']] = dict(layout['aspects'])
+            collect_aspects(layout['aspects'], aspects)
+        else:
+            for value in layout.values():
+                collect_aspects(value, aspects)
+
 
 class PagePart:
     """Part of a page to render and bind."""
 
     def __init__(
-        self, layout: LayoutType = None
+        self, layout: LayoutType = None, cache_key: CacheKeyType = None
     ):
+        """
+        :param layout: Root component or function returning a Component.
+        :param cache_key: Function taking the request and returning a key
+            to cache the prepared output of a function layout with.
+        """
         self.layout = layout
+        self.cache_key = cache_key
         self._bindings = {}
         self._ties = []
 
@@ -36,6 +68,7 @@ class PagePart:
         *states: typing.Union[State, str],
         once: bool = False,
         call: bool = False,
+        concurrency: str = 'parallel',
     ):
         trg = coerce_binding(trigger)
         sts = coerce_binding(list(states), State)
@@ -47,7 +80,7 @@ class PagePart:
             trg.once = once
 
         def _wrapper(func):
-            binding = Binding(trg, sts, call)(func)
+            binding = Binding(trg, sts, call, concurrency)(func)
             for trig in binding.triggers:
                 self._bindings[str(trig)] = binding
             return func
@@ -59,6 +92,7 @@ class PagePart:
         trigger: typing.Union[Trigger, str],
         *states: typing.Union[State, str],
         once: bool = False,
+        concurrency: str = 'parallel',
     ):
         """
         Attach a function to be called when the trigger update on the client.
@@ -66,9 +100,15 @@ class PagePart:
         :param trigger: Aspect to trigger the binding.
         :param states: States to includes in the binding message.
         :param once: Execute the binding only once
+        :param concurrency: What to do when the trigger fires while the
+            previous call is still running: ``parallel`` run both,
+            ``latest`` cancel the previous, ``queue`` run after the previous
+            or ``drop`` ignore the new trigger.
         :return:
         """
-        return self._bind(trigger, *states, once=once)
+        return self._bind(
+            trigger, *states, once=once, concurrency=concurrency
+        )
 
     def call(
         self,
@@ -132,6 +172,25 @@ class PagePart:
         """
         return self._bindings.get(key)
 
+    async def get_cache_key(self, request: web.Request):
+        """
+        Get the key identifying the prepared output for the request.
+
+        Static layouts always prepare the same output, function layouts
+        are only cached when the part was given a ``cache_key``.
+
+        :param request: The request to prepare for.
+        :return: The key or None if the output cannot be cached.
+        """
+        if not callable(self.layout):
+            return ''
+        if self.cache_key is None:
+            return None
+        key = self.cache_key(request)
+        if inspect.isawaitable(key):
+            key = await key
+        return key
+
     async def prepare(
         self,
         request: web.Request,
@@ -182,6 +241,7 @@ class Page(PagePart):
         authorizations: list = None,
         include_app_header: bool = True,
         include_app_footer: bool = True,
+        cache_key: CacheKeyType = None,
     ):
         """
         :param name: Unique name for the page, usually give __name__.
@@ -204,8 +264,11 @@ class Page(PagePart):
         :param authorizations: Rules for authorization.
         :param include_app_header: Include the header of the application.
         :param include_app_footer: Include the footer of the application.
+        :param cache_key: Function taking the request and returning a key to
+            cache the prepared page with when the layout is a function.
+            Static layouts are always cached.
         """
-        super().__init__(layout)
+        super().__init__(layout, cache_key)
         self.name = name.split('.')[-1]
         self.base_name = name
         try:
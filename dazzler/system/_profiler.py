@@ -0,0 +1,254 @@
+"""Profile the execution of the bindings."""
+import collections
+import cProfile
+import os
+import random
+import re
+import signal
+import sys
+import threading
+import types
+import typing
+
+from ..errors import BindingError
+from ..events import DAZZLER_START, DAZZLER_STOP
+
+PROFILER_MODES = ('cprofile', 'sampling')
+
+
+@types.coroutine
+def _drive(coroutine, enter: typing.Callable, leave: typing.Callable):
+    # Run the coroutine one step at a time, the profiler is only enabled
+    # while the coroutine runs and not while it's waiting.
+    value, error = None, None
+    while True:
+        enter()
+        try:
+            if error is not None:
+                future = coroutine.throw(error)
+            else:
+                future = coroutine.send(value)
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            leave()
+        try:
+            value, error = (yield future), None
+        except BaseException as err:  # pylint: disable=broad-except
+            value, error = None, err
+
+
+def _frame_name(frame: types.FrameType) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({code.co_filename}:{code.co_firstlineno})'
+
+
+class BindingProfiler:
+    """
+    Profile a sample of the bindings executions, aggregated by binding key.
+
+    - ``cprofile`` mode dumps a pstats file per binding.
+    - ``sampling`` mode records the stack of the binding every interval and
+      dumps the collapsed stacks for flame graph tools.
+
+    The profiles are dumped on ``SIGUSR1`` and when the application stops,
+    ``SIGUSR2`` enables or disables the profiling of a running application.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(
+        self,
+        app,
+        sample_rate: float = 0.0,
+        mode: str = 'cprofile',
+        interval: float = 0.005,
+        output_directory: str = 'profiles',
+        signal_sample_rate: float = 0.01,
+    ):
+        """
+        :param app: The dazzler application.
+        :param sample_rate: Fraction of the bindings executions to profile,
+            can be changed while running, 0 to disable.
+        :param mode: ``cprofile`` or ``sampling``.
+        :param interval: Time in seconds between samples.
+        :param output_directory: Directory to dump the profiles in.
+        :param signal_sample_rate: Sample rate set by ``SIGUSR2`` when the
+            profiling is disabled.
+        """
+        self.app = app
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.interval = interval
+        self.output_directory = output_directory
+        self.signal_sample_rate = signal_sample_rate
+        self.profiles: typing.Dict[str, cProfile.Profile] = {}
+        self.stacks: typing.Dict[str, typing.Counter[str]] = \
+            collections.defaultdict(collections.Counter)
+        #: Key of the binding currently running.
+        self.current: typing.Optional[str] = None
+        self._thread: typing.Optional[threading.Thread] = None
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._signals = False
+        self._lock = threading.Lock()
+        self._drive_code = _drive.__code__
+        app.events.subscribe(DAZZLER_START, self._on_start)
+        app.events.subscribe(DAZZLER_STOP, self._on_stop)
+
+    def sample(self) -> bool:
+        """Check if the next execution should be profiled."""
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def profile(self, key: str, coroutine: typing.Awaitable):
+        """
+        Profile the execution of a binding coroutine.
+
+        :param key: Key of the binding.
+        :param coroutine: The coroutine to profile.
+        :return: Awaitable with the result of the coroutine.
+        """
+        if self.mode == 'sampling':
+            self._start_sampling()
+
+            def enter():
+                self.current = key
+
+            def leave():
+                self.current = None
+        else:
+            profile = self.profiles.get(key)
+            if profile is None:
+                profile = self.profiles[key] = cProfile.Profile()
+
+            def enter():
+                self.current = key
+                profile.enable()
+
+            def leave():
+                profile.disable()
+                self.current = None
+
+        return _drive(coroutine, enter, leave)
+
+    def enable(self, sample_rate: float = None, mode: str = None):
+        """
+        Start profiling the bindings executions while running.
+
+        :param sample_rate: Fraction of the executions to profile, defaults
+            to ``signal_sample_rate``.
+        :param mode: Change the mode, ``cprofile`` or ``sampling``.
+        :return:
+        """
+        if mode is not None:
+            self._check_mode(mode)
+            self.mode = mode
+        self.sample_rate = sample_rate if sample_rate is not None \
+            else self.signal_sample_rate
+        self.app.logger.info(
+            f'Profiling {self.sample_rate:.0%} of the bindings '
+            f'with {self.mode}.'
+        )
+
+    def disable(self) -> typing.List[str]:
+        """
+        Stop profiling and dump the profiles.
+
+        :return: The paths of the files written.
+        """
+        self.sample_rate = 0.0
+        self._stop_sampling()
+        return self.dump()
+
+    def toggle(self):
+        """Enable the profiling if it is disabled, disable it otherwise."""
+        if self.sample_rate > 0:
+            self.disable()
+        else:
+            self.enable()
+
+    def dump(self) -> typing.List[str]:
+        """
+        Write the profiles to the output directory and reset them.
+
+        :return: The paths of the files written.
+        """
+        os.makedirs(self.output_directory, exist_ok=True)
+        paths = []
+        for key, profile in list(self.profiles.items()):
+            path = self._path(key, 'pstats')
+            profile.dump_stats(path)
+            paths.append(path)
+        with self._lock:
+            samples, self.stacks = self.stacks, \
+                collections.defaultdict(collections.Counter)
+        for key, stacks in samples.items():
+            path = self._path(key, 'collapsed')
+            with open(path, 'w') as f:
+                for stack, count in stacks.items():
+                    f.write(f'{stack} {count}\n')
+            paths.append(path)
+        self.profiles = {}
+        self.app.logger.info(f'Dumped {len(paths)} binding profiles.')
+        return paths
+
+    def _path(self, key: str, extension: str) -> str:
+        name = re.sub(r'[^\w.@-]', '_', key)
+        return os.path.join(self.output_directory, f'{name}.{extension}')
+
+    def _start_sampling(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _stop_sampling(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            key = self.current
+            if key is None:
+                continue
+            frame = sys._current_frames().get(  # pylint: disable=W0212
+                self._thread_id
+            )
+            stack = []
+            while frame is not None and frame.f_code is not self._drive_code:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if frame is None:
+                # Not in the binding anymore.
+                continue
+            with self._lock:
+                self.stacks[key][';'.join(reversed(stack))] += 1
+
+    @staticmethod
+    def _check_mode(mode: str):
+        if mode not in PROFILER_MODES:
+            raise BindingError(
+                f'Invalid profiler mode: {mode}, '
+                f'choose from {", ".join(PROFILER_MODES)}'
+            )
+
+    async def _on_start(self, _):
+        self._check_mode(self.mode)
+        self._thread_id = threading.get_ident()
+        # Always registered to profile the running application on demand.
+        if hasattr(signal, 'SIGUSR1'):
+            self.app.loop.add_signal_handler(signal.SIGUSR1, self.dump)
+            self.app.loop.add_signal_handler(signal.SIGUSR2, self.toggle)
+            self._signals = True
+
+    async def _on_stop(self, _):
+        if self._signals:
+            self.app.loop.remove_signal_handler(signal.SIGUSR1)
+            self.app.loop.remove_signal_handler(signal.SIGUSR2)
+            self._signals = False
+        self._stop_sampling()
+        if self.profiles or self.stacks:
+            self.dump()
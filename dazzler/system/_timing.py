@@ -0,0 +1,79 @@
+"""Server-Timing header breaking down the duration of the requests."""
+import contextlib
+import time
+import typing
+
+from aiohttp import web
+
+# Request key of the ServerTiming.
+REQUEST_KEY = 'server_timing'
+
+
+class ServerTiming:
+    """Durations of the steps of a request by metric name."""
+    def __init__(self):
+        self.durations: typing.Dict[str, float] = {}
+        self.descriptions: typing.Dict[str, str] = {}
+
+    def add(self, name: str, duration: float = 0.0, description: str = None):
+        """
+        Add to the duration of a metric.
+
+        :param name: Name of the metric.
+        :param duration: Seconds to add.
+        :param description: Description of the metric.
+        :return:
+        """
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+        if description:
+            self.descriptions[name] = description
+
+    @contextlib.contextmanager
+    def measure(self, name: str, description: str = None):
+        """
+        Add the duration of the block to a metric.
+
+        :param name: Name of the metric.
+        :param description: Description of the metric.
+        :return:
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start, description)
+
+    def header(self) -> str:
+        """Format the metrics for the ``Server-Timing`` header."""
+        metrics = []
+        for name, duration in self.durations.items():
+            metric = f'{name};dur={duration * 1000:.2f}'
+            description = self.descriptions.get(name)
+            if description:
+                metric += f';desc="{description}"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+def server_timing(
+    request: typing.Optional[web.Request],
+    name: str,
+    description: str = None,
+) -> typing.ContextManager:
+    """
+    Measure a block in the Server-Timing of the request if enabled.
+
+    .. code-block:: python
+
+        with server_timing(request, 'db', 'Fetch orders'):
+            orders = await fetch_orders()
+
+    :param request: The request to measure, None outside of requests.
+    :param name: Name of the metric.
+    :param description: Description of the metric.
+    :return:
+    """
+    timing = request.get(REQUEST_KEY) if request is not None else None
+    if timing is None:
+        return contextlib.nullcontext()
+    return timing.measure(name, description)
@@ -0,0 +1,204 @@
+"""
+Record spans of the requests and bindings in the Chrome trace event format.
+
+The trace files can be opened with https://ui.perfetto.dev or
+``chrome://tracing``.
+"""
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import time
+import typing
+import uuid
+
+from ..events import DAZZLER_START, DAZZLER_STOP
+
+# Seconds between the writes of the recorded spans.
+FLUSH_INTERVAL = 1.0
+
+
+class Span:
+    """A timed operation of a trace."""
+    __slots__ = (
+        'name', 'category', 'trace_id', 'span_id', 'parent_id',
+        'attributes', 'timestamp', 'start',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        category: str,
+        trace_id: str,
+        parent_id: typing.Optional[str],
+        attributes: dict,
+    ):
+        self.name = name
+        self.category = category
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+
+
+#: Span of the running code, inherited by the tasks it creates.
+current_span: contextvars.ContextVar[typing.Optional[Span]] = \
+    contextvars.ContextVar('dazzler_span', default=None)
+
+
+def parse_traceparent(header: typing.Optional[str]) -> typing.Optional[str]:
+    """
+    Get the trace id of a W3C ``traceparent`` header.
+
+    :param header: Value of the header.
+    :return: The trace id, None if the header is missing or invalid.
+    """
+    if not header:
+        return None
+    parts = header.split('-')
+    if len(parts) != 4 or len(parts[1]) != 32:
+        return None
+    return parts[1]
+
+
+class Tracer:
+    """
+    Record the spans to ``<output_directory>/trace-<pid>.json``.
+
+    Every trace is shown as a thread of the process in the trace viewers,
+    the trace, span and parent ids are in the args of the events.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(
+        self,
+        app,
+        enable: bool = False,
+        output_directory: str = 'traces',
+    ):
+        """
+        :param app: The dazzler application.
+        :param enable: Record the spans.
+        :param output_directory: Directory to write the traces in.
+        """
+        self.app = app
+        self.enable = enable
+        self.output_directory = output_directory
+        self.events: typing.List[dict] = []
+        self._task: typing.Optional[asyncio.Task] = None
+        app.events.subscribe(DAZZLER_START, self._on_start)
+        app.events.subscribe(DAZZLER_STOP, self._on_stop)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(
+            self.output_directory, f'trace-{os.getpid()}.json'
+        )
+
+    @contextlib.contextmanager
+    def span(
+        self,
+        name: str,
+        category: str,
+        trace_id: typing.Optional[str] = None,
+        parent: typing.Optional[Span] = None,
+        **attributes,
+    ):
+        """
+        Record the duration of a block as a span.
+
+        .. code-block:: python
+
+            with app.tracer.span('fetch orders', 'app', user=user.username):
+                orders = await fetch_orders(user)
+
+        :param name: Name of the span.
+        :param category: Category of the span, ``http``, ``binding``, etc.
+        :param trace_id: Start a new trace with this id.
+        :param parent: Parent span, defaults to the current span.
+        :param attributes: Values to add to the span.
+        :return: The span, None if the tracing is disabled.
+        """
+        if not self.enable:
+            yield None
+            return
+        if trace_id is None:
+            parent = parent or current_span.get()
+            if parent is None:
+                trace_id = uuid.uuid4().hex
+            else:
+                trace_id = parent.trace_id
+        else:
+            parent = None
+        span = Span(
+            name, category, trace_id,
+            parent.span_id if parent else None,
+            attributes,
+        )
+        token = current_span.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.attributes['error'] = repr(err)
+            raise
+        finally:
+            current_span.reset(token)
+            self.record(span)
+
+    def record(self, span: Span):
+        """
+        Add a finished span to the trace.
+
+        :param span: The finished span.
+        :return:
+        """
+        self.events.append({
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': int(span.timestamp * 1_000_000),
+            'dur': int((time.perf_counter() - span.start) * 1_000_000),
+            'pid': os.getpid(),
+            'tid': int(span.trace_id[:8], 16),
+            'args': {
+                'trace_id': span.trace_id,
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                **{k: str(v) for k, v in span.attributes.items()},
+            },
+        })
+
+    def flush(self):
+        """Append the recorded events to the trace file."""
+        events, self.events = self.events, []
+        if not events:
+            return
+        os.makedirs(self.output_directory, exist_ok=True)
+        path = self.path
+        new = not os.path.exists(path)
+        with open(path, 'a') as f:
+            if new:
+                # The closing bracket is optional in the array format, the
+                # events can be appended.
+                f.write('[\n')
+            for event in events:
+                f.write(json.dumps(event) + ',\n')
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await self.app.executor.execute(self.flush)
+
+    async def _on_start(self, _):
+        if self.enable:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _on_stop(self, _):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self.flush()
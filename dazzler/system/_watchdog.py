@@ -0,0 +1,153 @@
+"""Detect the synchronous code blocking the event loop."""
+import asyncio
+import contextlib
+import sys
+import threading
+import time
+import traceback
+import typing
+
+from ..events import DAZZLER_START, DAZZLER_STOP
+
+# Number of frames of the blocked stack to log.
+STACK_LIMIT = 20
+
+
+class LoopWatchdog:
+    """
+    Watch the event loop latency from a thread and report the stalls.
+
+    A heartbeat is scheduled on the loop every interval, when it's late by
+    more than the threshold the thread captures the stack of the loop and
+    the scopes (binding, middleware, route) of the running task. The stall
+    is logged and counted once the loop is released.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(
+        self,
+        app,
+        enable: bool = False,
+        threshold: float = 0.1,
+        interval: float = 0.02,
+    ):
+        """
+        :param app: The dazzler application.
+        :param enable: Start the watchdog with the application.
+        :param threshold: Seconds the loop can be blocked before reporting.
+        :param interval: Seconds between the heartbeats.
+        """
+        self.app = app
+        self.enable = enable
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = app.metrics.counter(
+            'dazzler_loop_stalls_total',
+            'Number of times the event loop was blocked longer than '
+            'the watchdog threshold by scope.',
+            ['scope'],
+        )
+        self.blocked = app.metrics.counter(
+            'dazzler_loop_blocked_seconds_total',
+            'Time the event loop was blocked by scope.',
+            ['scope'],
+        )
+        # Scopes entered by the running tasks.
+        self._scopes: typing.Dict[asyncio.Task, typing.List[str]] = {}
+        self._beats = 0
+        self._beat_time = 0.0
+        self._expected = 0.0
+        # Captured by the thread: heartbeat number, scopes, stack.
+        self._stall: typing.Optional[
+            typing.Tuple[int, typing.List[str], typing.List[str]]
+        ] = None
+        self._handle: typing.Optional[asyncio.TimerHandle] = None
+        self._thread: typing.Optional[threading.Thread] = None
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        app.events.subscribe(DAZZLER_START, self._on_start)
+        app.events.subscribe(DAZZLER_STOP, self._on_stop)
+
+    @contextlib.contextmanager
+    def scope(self, name: str):
+        """
+        Attribute the stalls of the running task to ``name`` in this block.
+
+        :param name: Description of the running code, ``binding clicks@btn``.
+        :return:
+        """
+        if self._thread is None:
+            yield
+            return
+        task = asyncio.current_task()
+        scopes = self._scopes.setdefault(task, [])
+        scopes.append(name)
+        try:
+            yield
+        finally:
+            scopes.pop()
+            if not scopes:
+                self._scopes.pop(task, None)
+
+    def _heartbeat(self):
+        now = self.app.loop.time()
+        lag = now - self._expected
+        stall, self._stall = self._stall, None
+        if stall is not None and stall[0] == self._beats \
+                and lag > self.threshold:
+            self._report(lag, stall[1], stall[2])
+        self._beats += 1
+        self._beat_time = time.monotonic()
+        self._expected = now + self.interval
+        self._handle = self.app.loop.call_at(self._expected, self._heartbeat)
+
+    def _report(self, lag: float, scopes: typing.List[str], stack):
+        scope = ' > '.join(scopes) or 'unknown'
+        self.stalls.inc(scope)
+        self.blocked.inc(scope, amount=lag)
+        self.app.logger.warning(
+            f'Event loop blocked for {lag:.3f}s in {scope}:\n'
+            + ''.join(stack)
+        )
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            beats = self._beats
+            stall = self._stall
+            if stall is not None and stall[0] == beats:
+                # Already captured.
+                continue
+            if time.monotonic() - self._beat_time \
+                    < self.interval + self.threshold:
+                continue
+            frame = sys._current_frames().get(  # pylint: disable=W0212
+                self._thread_id
+            )
+            if frame is None:
+                continue
+            task = asyncio.current_task(self.app.loop)
+            self._stall = (
+                beats,
+                list(self._scopes.get(task, ())),
+                traceback.format_stack(frame, STACK_LIMIT),
+            )
+
+    async def _on_start(self, _):
+        if not self.enable:
+            return
+        self._thread_id = threading.get_ident()
+        self._expected = self.app.loop.time()
+        self._stop.clear()
+        self._heartbeat()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    async def _on_stop(self, _):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._scopes.clear()
@@ -6,6 +6,7 @@ from aiohttp import web
 
 from ._undefined import UNDEFINED
 from ._middleware import Middleware
+from ._timing import server_timing
 from ._page import Page
 from ..events import DAZZLER_SETUP
 
@@ -325,6 +326,7 @@ class AuthMiddleware(Middleware):
     """
     Add the user if authenticated to the request object.
     """
+    timing_name = 'auth'
 
     def __init__(self, app, auth):
         self.app = app
@@ -497,34 +499,38 @@ class DazzlerAuth:
 
         @functools.wraps(func)
         async def auth_page_wrapper(request: web.Request, page: Page):
-            if page.require_login:
-                if not await self.backend.is_authenticated(request):
-                    if self.login_page and redirect:
-                        url = str(
-                            request.app.router[self.login_page.name].url_for()
-                        )
-                        next_url = str(request.url)
-
-                        raise web.HTTPFound(
-                            location=f'{url}?next_url={quote(next_url)}'
-                        )
-                    raise web.HTTPUnauthorized()
-                if page.authorizations:
-                    authorized = False
-                    user = request.get('user')
-                    if user:
-                        authorized = await self.authenticator.authorize(
-                            user,
-                            page
-                        )
-                    if not authorized:
-                        raise web.HTTPForbidden
+            with server_timing(request, 'auth'):
+                await self._check_page(request, page, redirect)
             if handle_page:
                 return await func(request, page)
             return await func(request)
 
         return auth_page_wrapper
 
+    async def _check_page(self, request: web.Request, page: Page, redirect):
+        if page.require_login:
+            if not await self.backend.is_authenticated(request):
+                if self.login_page and redirect:
+                    url = str(
+                        request.app.router[self.login_page.name].url_for()
+                    )
+                    next_url = str(request.url)
+
+                    raise web.HTTPFound(
+                        location=f'{url}?next_url={quote(next_url)}'
+                    )
+                raise web.HTTPUnauthorized()
+            if page.authorizations:
+                authorized = False
+                user = request.get('user')
+                if user:
+                    authorized = await self.authenticator.authorize(
+                        user,
+                        page
+                    )
+                if not authorized:
+                    raise web.HTTPForbidden
+
     def _get_custom_fields(self):
         return [
             {'name': name, 'label': label, 'type': field_type}
@@ -0,0 +1,135 @@
+"""
+Broadcast bus to share ``app.broadcast`` between the processes of an app.
+
+Every process subscribes once to the bus channel and sends the received
+broadcasts to its own connected websockets.
+
+:Configuration:
+    .. code-block:: toml
+
+        [broadcast]
+        backend = 'Redis'
+"""
+import asyncio
+import collections
+import typing
+import uuid
+
+from ..events import DAZZLER_START, DAZZLER_STOP
+
+
+class BroadcastBus:
+    """
+    Publish the broadcasts to the other processes of the application.
+
+    Implement ``send``, ``subscribe``, ``listen`` and ``unsubscribe``.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(self, app, channel: str = 'dazzler_broadcast'):
+        """
+        :param app: The dazzler application.
+        :param channel: Name of the pub/sub channel.
+        """
+        self.app = app
+        self.channel = channel
+        # Identify the messages of this process.
+        self.origin = uuid.uuid4().hex
+        self._task = None
+        app.events.subscribe(DAZZLER_START, self._start)
+        app.events.subscribe(DAZZLER_STOP, self._stop)
+
+    async def publish(self, message: dict, page: typing.Optional[str]):
+        """
+        Publish a broadcast message to the other processes.
+
+        :param message: The message to send to the websockets.
+        :param page: Name of the page to send to, None for all pages.
+        :return:
+        """
+        await self.send(self.app.json.dumps({
+            'origin': self.origin,
+            'page': page,
+            'message': message,
+        }))
+
+    async def receive(self, data: typing.Union[str, bytes]):
+        """
+        Send a published message to the websockets of this process.
+
+        :param data: The published data.
+        :return:
+        """
+        payload = self.app.json.loads(data)
+        if payload['origin'] == self.origin:
+            # Already sent by app.broadcast
+            return
+        await self.app.server.broadcast_message(
+            payload['message'], payload['page']
+        )
+
+    async def send(self, data: str):
+        """
+        Send the data on the channel.
+
+        :param data: Serialized broadcast.
+        :return:
+        """
+        raise NotImplementedError
+
+    async def subscribe(self):
+        """Subscribe to the channel, called once on start."""
+        raise NotImplementedError
+
+    async def listen(self) -> typing.AsyncIterator[typing.Union[str, bytes]]:
+        """Iterate the data received on the channel, an async generator."""
+        raise NotImplementedError
+
+    async def unsubscribe(self):
+        """Unsubscribe from the channel, called on stop."""
+
+    async def _start(self, _):
+        await self.subscribe()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        async for data in self.listen():
+            try:
+                await self.receive(data)
+            except Exception as err:  # pylint: disable=broad-except
+                self.app.logger.exception(err)
+
+    async def _stop(self, _):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.unsubscribe()
+
+
+class MemoryBroadcastBus(BroadcastBus):
+    """
+    Bus shared by the applications of the same process.
+
+    Stand-in for the external pub/sub backends in tests and development.
+    """
+    channels: typing.Dict[str, typing.List[asyncio.Queue]] = \
+        collections.defaultdict(list)
+
+    def __init__(self, app, channel: str = 'dazzler_broadcast'):
+        super().__init__(app, channel)
+        self._queue = asyncio.Queue()
+
+    async def send(self, data: str):
+        for queue in self.channels[self.channel]:
+            queue.put_nowait(data)
+
+    async def subscribe(self):
+        self.channels[self.channel].append(self._queue)
+
+    async def listen(self):
+        while True:
+            yield await self._queue.get()
+
+    async def unsubscribe(self):
+        if self._queue in self.channels[self.channel]:
+            self.channels[self.channel].remove(self._queue)
@@ -0,0 +1,281 @@
+"""
+Metrics of the server, bindings and websockets in the Prometheus text format.
+
+The collectors only update a dict entry, the live values like the number of
+connected websockets are computed when the metrics are scraped.
+
+:Configuration:
+    .. code-block:: toml
+
+        [metrics]
+        enable = true
+
+:Usage:
+    .. code-block:: python
+
+        orders = app.metrics.counter(
+            'app_orders_total', 'Number of orders.', ['product']
+        )
+        orders.inc('book')
+"""
+import bisect
+import collections
+import math
+import os
+import time
+import typing
+
+LabelValues = typing.Tuple[str, ...]
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0
+)
+
+
+def _escape(value) -> str:
+    return str(value) \
+        .replace('\\', '\\\\') \
+        .replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _resident_memory() -> typing.Dict[LabelValues, float]:
+    # Linux only, the metric is empty on the other platforms.
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return {(): pages * os.sysconf('SC_PAGE_SIZE')}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+class Metric:
+    """
+    Base metric with labels.
+
+    The values can be given by a ``collect`` function called on scrape
+    instead of being updated by the application.
+    """
+    kind = ''
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: typing.Sequence[str] = (),
+        collect: typing.Callable[
+            [], typing.Dict[LabelValues, float]
+        ] = None,
+    ):
+        """
+        :param name: Name of the metric.
+        :param description: Help text of the metric.
+        :param labels: Names of the labels.
+        :param collect: Function returning the values by labels values.
+        """
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self.collect = collect
+        self.values: typing.Dict[LabelValues, float] = \
+            collections.defaultdict(float)
+
+    def _labels(self, values: LabelValues, extra: str = '') -> str:
+        pairs = [
+            f'{name}="{_escape(value)}"'
+            for name, value in zip(self.labels, values)
+        ]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def samples(self) -> typing.Iterator[str]:
+        values = self.collect() if self.collect else self.values
+        for label_values, value in values.items():
+            yield f'{self.name}{self._labels(label_values)} ' \
+                  f'{_format_value(value)}'
+
+    def render(self) -> str:
+        return '\n'.join((
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} {self.kind}',
+            *self.samples(),
+        ))
+
+
+class Counter(Metric):
+    """A value that only goes up."""
+    kind = 'counter'
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] += amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+    kind = 'gauge'
+
+    def set(self, value: float, *labels: str):
+        self.values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] += amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.values[labels] -= amount
+
+
+class Histogram(Metric):
+    """Count the observed values in buckets."""
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: typing.Sequence[str] = (),
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        :param name: Name of the metric.
+        :param description: Help text of the metric.
+        :param labels: Names of the labels.
+        :param buckets: Upper bounds of the buckets.
+        """
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Counts by bucket (not cumulative) with +Inf last, sum.
+        self.observations: typing.Dict[
+            LabelValues, typing.Tuple[typing.List[int], typing.List[float]]
+        ] = {}
+
+    def observe(self, value: float, *labels: str):
+        observation = self.observations.get(labels)
+        if observation is None:
+            observation = self.observations[labels] = (
+                [0] * (len(self.buckets) + 1), [0.0]
+            )
+        counts, total = observation
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def time(self, *labels: str) -> 'Timer':
+        """
+        Observe the duration of a block.
+
+        .. code-block:: python
+
+            with histogram.time('label'):
+                await work()
+
+        :param labels: Values of the labels.
+        :return:
+        """
+        return Timer(self, labels)
+
+    def samples(self):
+        for labels, (counts, total) in self.observations.items():
+            cumulative = 0
+            for bound, count in zip(
+                    (*self.buckets, math.inf), counts
+            ):
+                cumulative += count
+                bucket = self._labels(
+                    labels, f'le="{_format_value(bound)}"'
+                )
+                yield f'{self.name}_bucket{bucket} {cumulative}'
+            yield f'{self.name}_sum{self._labels(labels)} ' \
+                  f'{_format_value(total[0])}'
+            yield f'{self.name}_count{self._labels(labels)} {cumulative}'
+
+
+class Timer:
+    """Context manager observing the elapsed time in a histogram."""
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        self.histogram.observe(
+            time.perf_counter() - self.start, *self.labels
+        )
+
+
+class Metrics:
+    """
+    Registry of the application metrics, available as ``app.metrics``.
+
+    Served on ``/dazzler/metrics`` when ``metrics.enable`` is set.
+    """
+    #: Content type of the rendered metrics.
+    content_type = 'text/plain; version=0.0.4'
+
+    def __init__(self):
+        self._metrics: typing.Dict[str, Metric] = {}
+
+        self.request_duration = self.histogram(
+            'dazzler_request_duration_seconds',
+            'Duration of the requests by route, the duration of the '
+            'connection for the websockets.',
+            ['route'],
+        )
+        self.binding_duration = self.histogram(
+            'dazzler_binding_duration_seconds',
+            'Execution time of the bindings by trigger.',
+            ['trigger'],
+        )
+        self.binding_errors = self.counter(
+            'dazzler_binding_errors_total',
+            'Number of bindings that raised an error by trigger.',
+            ['trigger'],
+        )
+        self.session_duration = self.histogram(
+            'dazzler_session_operation_duration_seconds',
+            'Duration of the session backend operations.',
+            ['operation'],
+        )
+        self.gauge(
+            'process_resident_memory_bytes',
+            'Resident memory size of the process.',
+            collect=_resident_memory,
+        )
+
+    def add(self, metric: Metric) -> Metric:
+        """
+        Add a metric to the registry.
+
+        :param metric: The metric to add, replace the metric with the
+            same name.
+        :return: The metric.
+        """
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, description, labels=(), collect=None) -> Counter:
+        return self.add(Counter(name, description, labels, collect))
+
+    def gauge(self, name, description, labels=(), collect=None) -> Gauge:
+        return self.add(Gauge(name, description, labels, collect))
+
+    def histogram(
+        self, name, description, labels=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.add(Histogram(name, description, labels, buckets))
+
+    def render(self) -> str:
+        """Format all the metrics in the Prometheus text format."""
+        return '\n'.join(x.render() for x in self._metrics.values()) + '\n'
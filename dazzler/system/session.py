@@ -1,13 +1,14 @@
 import asyncio
-import json
+import logging
 import os
 import time
-import weakref
 import uuid
+import weakref
+import zlib
 import enum
 import base64
 
-from typing import Any, Optional
+from typing import Any, Optional, List
 
 from itsdangerous import Signer, BadSignature
 from aiohttp import web
@@ -15,12 +16,15 @@ from aiohttp import web
 from ..errors import SessionError
 from ._middleware import Middleware
 from ._undefined import UNDEFINED
+from ._tracing import current_span
 
 
 class SessionAction(enum.Enum):
     GET = 1
     SET = 2
     DELETE = 3
+    LOAD = 4
+    SAVE = 5
 
 
 class Session:
@@ -28,19 +32,71 @@ class Session:
     Session object available in requests by the middleware
 
     Access with ``request['session']``. Or from binding: ``context.session``
+
+    With ``cache``, the data of the session is loaded once and the reads are
+    served from memory, the writes are buffered and saved in one batch after
+    ``flush_delay`` and at the end of the request or websocket connection.
     """
 
     def __init__(
             self,
             session_id: str,
             query_queue: asyncio.Queue,
+            cache: bool = False,
+            flush_delay: float = 0.1,
+            cache_duration: float = 1.0,
+            peers: Optional[weakref.WeakSet] = None,
+            logger: Optional[logging.Logger] = None,
     ):
         """
         :param session_id: The session id to perform operations.
-        :param query_queue: To send commands up.
+        :param query_queue: To send commands up, the queue of the worker
+            handling the session.
+        :param cache: Cache the data and buffer the writes.
+        :param flush_delay: Seconds to buffer the writes for, 0 to save
+            every write.
+        :param cache_duration: Seconds before the data is loaded again, for
+            the changes of the other processes.
+        :param peers: The other cached sessions with the same id, updated
+            with the saved writes.
+        :param logger: Log the errors of the delayed flushes.
         """
         self.session_id = session_id
         self._query_queue = query_queue
+        self._cache = cache
+        self._flush_delay = flush_delay
+        self._cache_duration = cache_duration
+        self._peers = peers
+        self._logger = logger or logging.getLogger(__name__)
+        # Loaded values, None until loaded.
+        self._data: Optional[dict] = None
+        # The backend can't load all the keys, load them one by one.
+        self._partial = False
+        self._loaded_at = 0.0
+        # Pending writes, UNDEFINED for the deletes.
+        self._writes = {}
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        if peers is not None:
+            peers.add(self)
+
+    async def _query(self, action: SessionAction, key, arg=None):
+        queue = asyncio.Queue()
+        await self._query_queue.put(
+            (action, self.session_id, key,
+             queue if arg is None else (*arg, queue),
+             current_span.get())
+        )
+        value, error = await queue.get()
+        if error is not None:
+            raise error
+        return value
+
+    async def _load(self):
+        data = await self._query(SessionAction.LOAD, None)
+        self._partial = data is None
+        self._data = data or {}
+        self._loaded_at = time.monotonic()
 
     async def get(self, key: str) -> Any:
         """
@@ -49,11 +105,17 @@ class Session:
         :param key: The item to fetch.
         :return: The value of the key for the session.
         """
-        queue = asyncio.Queue()
-        await self._query_queue.put(
-            (SessionAction.GET, self.session_id, key, queue)
-        )
-        return await queue.get()
+        if not self._cache:
+            return await self._query(SessionAction.GET, key)
+
+        if key in self._writes:
+            return self._writes[key]
+        if self._data is None or \
+                time.monotonic() - self._loaded_at > self._cache_duration:
+            await self._load()
+        if self._partial and key not in self._data:
+            self._data[key] = await self._query(SessionAction.GET, key)
+        return self._data.get(key, UNDEFINED)
 
     async def set(self, key: str, value: Any):
         """
@@ -63,8 +125,12 @@ class Session:
         :param value: The value to set.
         :return:
         """
+        if self._cache:
+            await self._write(key, value)
+            return
         await self._query_queue.put(
-            (SessionAction.SET, self.session_id, key, value)
+            (SessionAction.SET, self.session_id, key, value,
+             current_span.get())
         )
 
     async def delete(self, key):
@@ -74,8 +140,12 @@ class Session:
         :param key: Key to delete.
         :return:
         """
+        if self._cache:
+            await self._write(key, UNDEFINED)
+            return
         await self._query_queue.put(
-            (SessionAction.DELETE, self.session_id, key, 0)
+            (SessionAction.DELETE, self.session_id, key, 0,
+             current_span.get())
         )
 
     async def pop(self, key):
@@ -89,6 +159,70 @@ class Session:
         await self.delete(key)
         return data
 
+    async def _write(self, key, value):
+        self._writes[key] = value
+        if self._flush_delay <= 0:
+            await self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_event_loop().call_later(
+                self._flush_delay, self._start_flush
+            )
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        try:
+            await self.flush()
+        except Exception as error:  # pylint: disable=broad-except
+            # The writes are kept for the next flush.
+            self._logger.error(
+                f'Session flush failed for {self.session_id}: {error!r}'
+            )
+
+    async def close(self):
+        """
+        Wait for the running delayed flush and save the buffered writes.
+
+        :return:
+        """
+        task = self._flush_task
+        if task is not None and not task.done():
+            await task
+        await self.flush()
+
+    async def flush(self):
+        """
+        Save the buffered writes and wait until they are saved.
+
+        Only the written keys are saved, the keys written by the other
+        requests of the session are kept.
+
+        :return:
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._writes:
+            return
+        writes, self._writes = self._writes, {}
+        if self._data is not None:
+            self._data.update(writes)
+        try:
+            await self._query(SessionAction.SAVE, None, (
+                {k: v for k, v in writes.items() if v is not UNDEFINED},
+                [k for k, v in writes.items() if v is UNDEFINED],
+            ))
+        except Exception:
+            for key, value in writes.items():
+                self._writes.setdefault(key, value)
+            raise
+        for session in self._peers or ():
+            # pylint: disable=protected-access
+            if session is not self and session._data is not None:
+                session._data.update(writes)
+
 
 class SessionBackEnd:
     """
@@ -132,6 +266,56 @@ class SessionBackEnd:
         """
         raise NotImplementedError
 
+    async def get_many(self, session_id: str, keys: List[str]) -> dict:
+        """
+        Get many keys for the session id.
+
+        :param session_id: Session to fetch the data for.
+        :param keys: Keys to get.
+        :return: The values by key, UNDEFINED for the missing keys.
+        """
+        return {key: await self.get(session_id, key) for key in keys}
+
+    async def set_many(self, session_id: str, values: dict):
+        """
+        Set many keys for the session id.
+
+        :param session_id: Session to set the data for.
+        :param values: Values to set by key.
+        :return:
+        """
+        for key, value in values.items():
+            await self.set(session_id, key, value)
+
+    # The base backend has no bulk load, the sessions fall back to ``get``.
+    async def load_all(  # pylint: disable=no-self-use,unused-argument
+            self, session_id: str
+    ) -> Optional[dict]:
+        """
+        Load all the keys of a session for the session cache.
+
+        :param session_id: Session to load.
+        :return: The values by key, None if not supported then the keys are
+            loaded one by one with ``get``.
+        """
+        return None
+
+    async def save_many(
+            self, session_id: str, values: dict, deleted: List[str]
+    ):
+        """
+        Save the buffered writes of a session, only the given keys must be
+        changed.
+
+        :param session_id: Session to save.
+        :param values: Values to set by key.
+        :param deleted: Keys to delete.
+        :return:
+        """
+        await self.set_many(session_id, values)
+        for key in deleted:
+            await self.delete(session_id, key)
+
     async def on_new_session(self, session_id: str):
         """Called when a new session is created. Override to handle."""
 
@@ -158,7 +342,7 @@ class FileSessionBackEnd(SessionBackEnd):
         await self.acquire(session_id)
 
         with open(self._session_path(session_id), 'w') as f:
-            json.dump(data, f)
+            f.write(self.app.json.dumps(data))
 
         self.release(session_id)
 
@@ -170,7 +354,7 @@ class FileSessionBackEnd(SessionBackEnd):
         await self.acquire(session_id)
 
         with open(path) as f:
-            data = json.load(f)
+            data = self.app.json.loads(f.read())
 
         os.utime(path, None)
 
@@ -205,6 +389,21 @@ class FileSessionBackEnd(SessionBackEnd):
         data.pop(key)
         await self.save(session_id, data)
 
+    async def load_all(self, session_id: str) -> dict:
+        data = await self.load(session_id)
+        return {} if data is UNDEFINED else data
+
+    async def save_many(
+            self, session_id: str, values: dict, deleted: List[str]
+    ):
+        data = await self.load(session_id)
+        if data is UNDEFINED:
+            data = {}
+        data.update(values)
+        for key in deleted:
+            data.pop(key, None)
+        await self.save(session_id, data)
+
     def release(self, session_id: str):
         os.remove(self._session_path(session_id, lock=True))
 
@@ -237,6 +436,7 @@ class SessionMiddleware(Middleware):
     Insert session objects into requests.
     """
     _backend: SessionBackEnd
+    timing_name = 'session'
 
     def __init__(self, app, backend=None):
         """
@@ -257,13 +457,26 @@ class SessionMiddleware(Middleware):
             salt=app.config.session.salt
         )
         self._backend = backend or FileSessionBackEnd(app)
-        # pylint: disable=E1121
-        self._sessions_queues = weakref.WeakValueDictionary()
-        self._query_queue = asyncio.Queue()
+        # The operations of a session always go to the same worker so they
+        # run in order, the other sessions are not blocked by a slow call.
+        self._query_queues = [
+            asyncio.Queue()
+            for _ in range(max(1, app.config.session.workers))
+        ]
         loop = asyncio.get_event_loop()
         self._handlers = [
-            loop.create_task(self._handle_queries()),
+            loop.create_task(self._handle_queries(queue))
+            for queue in self._query_queues
         ]
+        app.metrics.gauge(
+            'dazzler_session_queued_operations',
+            'Number of session operations waiting for a worker.',
+            collect=lambda: {
+                (): sum(x.qsize() for x in self._query_queues)
+            },
+        )
+        # Cached sessions of the running requests by session id.
+        self._peers = {}
         self.app.events.subscribe('dazzler_stop', self._on_stop)
 
     def verify_session(self, session_id):
@@ -271,16 +484,50 @@ class SessionMiddleware(Middleware):
         session, created = unsigned.split('#')
         return session, int(base64.b64decode(created))
 
-    async def _handle_queries(self):
+    def get_query_queue(self, session_id: str) -> asyncio.Queue:
+        """
+        Get the queue of the worker handling a session.
+
+        :param session_id: The session id.
+        :return:
+        """
+        return self._query_queues[
+            zlib.crc32(session_id.encode()) % len(self._query_queues)
+        ]
+
+    async def _handle_queries(self, queue: asyncio.Queue):
         while not self.app.stop_event.is_set():
-            action, session_id, key, arg = await self._query_queue.get()
-            if action == SessionAction.GET:
-                data = await self._backend.get(session_id, key)
-                await arg.put(data)
-            elif action == SessionAction.SET:
-                await self._backend.set(session_id, key, arg)
-            elif action == SessionAction.DELETE:
-                await self._backend.delete(session_id, key)
+            action, session_id, key, arg, span = await queue.get()
+            operation = action.name.lower()
+            try:
+                with self.app.metrics.session_duration.time(operation), \
+                        self.app.tracer.span(
+                            f'session {operation}', 'session',
+                            parent=span, key=key,
+                        ):
+                    if action == SessionAction.GET:
+                        data = await self._backend.get(session_id, key)
+                        await arg.put((data, None))
+                    elif action == SessionAction.SET:
+                        await self._backend.set(session_id, key, arg)
+                    elif action == SessionAction.DELETE:
+                        await self._backend.delete(session_id, key)
+                    elif action == SessionAction.LOAD:
+                        data = await self._backend.load_all(session_id)
+                        await arg.put((data, None))
+                    elif action == SessionAction.SAVE:
+                        values, deleted, response = arg
+                        await self._backend.save_many(
+                            session_id, values, deleted
+                        )
+                        await response.put((None, None))
+            except Exception as error:  # pylint: disable=broad-except
+                # Keep the worker alive for the other sessions.
+                self.app.logger.exception(error)
+                if action in (SessionAction.GET, SessionAction.LOAD):
+                    await arg.put((None, error))
+                elif action == SessionAction.SAVE:
+                    await arg[-1].put((None, error))
 
     def _set_session(self, session_id: str = None):
         new_session = False
@@ -320,13 +567,51 @@ class SessionMiddleware(Middleware):
                 session_id, callback = self._set_session()
                 self.app.logger.exception(error)
 
-        request['session'] = Session(
+        config = self.app.config.session
+        if not config.cache:
+            request['session'] = Session(
+                session_id,
+                self.get_query_queue(session_id),
+            )
+            return callback
+
+        peers = self._peers.get(session_id)
+        if peers is None:
+            peers = self._peers[session_id] = weakref.WeakSet()
+        session = Session(
             session_id,
-            self._query_queue,
+            self.get_query_queue(session_id),
+            cache=True,
+            flush_delay=config.flush_delay,
+            cache_duration=config.cache_duration,
+            peers=peers,
+            logger=self.app.logger,
         )
+        weakref.finalize(session, self._remove_peers, session_id)
+        request['session'] = session
+
+        async def flush(response):
+            if callback:
+                await callback(response)
+            await session.flush()
 
-        return callback
+        return flush
+
+    def _remove_peers(self, session_id: str):
+        peers = self._peers.get(session_id)
+        # The reference of the finalized session may not be removed yet,
+        # the iteration only yields the live sessions.
+        if peers is not None and not list(peers):
+            del self._peers[session_id]
 
     async def _on_stop(self, _):
+        # Save the writes of the cached sessions before the workers stop.
+        sessions = [x for peers in self._peers.values() for x in list(peers)]
+        results = await asyncio.gather(
+            *(x.close() for x in sessions), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.app.logger.error(result)
         for handler in self._handlers:
             handler.cancel()
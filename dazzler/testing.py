@@ -0,0 +1,408 @@
+"""
+Test the bindings of a page in process, without a browser.
+
+The :py:class:`BindingTestClient` serves the application on an aiohttp test
+server and connects to the page websocket like the renderer does. It keeps
+the aspects of the page components, answers the ``get-aspect`` and storage
+requests of the bindings and applies their ``set-aspect`` updates.
+
+.. code-block:: python
+
+    async with BindingTestClient(app, page) as client:
+        client.set_aspects('input', value='hello')
+        await client.trigger('btn', 'clicks', 1)
+        assert client.get_aspect('output', 'children') == 'hello'
+"""
+import asyncio
+import collections
+import dataclasses
+import json
+import logging
+import os
+import re
+import time
+import typing
+
+from aiohttp import client, WSMsgType
+from aiohttp.test_utils import TestServer
+
+from .errors import BindingError
+from .system import Page
+from .system._page import collect_aspects
+
+
+class _ErrorCollector(logging.Handler):
+    """Collect the exceptions logged by the server."""
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.errors: typing.List[BaseException] = []
+
+    def emit(self, record: logging.LogRecord):
+        if record.exc_info and record.exc_info[1] is not None:
+            self.errors.append(record.exc_info[1])
+        elif isinstance(record.msg, BaseException):
+            self.errors.append(record.msg)
+
+
+@dataclasses.dataclass
+class _ConnectionState:
+    """Websocket connection of the client and what it received."""
+    #: Server side connection of the page websocket.
+    connection: typing.Any = None
+    receiver: typing.Optional[asyncio.Task] = None
+    #: Pings waiting for their pong.
+    pongs: typing.Deque[asyncio.Future] = dataclasses.field(
+        default_factory=collections.deque
+    )
+    #: Messages received and handled.
+    received: int = 0
+    errors: _ErrorCollector = dataclasses.field(
+        default_factory=_ErrorCollector
+    )
+
+
+class BindingTestClient:
+    """
+    A simulated browser connected to a page of the application.
+
+    - The aspects of the components start with the values of the page layout,
+      change them with :py:meth:`set_aspects` before triggering a binding.
+    - :py:meth:`trigger` sends a binding message with the states values
+      (or calls the page for ``page.call`` bindings) and waits until the
+      bindings and the bindings they triggered are done.
+    - The aspects set by the bindings trigger the bindings bound to them like
+      the renderer, the ties and transforms are not applied.
+    - ``get_local_storage`` and ``get_session_storage`` use :py:attr:`storage`.
+
+    An exception raised by a binding is raised by :py:meth:`trigger`.
+
+    :type app: dazzler.Dazzler
+    """
+    def __init__(
+        self,
+        app,
+        page: Page,
+        timeout: float = 5.0,
+        initial: bool = True,
+    ):
+        """
+        :param app: The dazzler application, the page is added if needed.
+        :param page: The page to connect to.
+        :param timeout: Seconds to wait for the bindings of a trigger.
+        :param initial: Trigger the bindings of the layout aspects on start
+            like the renderer.
+        """
+        self.app = app
+        self.page = page
+        self.timeout = timeout
+        self.initial = initial
+        #: Aspects of the components by identity.
+        self.aspects: typing.Dict[str, dict] = {}
+        #: Local and session storage.
+        self.storage: typing.Dict[str, dict] = {'local': {}, 'session': {}}
+        #: Every aspects update received.
+        self.updates: typing.List[dict] = []
+        #: Seconds taken by the last trigger.
+        self.duration = 0.0
+        self.bindings: typing.Dict[str, dict] = {}
+        self.regex_bindings: typing.List[dict] = []
+        self.server: typing.Optional[TestServer] = None
+        self.session: typing.Optional[client.ClientSession] = None
+        self.ws: typing.Optional[client.ClientWebSocketResponse] = None
+        self._state = _ConnectionState()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @property
+    def url(self) -> str:
+        return str(self.server.make_url(self.page.url))
+
+    async def start(self):
+        """Start the test server and connect to the page."""
+        if self.page.name not in self.app.pages:
+            self.app.add_page(self.page)
+        # The requirements are not needed without a browser, only the static
+        # route directory.
+        os.makedirs(
+            self.app.config.requirements.static_directory
+            or self.app.requirements_dir,
+            exist_ok=True,
+        )
+        await self.app.setup_server(copy_requirements=False)
+        self.app.logger.addHandler(self._state.errors)
+        logging.getLogger('aiohttp.server').addHandler(self._state.errors)
+
+        self.server = TestServer(self.app.server.app)
+        await self.server.start_server()
+        self.session = client.ClientSession()
+
+        async with self.session.post(self.url) as response:
+            payload = await response.json()
+        collect_aspects(payload['layout'], self.aspects)
+        for binding in payload['bindings'].values():
+            if binding['regex']:
+                self.regex_bindings.append(binding)
+            else:
+                self.bindings[binding['key']] = binding
+
+        connections = self.app.server.connections[self.page.name]
+        existing = set(connections)
+        self.ws = await self.session.ws_connect(
+            str(self.server.make_url(f'/{self.page.name}/ws')),
+            autoping=False,
+        )
+        # The handler registers the connection before its first await.
+        while True:
+            new = set(connections) - existing
+            if new:
+                self._state.connection = new.pop()
+                break
+            await asyncio.sleep(0)
+        self._state.receiver = asyncio.ensure_future(self._receive())
+
+        if self.initial:
+            start = time.perf_counter()
+            for identity, aspects in list(self.aspects.items()):
+                await self._fire(identity, aspects, initial=True)
+            await self._wait(start)
+
+    async def close(self):
+        """Disconnect and stop the test server."""
+        if self.ws is not None:
+            await self.ws.close()
+        if self._state.receiver is not None:
+            self._state.receiver.cancel()
+        if self.session is not None:
+            await self.session.close()
+        if self.server is not None:
+            await self.server.close()
+        self.app.logger.removeHandler(self._state.errors)
+        logging.getLogger('aiohttp.server').removeHandler(self._state.errors)
+
+    def set_aspects(self, identity: str, **aspects):
+        """
+        Set aspects of a component without triggering the bindings.
+
+        :param identity: Identity of the component.
+        :param aspects: Aspects values.
+        :return:
+        """
+        self.aspects.setdefault(identity, {}).update(aspects)
+
+    def get_aspect(self, identity: str, aspect: str, default=None):
+        """
+        Get the current value of an aspect.
+
+        :param identity: Identity of the component.
+        :param aspect: Name of the aspect.
+        :param default: Value if the aspect is not set.
+        :return:
+        """
+        return self.aspects.get(identity, {}).get(aspect, default)
+
+    async def trigger(
+        self, identity: str, aspect: str, value=None
+    ) -> typing.List[dict]:
+        """
+        Set the aspect and wait for the bindings it triggers.
+
+        :param identity: Identity of the trigger component.
+        :param aspect: Name of the trigger aspect.
+        :param value: New value of the aspect.
+        :raise BindingError: If no binding is triggered by the aspect.
+        :return: The aspects updates received, ``identity``, ``payload`` and
+            ``regex``.
+        """
+        self._state.errors.errors.clear()
+        count = len(self.updates)
+        start = time.perf_counter()
+        self.set_aspects(identity, **{aspect: value})
+        if not await self._fire(identity, {aspect: value}):
+            raise BindingError(f'No binding for {aspect}@{identity}')
+        await self._wait(start)
+        return self.updates[count:]
+
+    async def _wait(self, start: float):
+        await asyncio.wait_for(self._wait_idle(), self.timeout)
+        self.duration = time.perf_counter() - start
+        if self._state.errors.errors:
+            raise self._state.errors.errors[0]
+
+    async def _ping(self):
+        # The pong is sent once the previous messages are handled.
+        future = asyncio.get_event_loop().create_future()
+        self._state.pongs.append(future)
+        await self.ws.ping()
+        await future
+
+    async def _wait_idle(self):
+        binding_tasks = self.app.server.binding_tasks
+        while True:
+            received = self._state.received
+            # The binding tasks of the messages sent are created.
+            await self._ping()
+            running = [
+                x for x in self._state.connection.pendings
+                if x in binding_tasks and not x.done()
+            ]
+            if running:
+                await asyncio.wait(running)
+            await self._state.connection.outbox.join()
+            # Every update sent is received and handled.
+            await self._ping()
+            if not running and received == self._state.received:
+                return
+
+    def _matching_bindings(self, identity: str, aspects: dict):
+        for aspect, value in aspects.items():
+            binding = self.bindings.get(f'{aspect}@{identity}')
+            if binding:
+                yield binding, aspect, value
+        for binding in self.regex_bindings:
+            trigger = binding['trigger']
+            if not re.search(trigger['identity'], identity):
+                continue
+            for aspect, value in aspects.items():
+                if re.search(trigger['aspect'], aspect):
+                    yield binding, aspect, value
+
+    async def _fire(self, identity: str, aspects: dict, initial=False) -> int:
+        fired = 0
+        for binding, aspect, value in list(
+                self._matching_bindings(identity, aspects)
+        ):
+            trigger = binding['trigger']
+            if initial and trigger['skip_initial']:
+                continue
+            if trigger['once']:
+                if binding['regex']:
+                    self.regex_bindings.remove(binding)
+                else:
+                    self.bindings.pop(binding['key'], None)
+            fired += 1
+            message = {
+                'kind': 'binding',
+                'key': binding['key'],
+                'page': self.page.name,
+                'trigger': {
+                    **trigger,
+                    'identity': identity,
+                    'aspect': aspect,
+                    'value': value,
+                },
+                'states': self._states(binding),
+            }
+            if binding['call']:
+                await self._call(message)
+            else:
+                await self.ws.send_str(json.dumps(message))
+        return fired
+
+    def _states(self, binding: dict) -> typing.List[dict]:
+        states = []
+        for state in binding['states']:
+            if state['regex']:
+                for identity, aspects in self.aspects.items():
+                    if not re.search(state['identity'], identity):
+                        continue
+                    states.extend(
+                        {**state, 'identity': identity, 'aspect': k,
+                         'value': v}
+                        for k, v in aspects.items()
+                        if re.search(state['aspect'], k)
+                    )
+                continue
+            component = self.aspects.get(state['identity'], {})
+            if state['aspect'] in component:
+                state = {**state, 'value': component[state['aspect']]}
+            states.append(state)
+        return states
+
+    async def _call(self, message: dict):
+        async with self.session.patch(
+                self.url, data=json.dumps(message)
+        ) as response:
+            if response.status != 200:
+                if self._state.errors.errors:
+                    raise self._state.errors.errors[0]
+                raise BindingError(
+                    f'Call {message["key"]} failed: {response.status} '
+                    f'{await response.text()}'
+                )
+            output = (await response.json())['output']
+        for identity, payload in output.items():
+            await self._set_aspects(
+                {'identity': identity, 'payload': payload, 'regex': False}
+            )
+
+    async def _set_aspects(self, update: dict):
+        self._state.received += 1
+        self.updates.append(update)
+        if update.get('regex'):
+            identities = [
+                x for x in self.aspects
+                if re.search(update['identity'], x)
+            ]
+        else:
+            identities = [update['identity']]
+        for identity in identities:
+            self.set_aspects(identity, **update['payload'])
+            await self._fire(identity, update['payload'])
+
+    async def _reply(self, data: dict, **reply):
+        await self.ws.send_str(json.dumps({
+            'kind': data['kind'],
+            'identity': data['identity'],
+            'request_id': data['request_id'],
+            **reply,
+        }))
+
+    async def _receive(self):
+        async for msg in self.ws:
+            if msg.type == WSMsgType.PONG:
+                self._state.pongs.popleft().set_result(True)
+                continue
+            if msg.type == WSMsgType.PING:
+                await self.ws.pong(msg.data)
+                continue
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = json.loads(msg.data)
+            kind = data.get('kind')
+            if kind == 'set-aspect':
+                data.pop('kind')
+                await self._set_aspects(data)
+            elif kind == 'set-aspects':
+                for update in data['updates']:
+                    await self._set_aspects(update)
+            elif kind == 'get-aspect':
+                self._state.received += 1
+                component = self.aspects.get(data['identity'])
+                if component is None:
+                    await self._reply(
+                        data, aspect=data['aspect'],
+                        error=f'Aspect not found '
+                              f'{data["identity"]}.{data["aspect"]}',
+                    )
+                elif data['aspect'] in component:
+                    await self._reply(
+                        data, aspect=data['aspect'],
+                        value=component[data['aspect']],
+                    )
+                else:
+                    await self._reply(data, aspect=data['aspect'])
+            elif kind == 'get-storage':
+                self._state.received += 1
+                await self._reply(
+                    data,
+                    value=self.storage[data['storage']].get(data['identity']),
+                )
+            elif kind == 'set-storage':
+                self._state.received += 1
+                self.storage[data['storage']][data['identity']] = \
+                    data['payload']
@@ -6,6 +6,8 @@ setup(
         'electron': [
             'PyInstaller==4.7'
         ],
-        'postgresql': ['aiopg==1.3.3']
+        'postgresql': ['aiopg==1.3.3'],
+        'msgpack': ['msgpack>=1.0.0'],
+        'orjson': ['orjson>=3.6.0'],
     }
 )
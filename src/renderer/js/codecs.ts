@@ -0,0 +1,359 @@
+/* eslint-disable no-magic-numbers */
+/**
+ * Websocket messages codecs.
+ *
+ * The codec is negotiated with the server as a websocket subprotocol,
+ * json is used if the server doesn't support any other codec.
+ */
+import {WebsocketCodec} from './types';
+
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder();
+
+const UINT32 = 0x100000000;
+
+class Writer {
+    private buffer: Uint8Array;
+    private view: DataView;
+    private offset: number;
+
+    constructor(size = 1024) {
+        this.buffer = new Uint8Array(size);
+        this.view = new DataView(this.buffer.buffer);
+        this.offset = 0;
+    }
+
+    private ensure(size: number) {
+        const needed = this.offset + size;
+        if (needed > this.buffer.length) {
+            const buffer = new Uint8Array(
+                Math.max(needed, this.buffer.length * 2)
+            );
+            buffer.set(this.buffer);
+            this.buffer = buffer;
+            this.view = new DataView(buffer.buffer);
+        }
+    }
+
+    u8(value: number) {
+        this.ensure(1);
+        this.view.setUint8(this.offset, value);
+        this.offset += 1;
+    }
+
+    u16(value: number) {
+        this.ensure(2);
+        this.view.setUint16(this.offset, value);
+        this.offset += 2;
+    }
+
+    u32(value: number) {
+        this.ensure(4);
+        this.view.setUint32(this.offset, value);
+        this.offset += 4;
+    }
+
+    i32(value: number) {
+        this.ensure(4);
+        this.view.setInt32(this.offset, value);
+        this.offset += 4;
+    }
+
+    f64(value: number) {
+        this.ensure(8);
+        this.view.setFloat64(this.offset, value);
+        this.offset += 8;
+    }
+
+    bytes(value: Uint8Array) {
+        this.ensure(value.length);
+        this.buffer.set(value, this.offset);
+        this.offset += value.length;
+    }
+
+    header(size: number, fix: number, fixMax: number, type16: number) {
+        if (size < fixMax) {
+            this.u8(fix | size);
+        } else if (size <= 0xffff) {
+            this.u8(type16);
+            this.u16(size);
+        } else {
+            this.u8(type16 + 1);
+            this.u32(size);
+        }
+    }
+
+    result(): Uint8Array {
+        return this.buffer.subarray(0, this.offset);
+    }
+}
+
+// Values that are left out of objects by JSON.stringify.
+const isSkipped = (value: any): boolean =>
+    value === undefined || typeof value === 'function';
+
+function encodeNumber(writer: Writer, value: number) {
+    if (!Number.isFinite(value)) {
+        // Same as json.
+        writer.u8(0xc0);
+    } else if (!Number.isSafeInteger(value)) {
+        writer.u8(0xcb);
+        writer.f64(value);
+    } else if (value >= 0) {
+        if (value < 0x80) {
+            writer.u8(value);
+        } else if (value <= 0xff) {
+            writer.u8(0xcc);
+            writer.u8(value);
+        } else if (value <= 0xffff) {
+            writer.u8(0xcd);
+            writer.u16(value);
+        } else if (value < UINT32) {
+            writer.u8(0xce);
+            writer.u32(value);
+        } else {
+            writer.u8(0xcf);
+            writer.u32(Math.floor(value / UINT32));
+            writer.u32(value % UINT32);
+        }
+    } else if (value >= -0x20) {
+        writer.u8(value & 0xff);
+    } else if (value >= -0x80) {
+        writer.u8(0xd0);
+        writer.u8(value & 0xff);
+    } else if (value >= -0x8000) {
+        writer.u8(0xd1);
+        writer.u16(value & 0xffff);
+    } else if (value >= -0x80000000) {
+        writer.u8(0xd2);
+        writer.i32(value);
+    } else {
+        const high = Math.floor(value / UINT32);
+        writer.u8(0xd3);
+        writer.i32(high);
+        writer.u32(value - high * UINT32);
+    }
+}
+
+function encodeString(writer: Writer, value: string) {
+    const data = textEncoder.encode(value);
+    if (data.length < 32) {
+        writer.u8(0xa0 | data.length);
+    } else if (data.length <= 0xff) {
+        writer.u8(0xd9);
+        writer.u8(data.length);
+    } else {
+        writer.header(data.length, 0xa0, 0, 0xda);
+    }
+    writer.bytes(data);
+}
+
+function encodeValue(writer: Writer, value: any) {
+    if (value === null || isSkipped(value)) {
+        writer.u8(0xc0);
+    } else if (value === false) {
+        writer.u8(0xc2);
+    } else if (value === true) {
+        writer.u8(0xc3);
+    } else if (typeof value === 'number') {
+        encodeNumber(writer, value);
+    } else if (typeof value === 'string') {
+        encodeString(writer, value);
+    } else if (value instanceof Uint8Array) {
+        writer.header(value.length, 0, 0, 0xc5);
+        writer.bytes(value);
+    } else if (Array.isArray(value)) {
+        writer.header(value.length, 0x90, 16, 0xdc);
+        value.forEach((v) => encodeValue(writer, v));
+    } else if (typeof value.toJSON === 'function') {
+        encodeValue(writer, value.toJSON());
+    } else if (typeof value === 'object') {
+        const entries = Object.keys(value).filter((k) => !isSkipped(value[k]));
+        writer.header(entries.length, 0x80, 16, 0xde);
+        entries.forEach((k) => {
+            encodeString(writer, k);
+            encodeValue(writer, value[k]);
+        });
+    } else {
+        writer.u8(0xc0);
+    }
+}
+
+class Reader {
+    private readonly data: Uint8Array;
+    private readonly view: DataView;
+    private offset: number;
+
+    constructor(data: Uint8Array) {
+        this.data = data;
+        this.view = new DataView(data.buffer, data.byteOffset, data.length);
+        this.offset = 0;
+    }
+
+    private move(size: number): number {
+        const offset = this.offset;
+        this.offset += size;
+        return offset;
+    }
+
+    u8 = () => this.view.getUint8(this.move(1));
+    u16 = () => this.view.getUint16(this.move(2));
+    u32 = () => this.view.getUint32(this.move(4));
+    i8 = () => this.view.getInt8(this.move(1));
+    i16 = () => this.view.getInt16(this.move(2));
+    i32 = () => this.view.getInt32(this.move(4));
+    f32 = () => this.view.getFloat32(this.move(4));
+    f64 = () => this.view.getFloat64(this.move(8));
+
+    bytes(size: number): Uint8Array {
+        const offset = this.move(size);
+        return this.data.subarray(offset, offset + size);
+    }
+
+    str(size: number): string {
+        return textDecoder.decode(this.bytes(size));
+    }
+
+    array(size: number): any[] {
+        const arr = new Array(size);
+        for (let i = 0; i < size; i++) {
+            arr[i] = this.value();
+        }
+        return arr;
+    }
+
+    map(size: number): object {
+        const obj = {};
+        for (let i = 0; i < size; i++) {
+            const key = this.value();
+            obj[key] = this.value();
+        }
+        return obj;
+    }
+
+    ext(size: number): null {
+        // Extensions types are not used by dazzler.
+        this.move(size + 1);
+        return null;
+    }
+
+    value(): any {
+        const type = this.u8();
+        if (type < 0x80) {
+            return type;
+        }
+        if (type < 0x90) {
+            return this.map(type & 0x0f);
+        }
+        if (type < 0xa0) {
+            return this.array(type & 0x0f);
+        }
+        if (type < 0xc0) {
+            return this.str(type & 0x1f);
+        }
+        if (type >= 0xe0) {
+            return type - 0x100;
+        }
+        switch (type) {
+            case 0xc0:
+                return null;
+            case 0xc2:
+                return false;
+            case 0xc3:
+                return true;
+            case 0xc4:
+                return this.bytes(this.u8());
+            case 0xc5:
+                return this.bytes(this.u16());
+            case 0xc6:
+                return this.bytes(this.u32());
+            case 0xc7:
+                return this.ext(this.u8());
+            case 0xc8:
+                return this.ext(this.u16());
+            case 0xc9:
+                return this.ext(this.u32());
+            case 0xca:
+                return this.f32();
+            case 0xcb:
+                return this.f64();
+            case 0xcc:
+                return this.u8();
+            case 0xcd:
+                return this.u16();
+            case 0xce:
+                return this.u32();
+            case 0xcf:
+                return this.u32() * UINT32 + this.u32();
+            case 0xd0:
+                return this.i8();
+            case 0xd1:
+                return this.i16();
+            case 0xd2:
+                return this.i32();
+            case 0xd3:
+                return this.i32() * UINT32 + this.u32();
+            case 0xd4:
+                return this.ext(1);
+            case 0xd5:
+                return this.ext(2);
+            case 0xd6:
+                return this.ext(4);
+            case 0xd7:
+                return this.ext(8);
+            case 0xd8:
+                return this.ext(16);
+            case 0xd9:
+                return this.str(this.u8());
+            case 0xda:
+                return this.str(this.u16());
+            case 0xdb:
+                return this.str(this.u32());
+            case 0xdc:
+                return this.array(this.u16());
+            case 0xdd:
+                return this.array(this.u32());
+            case 0xde:
+                return this.map(this.u16());
+            case 0xdf:
+                return this.map(this.u32());
+            default:
+                throw new Error(`Invalid msgpack type: ${type}`);
+        }
+    }
+}
+
+export function msgpackEncode(value: any): Uint8Array {
+    const writer = new Writer();
+    encodeValue(writer, value);
+    return writer.result();
+}
+
+export function msgpackDecode(data: ArrayBuffer | Uint8Array): any {
+    const reader = new Reader(
+        data instanceof Uint8Array ? data : new Uint8Array(data)
+    );
+    return reader.value();
+}
+
+export const jsonCodec: WebsocketCodec = {
+    protocol: 'dazzler.json',
+    encode: (message) => JSON.stringify(message),
+};
+
+export const msgpackCodec: WebsocketCodec = {
+    protocol: 'dazzler.msgpack',
+    encode: msgpackEncode,
+};
+
+// In order of preference.
+export const codecs = [msgpackCodec, jsonCodec];
+
+export const getCodec = (protocol: string): WebsocketCodec =>
+    codecs.find((codec) => codec.protocol === protocol) || jsonCodec;
+
+/**
+ * Decode a websocket message, the server may always send text messages.
+ */
+export const decodeMessage = (data: string | ArrayBuffer): any =>
+    typeof data === 'string' ? JSON.parse(data) : msgpackDecode(data);
@@ -1,5 +1,6 @@
 import React from 'react';
-import {apiRequest} from '../requests';
+import {flushSync} from 'react-dom';
+import {apiRequest, cachedRequest} from '../requests';
 import {hydrateComponent, hydrateProps, prepareProp} from '../hydrator';
 import {loadRequirement, loadRequirements} from '../requirements';
 import {disableCss} from 'commons';
@@ -33,8 +34,21 @@ import {
     UpdaterState,
     PageApiResponse,
     Aspect,
+    WebsocketCodec,
+    BindingTimer,
 } from '../types';
 import {getAspectKey, isSameAspect} from '../aspects';
+import {codecs, decodeMessage, getCodec, jsonCodec} from '../codecs';
+
+// Random 128 bits hex id to trace a binding on the server.
+function traceId(): string {
+    const bytes = window.crypto.getRandomValues(new Uint8Array(16));
+    let id = '';
+    for (let i = 0; i < bytes.length; i++) {
+        id += ('0' + bytes[i].toString(16)).slice(-2);
+    }
+    return id;
+}
 
 export default class Updater extends React.Component<
     UpdaterProps,
@@ -43,6 +57,10 @@ export default class Updater extends React.Component<
     private pageApi: ApiFunc;
     private readonly boundComponents: BoundComponents;
     private ws: WebSocket;
+    private codec: WebsocketCodec;
+    private readonly bindingTimers: {[key: string]: BindingTimer};
+    // Delay before reconnecting after the server restarted.
+    private reconnectDelay: number;
 
     constructor(props) {
         super(props);
@@ -65,11 +83,18 @@ export default class Updater extends React.Component<
         // All components get connected.
         this.boundComponents = {};
         this.ws = null;
+        this.codec = jsonCodec;
+        this.bindingTimers = {};
+        this.reconnectDelay = null;
 
         this.updateAspects = this.updateAspects.bind(this);
         this.connect = this.connect.bind(this);
         this.disconnect = this.disconnect.bind(this);
         this.onMessage = this.onMessage.bind(this);
+        this.send = this.send.bind(this);
+        this.scheduleBinding = this.scheduleBinding.bind(this);
+        this.setAspects = this.setAspects.bind(this);
+        this.loadPage = this.loadPage.bind(this);
     }
 
     updateAspects(identity: string, aspects, initial = false) {
@@ -196,7 +221,7 @@ export default class Updater extends React.Component<
             } else {
                 const removableBindings = [];
                 bindings.forEach((binding) => {
-                    this.sendBinding(binding, binding.value, binding.call);
+                    this.scheduleBinding(binding);
                     if (binding.trigger.once) {
                         removableBindings.push(binding);
                     }
@@ -245,8 +270,76 @@ export default class Updater extends React.Component<
         delete this.boundComponents[identity];
     }
 
+    setAspects(identity: string, payload, regex = false) {
+        const setAspects = (component) =>
+            component
+                .setAspects(
+                    hydrateProps(
+                        payload,
+                        this.updateAspects,
+                        this.connect,
+                        this.disconnect
+                    )
+                )
+                .then(() => this.updateAspects(identity, payload));
+        if (regex) {
+            const pattern = new RegExp(identity);
+            keys(this.boundComponents)
+                .filter((k: string) => pattern.test(k))
+                .map((k) => this.boundComponents[k])
+                .forEach(setAspects);
+        } else if (this.boundComponents[identity]) {
+            // Broadcasts can target components not on this page.
+            setAspects(this.boundComponents[identity]);
+        }
+    }
+
+    applyUpdates(updates) {
+        // Apply the updates of a binding in as few renders as possible.
+        // The payloads to the same component are merged in order, an aspect
+        // set again starts a new render so the components get every value
+        // of delta aspects like `append`.
+        let batch = [];
+        const flush = () => {
+            const applied = batch;
+            batch = [];
+            flushSync(() =>
+                applied.forEach((update) =>
+                    this.setAspects(
+                        update.identity,
+                        update.payload,
+                        update.regex
+                    )
+                )
+            );
+        };
+        updates.forEach((update) => {
+            if (update.regex) {
+                // Cannot know which components it sets, render it alone.
+                flush();
+                batch.push(update);
+                flush();
+                return;
+            }
+            const pending = batch.find(
+                (u) => !u.regex && u.identity === update.identity
+            );
+            if (!pending) {
+                batch.push(update);
+            } else if (
+                keys(update.payload).some((k) => k in pending.payload)
+            ) {
+                flush();
+                batch.push(update);
+            } else {
+                pending.payload = {...pending.payload, ...update.payload};
+            }
+        });
+        flush();
+    }
+
     onMessage(response) {
-        const data = JSON.parse(response.data);
+        const data = decodeMessage(response.data);
         const {identity, kind, payload, storage, request_id} = data;
         let store;
         if (storage === 'session') {
@@ -256,65 +349,43 @@ export default class Updater extends React.Component<
         }
         switch (kind) {
             case 'set-aspect':
-                const setAspects = (component) =>
-                    component
-                        .setAspects(
-                            hydrateProps(
-                                payload,
-                                this.updateAspects,
-                                this.connect,
-                                this.disconnect
-                            )
-                        )
-                        .then(() => this.updateAspects(identity, payload));
-                if (data.regex) {
-                    const pattern = new RegExp(data.identity);
-                    keys(this.boundComponents)
-                        .filter((k: string) => pattern.test(k))
-                        .map((k) => this.boundComponents[k])
-                        .forEach(setAspects);
-                } else {
-                    setAspects(this.boundComponents[identity]);
-                }
+                this.setAspects(identity, payload, data.regex);
+                break;
+            case 'set-aspects':
+                this.applyUpdates(data.updates);
                 break;
             case 'get-aspect':
                 const {aspect} = data;
                 const wanted = this.boundComponents[identity];
                 if (!wanted) {
-                    this.ws.send(
-                        JSON.stringify({
-                            kind,
-                            identity,
-                            aspect,
-                            request_id,
-                            error: `Aspect not found ${identity}.${aspect}`,
-                        })
-                    );
-                    return;
-                }
-                const value = wanted.getAspect(aspect);
-                this.ws.send(
-                    JSON.stringify({
+                    this.send({
                         kind,
                         identity,
                         aspect,
-                        value: prepareProp(value),
                         request_id,
-                    })
-                );
+                        error: `Aspect not found ${identity}.${aspect}`,
+                    });
+                    return;
+                }
+                const value = wanted.getAspect(aspect);
+                this.send({
+                    kind,
+                    identity,
+                    aspect,
+                    value: prepareProp(value),
+                    request_id,
+                });
                 break;
             case 'set-storage':
                 store.setItem(identity, JSON.stringify(payload));
                 break;
             case 'get-storage':
-                this.ws.send(
-                    JSON.stringify({
-                        kind,
-                        identity,
-                        request_id,
-                        value: JSON.parse(store.getItem(identity)),
-                    })
-                );
+                this.send({
+                    kind,
+                    identity,
+                    request_id,
+                    value: JSON.parse(store.getItem(identity)),
+                });
                 break;
             case 'reload':
                 const {filenames, hot, refresh, deleted} = data;
@@ -332,12 +403,62 @@ export default class Updater extends React.Component<
                 filenames.forEach(loadRequirement);
                 deleted.forEach((r) => disableCss(r.url));
                 break;
+            case 'reconnect':
+                // The server is restarting and will close the connection,
+                // spread the reconnections over the new workers.
+                this.reconnectDelay = Math.random() * data.jitter * 1000;
+                break;
             case 'ping':
                 // Just do nothing.
                 break;
         }
     }
 
+    send(message) {
+        this.ws.send(this.codec.encode(message));
+    }
+
+    scheduleBinding(binding: Binding) {
+        // Apply the trigger debounce & throttle, the latest value is sent.
+        const {identity, aspect, debounce, throttle} = binding.trigger;
+        if (!debounce && !throttle) {
+            this.sendBinding(binding, binding.value, binding.call);
+            return;
+        }
+        const key = getAspectKey(identity, aspect);
+        const timer = this.bindingTimers[key] || {last: 0};
+        this.bindingTimers[key] = timer;
+        const send = () => {
+            timer.timeout = null;
+            timer.last = Date.now();
+            this.sendBinding(binding, binding.value, binding.call);
+        };
+
+        const now = Date.now();
+        if (timer.timeout) {
+            clearTimeout(timer.timeout);
+        } else {
+            timer.since = now;
+        }
+
+        let delay;
+        if (debounce) {
+            delay = debounce * 1000;
+            if (throttle) {
+                // Don't wait longer than the throttle.
+                delay = Math.min(delay, timer.since + throttle * 1000 - now);
+            }
+        } else {
+            delay = timer.last + throttle * 1000 - now;
+        }
+
+        if (delay <= 0) {
+            send();
+        } else {
+            timer.timeout = setTimeout(send, delay);
+        }
+    }
+
     sendBinding(binding, value, call = false) {
         // Collect all values and send a binding payload
         const trigger = {
@@ -388,11 +509,12 @@ export default class Updater extends React.Component<
             kind: 'binding',
             page: this.state.page,
             key: binding.key,
+            trace_id: traceId(),
         };
         if (call) {
             this.callBinding(payload);
         } else {
-            this.ws.send(JSON.stringify(payload));
+            this.send(payload);
         }
     }
 
@@ -429,9 +551,15 @@ export default class Updater extends React.Component<
                 (this.props.baseUrl && this.props.baseUrl) ||
                 window.location.host
             }/${this.state.page}/ws`;
-            this.ws = new WebSocket(url);
+            // Offer all the codecs, the server pick the one to use.
+            this.ws = new WebSocket(
+                url,
+                codecs.map((codec) => codec.protocol)
+            );
+            this.ws.binaryType = 'arraybuffer';
             this.ws.addEventListener('message', this.onMessage);
             this.ws.onopen = () => {
+                this.codec = getCodec(this.ws.protocol);
                 if (this.state.reloading) {
                     hardClose = true;
                     this.ws.close();
@@ -450,7 +578,12 @@ export default class Updater extends React.Component<
                     tries++;
                     connexion();
                 };
-                if (!hardClose && tries < this.props.retries) {
+                if (this.reconnectDelay !== null) {
+                    const delay = this.reconnectDelay;
+                    this.reconnectDelay = null;
+                    tries = 0;
+                    setTimeout(reconnect, delay);
+                } else if (!hardClose && tries < this.props.retries) {
                     setTimeout(reconnect, 1000);
                 }
             };
@@ -458,79 +591,92 @@ export default class Updater extends React.Component<
         connexion();
     }
 
-    componentDidMount() {
-        this.pageApi<PageApiResponse>('', {method: 'POST'}).then((response) => {
-            const toRegex = (x) => new RegExp(x);
-            this.setState(
-                {
-                    page: response.page,
-                    layout: response.layout,
-                    bindings: pickBy((b) => !b.regex, response.bindings),
-                    // Regex bindings triggers
-                    rebindings: map((x) => {
-                        const binding = response.bindings[x];
-                        binding.trigger = evolve(
+    loadPage(response: PageApiResponse) {
+        const toRegex = (x) => new RegExp(x);
+        this.setState(
+            {
+                page: response.page,
+                layout: response.layout,
+                bindings: pickBy((b) => !b.regex, response.bindings),
+                // Regex bindings triggers
+                rebindings: map((x) => {
+                    const binding = response.bindings[x];
+                    binding.trigger = evolve(
+                        {
+                            identity: toRegex,
+                            aspect: toRegex,
+                        },
+                        binding.trigger
+                    );
+                    return binding;
+                }, keys(pickBy((b) => b.regex, response.bindings))),
+                packages: response.packages,
+                requirements: response.requirements,
+                // @ts-ignore
+                ties: map((tie) => {
+                    const newTie = pipe(
+                        assoc(
+                            'targets',
+                            tie.targets.filter(propSatisfies(not, 'regex'))
+                        ),
+                        assoc(
+                            'regexTargets',
+                            // @ts-ignore
+                            tie.targets.filter(propEq('regex', true)).map(
+                                evolve({
+                                    // Only match identity for targets.
+                                    identity: toRegex,
+                                })
+                            )
+                        )
+                    )(tie);
+
+                    if (tie.trigger.regex) {
+                        return evolve(
                             {
-                                identity: toRegex,
-                                aspect: toRegex,
+                                trigger: {
+                                    identity: toRegex,
+                                    aspect: toRegex,
+                                },
                             },
-                            binding.trigger
+                            newTie
                         );
-                        return binding;
-                    }, keys(pickBy((b) => b.regex, response.bindings))),
-                    packages: response.packages,
-                    requirements: response.requirements,
-                    // @ts-ignore
-                    ties: map((tie) => {
-                        const newTie = pipe(
-                            assoc(
-                                'targets',
-                                tie.targets.filter(propSatisfies(not, 'regex'))
-                            ),
-                            assoc(
-                                'regexTargets',
-                                // @ts-ignore
-                                tie.targets.filter(propEq('regex', true)).map(
-                                    evolve({
-                                        // Only match identity for targets.
-                                        identity: toRegex,
-                                    })
-                                )
-                            )
-                        )(tie);
-
-                        if (tie.trigger.regex) {
-                            return evolve(
-                                {
-                                    trigger: {
-                                        identity: toRegex,
-                                        aspect: toRegex,
-                                    },
-                                },
-                                newTie
-                            );
-                        }
-                        return newTie;
-                    }, response.ties),
-                },
-                () =>
-                    loadRequirements(
-                        response.requirements,
-                        response.packages
-                    ).then(() => {
-                        if (
-                            response.reload ||
-                            rValues(response.bindings).filter(
-                                (binding: Binding) => !binding.call
-                            ).length
-                        ) {
-                            this._connectWS();
-                        } else {
-                            this.setState({ready: true});
-                        }
-                    })
-            );
-        });
+                    }
+                    return newTie;
+                }, response.ties),
+            },
+            () =>
+                loadRequirements(
+                    response.requirements,
+                    response.packages
+                ).then(() => {
+                    if (
+                        response.reload ||
+                        rValues(response.bindings).filter(
+                            (binding: Binding) => !binding.call
+                        ).length
+                    ) {
+                        this._connectWS();
+                    } else {
+                        this.setState({ready: true});
+                    }
+                })
+        );
+    }
+
+    componentDidMount() {
+        const inlined = document.getElementById('dazzler-page');
+        if (inlined) {
+            // The payload is only good for the first render,
+            // hot reload needs to get the new payload from the api.
+            inlined.remove();
+            this.loadPage(JSON.parse(inlined.textContent));
+        } else {
+            // Revalidate the payload of the last visit with its ETag.
+            cachedRequest<PageApiResponse>(window.location.href, {
+                method: 'POST',
+            }).then(this.loadPage);
+        }
     }
 
     render() {
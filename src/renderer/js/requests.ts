@@ -15,11 +15,19 @@ export const JSONHEADERS = {
     'Content-Type': 'application/json',
 };
 
-export function xhrRequest<T>(
+function parseResponse(xhr: XMLHttpRequest) {
+    if (jsonPattern.test(xhr.getResponseHeader('Content-Type'))) {
+        return JSON.parse(xhr.responseText);
+    }
+    return xhr.response;
+}
+
+function xhrSend(
     url: string,
-    options: XhrRequestOptions = defaultXhrOptions
+    options: XhrRequestOptions = defaultXhrOptions,
+    statuses: number[] = [200]
 ) {
-    return new Promise<T>((resolve, reject) => {
+    return new Promise<XMLHttpRequest>((resolve, reject) => {
         const {method, headers, payload, json} = {
             ...defaultXhrOptions,
             ...options,
@@ -30,14 +38,8 @@ export function xhrRequest<T>(
         Object.keys(head).forEach((k) => xhr.setRequestHeader(k, head[k]));
         xhr.onreadystatechange = () => {
             if (xhr.readyState === XMLHttpRequest.DONE) {
-                if (xhr.status === 200) {
-                    let responseValue = xhr.response;
-                    if (
-                        jsonPattern.test(xhr.getResponseHeader('Content-Type'))
-                    ) {
-                        responseValue = JSON.parse(xhr.responseText);
-                    }
-                    resolve(responseValue);
+                if (statuses.indexOf(xhr.status) !== -1) {
+                    resolve(xhr);
                 } else {
                     reject({
                         error: 'RequestError',
@@ -54,6 +56,51 @@ export function xhrRequest<T>(
     });
 }
 
+export function xhrRequest<T>(
+    url: string,
+    options: XhrRequestOptions = defaultXhrOptions
+) {
+    return xhrSend(url, options).then((xhr) => parseResponse(xhr) as T);
+}
+
+/**
+ * Send the request with the etag of the last response kept in the session
+ * storage, the kept response is used when the server answers 304.
+ */
+export function cachedRequest<T>(
+    url: string,
+    options: XhrRequestOptions = defaultXhrOptions
+) {
+    const storageKey = `dazzler-cache:${options.method || 'GET'}:${url}`;
+    let cached = null;
+    try {
+        cached = JSON.parse(window.sessionStorage.getItem(storageKey));
+    } catch (e) {
+        cached = null;
+    }
+    const headers = cached
+        ? {...options.headers, 'If-None-Match': cached.etag}
+        : options.headers;
+    return xhrSend(url, {...options, headers}, [200, 304]).then((xhr) => {
+        if (xhr.status === 304) {
+            return JSON.parse(cached.body) as T;
+        }
+        const etag = xhr.getResponseHeader('ETag');
+        if (etag) {
+            try {
+                window.sessionStorage.setItem(
+                    storageKey,
+                    JSON.stringify({etag, body: xhr.responseText})
+                );
+            } catch (e) {
+                // Too big for the storage quota, always download it.
+                window.sessionStorage.removeItem(storageKey);
+            }
+        }
+        return parseResponse(xhr) as T;
+    });
+}
+
 export function apiRequest(baseUrl: string) {
     return function <T>(uri: string, options: XhrRequestOptions = undefined) {
         const url = baseUrl + uri;
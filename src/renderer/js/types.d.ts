@@ -78,6 +78,8 @@ type BindType = Aspect & {
 type Trigger = BindType & {
     once: boolean;
     skip_initial: boolean;
+    debounce?: number;
+    throttle?: number;
 };
 
 type Binding = {
@@ -100,6 +102,12 @@ type EvolvedBinding = Binding & {
     value?: any;
 };
 
+type BindingTimer = {
+    timeout?: ReturnType<typeof setTimeout>;
+    since?: number;
+    last?: number;
+};
+
 type BoundComponent = {
     identity: string;
     matchAspects: MatchAspectFunc;
@@ -177,3 +185,8 @@ type PageApiResponse = {
 type CallOutput = {
     output: {[k: string]: AnyDict};
 };
+
+type WebsocketCodec = {
+    protocol: string;
+    encode: (message: any) => string | Uint8Array;
+};
@@ -6,6 +6,8 @@ from dazzler.system import Page, BindingContext
 
 app = Dazzler(__name__)
 app.config.session.backend = 'Redis'
+# Share the broadcasts between the processes of the app.
+app.config.broadcast.backend = 'Redis'
 
 page = Page(__name__, core.Container([
     core.Container([], identity='app', class_name='app')
@@ -32,13 +34,6 @@ chat_layout = core.Container([
 ])
 
 
-def redis():
-    # Redis is currently integrated with the session middleware
-    # which is always the first middleware in the list for now.
-    # Will be changed to a proper middleware & added to aiohttp app context
-    return app.middlewares[0]._backend.redis
-
-
 def create_message(msg):
     return extra.PopUp(
             [
@@ -52,16 +47,6 @@ def create_message(msg):
         )
 
 
-async def handle_messages(ctx: BindingContext):
-    channel, = await redis().subscribe(
-        f'chatter-{ctx.session.session_id}'
-    )
-
-    while await channel.wait_message():
-        message = await channel.get_json()
-        await ctx.set_aspect('messages', prepend=create_message(message))
-
-
 @page.bind('class_name@app')
 async def page_load(ctx: BindingContext):
     # Define if already supplied a username
@@ -74,10 +59,6 @@ async def page_load(ctx: BindingContext):
                 chat_layout,
             ])
         )
-        # Run the task in the background.
-        # Task created with the context will be automatically cancelled
-        # when the websocket connection dies.
-        ctx.create_task(handle_messages(ctx))
     else:
         await ctx.set_aspect(
             'app', children=core.Container([
@@ -102,25 +83,21 @@ async def join_room(ctx: BindingContext):
     name = ctx.states['name-input']['value']
     await ctx.session.set('name', name)
     await ctx.set_aspect('app', children=chat_layout)
-    ctx.create_task(
-        handle_messages(ctx)
-    )
 
 
 @page.bind('clicks@send-btn', 'value@msg-area')
 async def send_messages(ctx: BindingContext):
-    channels = await redis().pubsub_channels(
-        pattern='chatter-*'
-    )
     name = await ctx.session.get('name')
-    for channel in channels:
-        await redis().publish_json(
-            channel, {
-                'body': ctx.states['msg-area']['value'],
-                'name': name,
-                'ts': datetime.utcnow().isoformat(),
-            }
-        )
+    # Encoded once and sent to every client of the page.
+    await app.broadcast(
+        'messages',
+        page=page,
+        prepend=create_message({
+            'body': ctx.states['msg-area']['value'],
+            'name': name,
+            'ts': datetime.utcnow().isoformat(),
+        })
+    )
 
     await ctx.set_aspect('msg-area', value='')
 
@@ -9,6 +9,8 @@ import pytest
 from selenium import webdriver
 
 from dazzler import Dazzler
+from dazzler.system import Page
+from dazzler.components import core
 from tests.tools import AsyncDriver, kill_processes
 
 
@@ -126,3 +128,21 @@ def electron_driver():
     if 'driver' in namespace:
         # Need close not quit to cleanup the processes in electron.
         namespace['driver'].close()
+
+
+@pytest.fixture()
+def binding_app():
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    page = Page(
+        'bindings',
+        core.Container([
+            core.Button('click', identity='clicker'),
+            core.Container(identity='output-1'),
+            core.Container(identity='output-2'),
+            core.Container(identity='output-3'),
+        ]),
+        url='/'
+    )
+    app.add_page(page)
+    return app, page
@@ -0,0 +1,38 @@
+import pytest
+
+from dazzler._bench import (
+    BENCHMARKS, measure, run_benchmarks, compare_results
+)
+
+
+@pytest.mark.async_test
+async def test_measure_coroutine():
+    calls = []
+
+    async def func():
+        calls.append(1)
+
+    result = await measure(func, number=10, repeat=3)
+    # Warm up call + measures.
+    assert len(calls) == 31
+    assert result['number'] == 10
+    assert result['min'] <= result['median'] <= result['max']
+
+
+@pytest.mark.async_test
+async def test_run_benchmarks():
+    results = await run_benchmarks(number=1, repeat=1)
+    assert set(results['benchmarks']) == set(BENCHMARKS)
+    assert all(x['min'] > 0 for x in results['benchmarks'].values())
+
+
+def test_compare_results():
+    previous = {'benchmarks': {
+        'a': {'min': 10.0}, 'b': {'min': 10.0}, 'c': {'min': 10.0},
+    }}
+    current = {'benchmarks': {
+        'a': {'min': 10.5}, 'b': {'min': 12.0}, 'd': {'min': 1.0},
+    }}
+    assert compare_results(previous, current, threshold=0.1) == [
+        ('a', 1.05, False), ('b', 1.2, True),
+    ]
@@ -0,0 +1,370 @@
+"""Binding protocol tests with a websocket client instead of a browser."""
+import asyncio
+import json
+
+import pytest
+from aiohttp import client
+
+from dazzler import Dazzler
+from dazzler.contrib.postgresql import PostgresConfig
+from dazzler.contrib.postgresql_broadcast import PostgresBroadcastBus
+from dazzler.errors import BroadcastError
+from dazzler.system import Page, BindingContext, Trigger
+from dazzler.system._outbox import Outbox
+from dazzler.system.broadcast import MemoryBroadcastBus
+from dazzler.components import core
+from tests.tools import binding_message
+
+
+class MessagesRecorder:
+    def __init__(self):
+        self.messages = []
+
+    async def send_str(self, data):
+        self.messages.append(json.loads(data))
+
+
+@pytest.mark.async_test
+async def test_set_aspect_batched(binding_app):
+    app, page = binding_app
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        for i in range(1, 4):
+            await ctx.set_aspect(f'output-{i}', children=f'output {i}')
+        await asyncio.sleep(0.01)
+        await ctx.set_aspect('output-1', children='later')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+
+                message = await ws.receive_json(timeout=2)
+                assert message['kind'] == 'set-aspects'
+                assert [
+                    (x['identity'], x['payload']['children'])
+                    for x in message['updates']
+                ] == [
+                    ('output-1', 'output 1'),
+                    ('output-2', 'output 2'),
+                    ('output-3', 'output 3'),
+                ]
+
+                message = await ws.receive_json(timeout=2)
+                assert message['kind'] == 'set-aspect'
+                assert message['payload'] == {'children': 'later'}
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_outbox_latest_wins():
+    ws = MessagesRecorder()
+    outbox = Outbox(ws, max_size=2)
+
+    for i in range(100):
+        await outbox.set_aspects([
+            {'identity': 'progress', 'regex': False, 'payload': {'value': i}}
+        ])
+    await outbox.set_aspects([
+        {'identity': 'progress', 'regex': False, 'payload': {'max': 100}}
+    ])
+    await outbox.put({'kind': 'ping'})
+
+    assert len(outbox) == 2
+    assert outbox.merged == 100
+
+    # Full, the producer waits until the messages are sent.
+    blocked = asyncio.ensure_future(outbox.put({'kind': 'ping'}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    runner = asyncio.ensure_future(outbox.run())
+    try:
+        await asyncio.wait_for(blocked, 1)
+        await asyncio.sleep(0.01)
+    finally:
+        runner.cancel()
+
+    assert ws.messages == [
+        {
+            'kind': 'set-aspect',
+            'identity': 'progress',
+            'regex': False,
+            'payload': {'value': 99, 'max': 100},
+        },
+        {'kind': 'ping'},
+        {'kind': 'ping'},
+    ]
+    assert outbox.sent == 3
+    assert outbox.high_water_mark == 2
+
+
+@pytest.mark.async_test
+async def test_outbox_bytes_sent():
+    ws = MessagesRecorder()
+    outbox = Outbox(ws)
+    message = json.dumps(
+        {'kind': 'ping', 'value': 'é' * 10}, ensure_ascii=False
+    )
+    await outbox.put_encoded(message)
+
+    runner = asyncio.ensure_future(outbox.run())
+    try:
+        await asyncio.wait_for(outbox.join(), 1)
+    finally:
+        runner.cancel()
+
+    # Encoded length of the text frames, not the characters.
+    assert outbox.bytes_sent == len(message.encode())
+    assert outbox.bytes_sent > len(message)
+
+
+@pytest.mark.async_test
+async def test_outbox_delta_aspects():
+    ws = MessagesRecorder()
+    outbox = Outbox(ws)
+
+    def update(identity, **payload):
+        return {'identity': identity, 'regex': False, 'payload': payload}
+
+    # Both appends in the same window are sent.
+    await outbox.set_aspects([
+        update('list', append='a'), update('list', append='b')
+    ])
+    # Not merged ahead of a message queued after the pending update.
+    await outbox.set_aspects([update('output', children=1)])
+    await outbox.put({'kind': 'get-aspect'})
+    await outbox.set_aspects([
+        update('output', children=2), update('other', children=1)
+    ])
+    await outbox.set_aspects([update('output', value=3)])
+
+    runner = asyncio.ensure_future(outbox.run())
+    try:
+        await asyncio.wait_for(outbox.join(), 1)
+    finally:
+        runner.cancel()
+
+    assert ws.messages == [
+        {
+            'kind': 'set-aspects',
+            'updates': [
+                update('list', append='a'),
+                update('list', append='b'),
+                update('output', children=1),
+            ],
+        },
+        {'kind': 'get-aspect'},
+        {
+            'kind': 'set-aspects',
+            'updates': [
+                update('output', children=2, value=3),
+                update('other', children=1),
+            ],
+        },
+    ]
+    assert outbox.merged == 1
+
+
+@pytest.mark.async_test
+async def test_msgpack_codec(binding_app):
+    msgpack = pytest.importorskip('msgpack')
+    app, page = binding_app
+    app.config.bindings.codecs = ['msgpack', 'json']
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await ctx.set_aspect(
+            'output-1', children=f'clicked {ctx.trigger.value}'
+        )
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws',
+                    protocols=('dazzler.msgpack', 'dazzler.json')) as ws:
+                assert ws.protocol == 'dazzler.msgpack'
+                await ws.send_bytes(
+                    msgpack.packb(binding_message('clicker', 'clicks', 1))
+                )
+                message = msgpack.unpackb(await ws.receive_bytes(timeout=2))
+                assert message['payload'] == {'children': 'clicked 1'}
+
+                # The renderer can still send json text frames.
+                await ws.send_json(binding_message('clicker', 'clicks', 3))
+                message = msgpack.unpackb(await ws.receive_bytes(timeout=2))
+                assert message['payload'] == {'children': 'clicked 3'}
+
+            # Clients without a codec get json.
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 2))
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': 'clicked 2'}
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_trigger_throttle(binding_app):
+    app, page = binding_app
+    calls = []
+
+    @page.bind(Trigger('clicker', 'clicks', throttle=0.3))
+    async def on_click(ctx: BindingContext):
+        calls.append(ctx.trigger.value)
+        await ctx.set_aspect('output-1', children=f'{ctx.trigger.value}')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                for i in range(1, 11):
+                    await ws.send_json(binding_message('clicker', 'clicks', i))
+
+                # The first is called right away, the latest at the end
+                # of the interval, the others are dropped.
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': '1'}
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': '10'}
+                assert calls == [1, 10]
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+@pytest.mark.parametrize('concurrency, expected', [
+    ('parallel', ['start 1', 'start 2', 'end 1', 'end 2']),
+    ('latest', ['start 1', 'start 2', 'end 2']),
+    ('queue', ['start 1', 'end 1', 'start 2', 'end 2']),
+    ('drop', ['start 1', 'end 1']),
+])
+async def test_binding_concurrency(binding_app, concurrency, expected):
+    app, page = binding_app
+    calls = []
+
+    @page.bind('clicks@clicker', concurrency=concurrency)
+    async def on_click(ctx: BindingContext):
+        calls.append(f'start {ctx.trigger.value}')
+        await asyncio.sleep(0.2)
+        calls.append(f'end {ctx.trigger.value}')
+        await ctx.set_aspect('output-1', children=f'{ctx.trigger.value}')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await asyncio.sleep(0.05)
+                await ws.send_json(binding_message('clicker', 'clicks', 2))
+                await asyncio.sleep(0.6)
+                assert calls == expected
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_broadcast(binding_app):
+    app, page = binding_app
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            url = 'ws://localhost:8150/bindings/ws'
+            async with session.ws_connect(url) as ws1, \
+                    session.ws_connect(url) as ws2:
+                await asyncio.sleep(0.05)
+
+                assert await app.broadcast(
+                    'output-1', page=page, children='news'
+                ) == 2
+                assert await app.broadcast('output-1', page='other') == 0
+
+                for ws in (ws1, ws2):
+                    message = await ws.receive_json(timeout=2)
+                    assert message == {
+                        'kind': 'set-aspect',
+                        'identity': 'output-1',
+                        'regex': False,
+                        'payload': {'children': 'news'},
+                    }
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_broadcast_bus(binding_app):
+    # Another process of the application, sharing the in-memory bus.
+    app, _ = binding_app
+    app.config.broadcast.backend = 'Memory'
+    other = Dazzler(__name__)
+    other.config.pages_directory = 'none'
+    other.config.port = 8151
+    other.config.broadcast.backend = 'Memory'
+    other.add_page(Page('bindings', core.Container(), url='/'))
+
+    await app.main(blocking=False)
+    await other.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws1, \
+                    session.ws_connect(
+                        'ws://localhost:8151/bindings/ws') as ws2:
+                await asyncio.sleep(0.05)
+
+                assert await other.broadcast(
+                    'output-1', page='bindings', children='news'
+                ) == 1
+
+                for ws in (ws1, ws2):
+                    message = await ws.receive_json(timeout=2)
+                    assert message['payload'] == {'children': 'news'}
+
+                # Sent once to the connection of the publisher.
+                with pytest.raises(asyncio.TimeoutError):
+                    await ws2.receive_json(timeout=0.2)
+    finally:
+        await other.stop()
+        await app.stop()
+
+
+class FailingBus(MemoryBroadcastBus):
+    async def send(self, data: str):
+        raise BroadcastError('Bus down')
+
+
+@pytest.mark.async_test
+async def test_broadcast_bus_error(binding_app):
+    app, _ = binding_app
+    app.broadcast_bus = FailingBus(app)
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await asyncio.sleep(0.05)
+                with pytest.raises(BroadcastError):
+                    await app.broadcast('output-1', children='local')
+                # The local connections are updated first.
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': 'local'}
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_postgres_broadcast_size():
+    app = Dazzler(__name__)
+    bus = PostgresBroadcastBus(app, PostgresConfig(), pool=object())
+    with pytest.raises(BroadcastError, match='too large'):
+        await bus.publish({'kind': 'set-aspect', 'value': 'x' * 8000}, None)
@@ -0,0 +1,65 @@
+import json
+import math
+
+import pytest
+
+from dazzler._config import DazzlerConfig
+from dazzler.errors import JsonLibraryError
+from dazzler.system._json import JsonSerializer, estimate_size, orjson
+
+
+libraries = ['json'] + (['orjson'] if orjson is not None else [])
+
+
+def test_estimate_size():
+    data = {'rows': [{'id': i, 'name': 'x' * 100} for i in range(1000)]}
+    actual = len(json.dumps(data, separators=(',', ':')))
+    estimated = estimate_size(data)
+
+    assert actual / 2 < estimated < actual * 2
+    assert estimate_size([]) == 2
+
+
+@pytest.mark.async_test
+@pytest.mark.parametrize('library', libraries)
+async def test_large_payload_chunks(library):
+    serializer = JsonSerializer(library, large_payload=100000)
+    data = {
+        'table': [
+            {'id': i, 'values': [i, i * 1.5, 'value']}
+            for i in range(20000)
+        ],
+        'large': [{'text': 'y' * 70000} for _ in range(3)],
+        1: None,
+        'empty': [],
+    }
+
+    encoded = await serializer.dumpb_async(data)
+
+    assert encoded == serializer.dumpb(data)
+    assert serializer.loads(encoded) == json.loads(json.dumps(data))
+
+
+def test_orjson_differences():
+    pytest.importorskip('orjson')
+    standard = JsonSerializer('json')
+    fast = JsonSerializer('orjson')
+    data = {'nan': math.nan, 'infinity': math.inf}
+
+    assert math.isnan(standard.loads(standard.dumps(data))['nan'])
+    assert fast.loads(fast.dumps(data)) == {'nan': None, 'infinity': None}
+
+    big = 2 ** 64
+    assert standard.loads(standard.dumps(big)) == big
+    with pytest.raises(TypeError):
+        fast.dumps(big)
+
+
+def test_default_library():
+    config = DazzlerConfig()
+    assert config.json.library == 'json'
+
+
+def test_invalid_library():
+    with pytest.raises(JsonLibraryError):
+        JsonSerializer('simplejson')
@@ -0,0 +1,36 @@
+"""Load test command tests."""
+import pytest
+
+from dazzler._loadtest import LoadTest
+from dazzler.system import BindingContext
+
+
+@pytest.mark.async_test
+async def test_loadtest(binding_app):
+    app, page = binding_app
+    app.config.metrics.enable = True
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        previous = await ctx.get_aspect('output-1', 'children')
+        await ctx.set_aspect(
+            'output-1', children=f'{previous}-{ctx.trigger.value}'
+        )
+
+    await app.main(blocking=False)
+    try:
+        stats = await LoadTest(
+            'http://localhost:8150', 'bindings', clients=3, duration=0.5,
+        ).run()
+    finally:
+        await app.stop()
+
+    report = stats.report()
+    assert report['bindings'] > 0
+    assert report['timeouts'] == 0
+    assert report['errors'] == 0
+    # Binding & get-aspect answer sent, get-aspect & set-aspect received.
+    assert report['messages_sent'] == report['bindings'] * 2
+    assert report['messages_received'] == report['bindings'] * 2
+    assert set(report['latency']) == {'p50', 'p90', 'p99'}
+    assert report['memory_before'] > 0
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from aiohttp import client
+
+from dazzler.system import BindingContext
+from dazzler.system.metrics import Metrics
+from tests.tools import binding_message
+
+
+def test_render_metrics():
+    metrics = Metrics()
+    counter = metrics.counter('app_orders_total', 'Orders.', ['product'])
+    counter.inc('book')
+    counter.inc('book', amount=2)
+    counter.inc('pen "blue"')
+    metrics.gauge(
+        'app_stock', 'Stock.', ['product'],
+        collect=lambda: {('book',): 12}
+    )
+    histogram = metrics.histogram(
+        'app_duration_seconds', 'Duration.', buckets=[0.1, 1]
+    )
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    lines = metrics.render().splitlines()
+
+    assert '# TYPE app_orders_total counter' in lines
+    assert 'app_orders_total{product="book"} 3' in lines
+    assert 'app_orders_total{product="pen \\"blue\\""} 1' in lines
+    assert 'app_stock{product="book"} 12' in lines
+    assert '# TYPE app_duration_seconds histogram' in lines
+    start = lines.index('app_duration_seconds_bucket{le="0.1"} 1')
+    assert lines[start:start + 5] == [
+        'app_duration_seconds_bucket{le="0.1"} 1',
+        'app_duration_seconds_bucket{le="1"} 2',
+        'app_duration_seconds_bucket{le="+Inf"} 3',
+        'app_duration_seconds_sum 5.55',
+        'app_duration_seconds_count 3',
+    ]
+
+
+@pytest.mark.async_test
+async def test_metrics_endpoint(binding_app):
+    app, page = binding_app
+    app.config.metrics.enable = True
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        if ctx.trigger.value == 2:
+            raise Exception('error')
+        await ctx.set_aspect('output-1', children='clicked')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await ws.receive_json(timeout=2)
+                await ws.send_json(binding_message('clicker', 'clicks', 2))
+                await asyncio.sleep(0.05)
+
+                async with session.get('http://localhost:8150/'):
+                    pass
+                async with session.get(
+                        'http://localhost:8150/dazzler/metrics') as response:
+                    lines = (await response.text()).splitlines()
+
+        assert 'dazzler_websockets{page="bindings"} 1' in lines
+        assert 'dazzler_websocket_messages_total{page="bindings"} 1' in lines
+        assert 'dazzler_binding_duration_seconds_count' \
+               '{trigger="clicks@clicker"} 2' in lines
+        assert 'dazzler_binding_errors_total' \
+               '{trigger="clicks@clicker"} 1' in lines
+        assert 'dazzler_request_duration_seconds_count' \
+               '{route="bindings"} 1' in lines
+    finally:
+        await app.stop()
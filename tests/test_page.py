@@ -4,11 +4,11 @@ import json
 
 import pytest
 
-from aiohttp import web
+from aiohttp import web, client
 
 from dazzler import Dazzler
 from dazzler.errors import PageConflictError
-from dazzler.system import Page
+from dazzler.system import Page, Middleware
 from dazzler.components import core
 
 
@@ -177,3 +177,197 @@ async def test_page_requirements_dir(start_page, browser, _):
 
     expected = [1, 2, 10, "same1", "with-requirements", "nested", "same2"]
     assert output == expected
+
+
+@pytest.mark.async_test
+async def test_page_index_cache():
+    # The index is rendered once and revalidated with the etag.
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    page = Page('cached', core.Container('cached'), url='/')
+    app.add_page(page)
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            rep = await session.get('http://localhost:8150/')
+            assert rep.status == 200
+            etag = rep.headers['ETag']
+            assert '<title>cached</title>' in await rep.text()
+
+            rep = await session.get(
+                'http://localhost:8150/', headers={'If-None-Match': etag}
+            )
+            assert rep.status == 304
+
+            page.title = 'changed'
+            app.server.clear_index_cache()
+
+            rep = await session.get(
+                'http://localhost:8150/', headers={'If-None-Match': etag}
+            )
+            assert rep.status == 200
+            assert rep.headers['ETag'] != etag
+            assert '<title>changed</title>' in await rep.text()
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_page_payload_cache():
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    calls = []
+
+    async def layout(request: web.Request):
+        calls.append(request.query.get('key'))
+        return core.Container(request.query.get('key'), identity='layout')
+
+    app.add_page(
+        Page('static', core.Container('static'), url='/'),
+        Page(
+            'keyed', layout,
+            cache_key=lambda request: request.query.get('key')
+        ),
+        Page('uncached', layout),
+    )
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            rep = await session.post('http://localhost:8150/')
+            etag = rep.headers['ETag']
+            assert (await rep.json())['layout'][0]['aspects'] == {
+                'children': 'static'
+            }
+
+            rep = await session.post(
+                'http://localhost:8150/', headers={'If-None-Match': etag}
+            )
+            assert rep.status == 304
+
+            for key in ('a', 'b', 'a', 'b'):
+                rep = await session.post(
+                    f'http://localhost:8150/keyed?key={key}'
+                )
+                payload = await rep.json()
+                assert payload['layout'][0]['aspects']['children'] == key
+            assert calls == ['a', 'b']
+
+            for _ in range(2):
+                await session.post('http://localhost:8150/uncached?key=c')
+            assert calls == ['a', 'b', 'c', 'c']
+    finally:
+        await app.stop()
+
+
+class StatusMiddleware(Middleware):
+    def __init__(self):
+        self.statuses = []
+
+    async def __call__(self, request: web.Request):
+        if request.method != 'POST':
+            return None
+
+        async def record(response: web.Response):
+            self.statuses.append(response.status)
+
+        return record
+
+
+@pytest.mark.async_test
+async def test_page_payload_revalidate(start_visit, browser):
+    # The renderer sends the etag of the last payload and reuse it on 304.
+    app = Dazzler(__name__)
+    middleware = StatusMiddleware()
+    app.middlewares.append(middleware)
+    app.add_page(
+        Page('revalidate', core.Container('cached', identity='out'), url='/')
+    )
+
+    await start_visit(app)
+    await browser.wait_for_text_to_equal('#out', 'cached')
+    assert middleware.statuses == [200]
+
+    await browser.get('http://localhost:8150/')
+    await browser.wait_for_text_to_equal('#out', 'cached')
+    assert middleware.statuses == [200, 304]
+
+    app.server.clear_page_cache()
+    app.pages['revalidate'].layout = core.Container('changed', identity='out')
+    await browser.get('http://localhost:8150/')
+    await browser.wait_for_text_to_equal('#out', 'changed')
+    assert middleware.statuses == [200, 304, 200]
+
+
+@pytest.mark.async_test
+async def test_page_inline_payload():
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    app.config.renderer.inline_page = True
+    app.add_page(
+        Page('inline', core.Container('</script>', identity='x'), url='/')
+    )
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            rep = await session.get('http://localhost:8150/')
+            index = await rep.text()
+            start = '<script type="application/json" id="dazzler-page">'
+            assert start in index
+            payload = index.split(start)[1].split('</script>')[0]
+            prepared = json.loads(payload)
+            assert prepared['page'] == 'inline'
+            assert prepared['layout'][0]['aspects']['children'] == \
+                '</script>'
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_server_timing():
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    app.config.server_timing = True
+
+    async def layout(_):
+        return core.Container(identity='output')
+
+    page = Page('timed', layout, url='/')
+
+    @page.call('clicks@clicker')
+    async def on_click(ctx):
+        await ctx.set_aspect('output', children='clicked')
+
+    app.add_page(page)
+
+    def metrics(response):
+        return {
+            x.split(';')[0] for x in
+            response.headers['Server-Timing'].split(', ')
+        }
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            rep = await session.post('http://localhost:8150/')
+            assert {'session', 'layout', 'serialize', 'total'} \
+                <= metrics(rep)
+
+            rep = await session.patch('http://localhost:8150/', json={
+                'kind': 'binding',
+                'key': 'clicks@clicker',
+                'trigger': {
+                    'identity': 'clicker', 'aspect': 'clicks', 'value': 1
+                },
+                'states': [],
+            })
+            assert (await rep.json())['output']['output'] == {
+                'children': 'clicked'
+            }
+            assert {'session', 'binding', 'serialize', 'total'} \
+                <= metrics(rep)
+            assert 'layout' not in metrics(rep)
+    finally:
+        await app.stop()
@@ -0,0 +1,94 @@
+"""Binding profiler tests."""
+import asyncio
+import os
+import pstats
+import signal
+import time
+
+import pytest
+from aiohttp import client
+
+from dazzler.system import BindingContext
+from tests.tools import binding_message
+
+
+@pytest.mark.async_test
+@pytest.mark.parametrize('mode', ['cprofile', 'sampling'])
+async def test_binding_profiler(binding_app, tmp_path, mode):
+    app, page = binding_app
+    app.config.profiler.sample_rate = 1
+    app.config.profiler.mode = mode
+    app.config.profiler.interval = 0.001
+    app.config.profiler.output_directory = str(tmp_path)
+
+    def slow_function():
+        time.sleep(0.05)
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await asyncio.sleep(0.01)
+        slow_function()
+        await ctx.set_aspect('output-1', children='done')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await ws.receive_json(timeout=2)
+
+        paths = app.profiler.dump()
+        assert len(paths) == 1
+        if mode == 'cprofile':
+            stats = pstats.Stats(paths[0])
+            assert any(
+                name == 'slow_function' for _, _, name in stats.stats
+            )
+        else:
+            with open(paths[0]) as f:
+                stacks = f.read()
+            assert stacks.startswith('on_click')
+            assert 'slow_function' in stacks
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+@pytest.mark.skipif(
+    not hasattr(signal, 'SIGUSR2'), reason='No SIGUSR2 on this platform'
+)
+async def test_profiler_signal_toggle(binding_app, tmp_path):
+    app, page = binding_app
+    app.config.profiler.signal_sample_rate = 1
+    app.config.profiler.output_directory = str(tmp_path)
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await ctx.set_aspect('output-1', children=ctx.trigger.value)
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await ws.receive_json(timeout=2)
+                assert not app.profiler.profiles
+
+                # Started without profiling, enabled while running.
+                os.kill(os.getpid(), signal.SIGUSR2)
+                await asyncio.sleep(0.05)
+                assert app.profiler.sample_rate == 1
+
+                await ws.send_json(binding_message('clicker', 'clicks', 2))
+                await ws.receive_json(timeout=2)
+                assert list(app.profiler.profiles) == ['clicks@clicker']
+
+                # Disabled and dumped by the next signal.
+                os.kill(os.getpid(), signal.SIGUSR2)
+                await asyncio.sleep(0.05)
+                assert app.profiler.sample_rate == 0
+                assert os.listdir(tmp_path) == ['clicks@clicker.pstats']
+    finally:
+        await app.stop()
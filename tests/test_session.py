@@ -1,18 +1,76 @@
 # pylint: disable=redefined-outer-name
 import asyncio
+import base64
+import logging
+import time
 import uuid
 import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
 
 from dazzler import Dazzler
 from dazzler.components import core
-from dazzler.contrib.redis import RedisSessionBackend
+from dazzler.contrib.redis import RedisSessionBackend, get_redis_pool
 from dazzler.contrib.postgresql import PostgresSessionBackend
-from dazzler.system import Page, Trigger, BindingContext
+from dazzler.system import Page, Trigger, BindingContext, UNDEFINED
 from dazzler.system.session import (
-    SessionMiddleware, FileSessionBackEnd
+    SessionMiddleware, FileSessionBackEnd, SessionBackEnd, Session
 )
 
 
+class MemoryBackend(SessionBackEnd):
+    """Memory backend recording the calls, slow for some sessions."""
+    def __init__(self, app, slow=(), load_all=True):
+        super().__init__(app)
+        self.data = {}
+        self.slow = slow
+        self.calls = []
+        self._load_all = load_all
+
+    async def _wait(self, method, session_id, key):
+        self.calls.append(method)
+        if key == 'error':
+            raise ValueError('Backend error')
+        if session_id in self.slow:
+            await asyncio.sleep(0.5)
+
+    async def set(self, session_id, key, value):
+        await self._wait('set', session_id, key)
+        self.data.setdefault(session_id, {})[key] = value
+
+    async def get(self, session_id, key):
+        await self._wait('get', session_id, key)
+        return self.data.get(session_id, {}).get(key, UNDEFINED)
+
+    async def delete(self, session_id, key):
+        await self._wait('delete', session_id, key)
+        self.data.get(session_id, {}).pop(key, None)
+
+    async def load_all(self, session_id):
+        if not self._load_all:
+            return None
+        await self._wait('load_all', session_id, None)
+        return dict(self.data.get(session_id, {}))
+
+    async def save_many(self, session_id, values, deleted):
+        await self._wait(
+            'save_many', session_id, 'error' if 'error' in values else None
+        )
+        data = self.data.setdefault(session_id, {})
+        data.update(values)
+        for key in deleted:
+            data.pop(key, None)
+
+
+class RecordsHandler(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
 @pytest.fixture
 def session_app():
     app = Dazzler(__name__)
@@ -125,3 +183,224 @@ async def test_refresh_session(start_visit, session_app, browser):
 
     second = (await browser.wait_for_element_by_id('session-output')).text
     assert first != second
+
+
+@pytest.mark.async_test
+async def test_session_workers():
+    app = Dazzler(__name__)
+    app.config.secret_key = uuid.uuid4().hex
+    app.config.session.workers = 4
+    slow_id = uuid.uuid4().hex
+    backend = MemoryBackend(app, slow={slow_id})
+    middleware = SessionMiddleware(app, backend=backend)
+
+    fast_id = uuid.uuid4().hex
+    while middleware.get_query_queue(fast_id) is \
+            middleware.get_query_queue(slow_id):
+        fast_id = uuid.uuid4().hex
+
+    slow = Session(slow_id, middleware.get_query_queue(slow_id))
+    fast = Session(fast_id, middleware.get_query_queue(fast_id))
+    try:
+        slow_get = asyncio.ensure_future(slow.get('value'))
+        await asyncio.sleep(0)
+
+        # The slow session doesn't block the other sessions.
+        for i in range(50):
+            await fast.set('value', i)
+        await fast.delete('value')
+        await fast.set('value', 'last')
+        assert await asyncio.wait_for(fast.get('value'), 0.2) == 'last'
+        assert not slow_get.done()
+        assert await slow_get is UNDEFINED
+
+        # The errors are raised and the worker continues.
+        with pytest.raises(ValueError):
+            await fast.get('error')
+        assert await fast.get('value') == 'last'
+    finally:
+        await middleware._on_stop(None)
+
+
+@pytest.fixture
+def cache_middleware():
+    app = Dazzler(__name__)
+    app.config.secret_key = uuid.uuid4().hex
+    app.config.session.cache = True
+    app.config.session.flush_delay = 0.05
+    backend = MemoryBackend(app)
+    return app, SessionMiddleware(app, backend=backend), backend
+
+
+@pytest.mark.async_test
+async def test_session_cache(cache_middleware):
+    _, middleware, backend = cache_middleware
+    try:
+        request = make_mocked_request('GET', '/')
+        callback = await middleware(request)
+        session = request['session']
+        backend.data[session.session_id] = {'a': 1, 'b': 2}
+
+        assert await session.get('a') == 1
+        assert await session.get('b') == 2
+        assert await session.get('c') is UNDEFINED
+        await session.set('a', 3)
+        await session.set('c', 4)
+        await session.delete('b')
+        assert await session.get('a') == 3
+        assert await session.get('b') is UNDEFINED
+        # The reads are served from memory and the writes are buffered.
+        assert backend.calls == ['load_all']
+
+        await callback(web.Response())
+        assert backend.calls == ['load_all', 'save_many']
+        assert backend.data[session.session_id] == {'a': 3, 'c': 4}
+    finally:
+        await middleware._on_stop(None)
+
+
+@pytest.mark.async_test
+async def test_session_cache_delayed_flush(cache_middleware):
+    _, middleware, backend = cache_middleware
+    try:
+        request = make_mocked_request('GET', '/')
+        await middleware(request)
+        session = request['session']
+        for i in range(10):
+            await session.set('value', i)
+        await session.set('other', 'other')
+        await asyncio.sleep(0.1)
+        assert backend.calls == ['save_many']
+        assert backend.data[session.session_id] == {
+            'value': 9, 'other': 'other'
+        }
+    finally:
+        await middleware._on_stop(None)
+
+
+@pytest.mark.async_test
+async def test_session_cache_tabs(cache_middleware):
+    _, middleware, backend = cache_middleware
+    try:
+        session_id = uuid.uuid4().hex
+        created = base64.b64encode(str(int(time.time())).encode()).decode()
+        cookie = middleware.signer.sign(f'{session_id}#{created}').decode()
+
+        async def open_session():
+            request = make_mocked_request(
+                'GET', '/', headers={'Cookie': f'sessionid={cookie}'}
+            )
+            await middleware(request)
+            return request['session']
+
+        first = await open_session()
+        second = await open_session()
+        assert first.session_id == second.session_id == session_id
+
+        assert await first.get('first') is UNDEFINED
+        assert await second.get('second') is UNDEFINED
+        await first.set('first', 1)
+        await second.set('second', 2)
+        await first.flush()
+        await second.flush()
+        # Only the written keys are saved.
+        assert backend.data[session_id] == {'first': 1, 'second': 2}
+        # The other sessions of the process see the saved values.
+        assert await second.get('first') == 1
+        assert backend.calls.count('load_all') == 2
+    finally:
+        await middleware._on_stop(None)
+
+
+@pytest.mark.async_test
+async def test_session_cache_flush_error(cache_middleware):
+    app, middleware, backend = cache_middleware
+    app.config.session.flush_delay = 0.01
+    records = RecordsHandler()
+    app.logger.addHandler(records)
+    stopped = False
+    try:
+        request = make_mocked_request('GET', '/')
+        await middleware(request)
+        session = request['session']
+        await session.set('error', 1)
+        await asyncio.sleep(0.05)
+        # The error is logged and the write is kept for the next flush.
+        assert any('Session flush failed' in x for x in records.messages)
+        assert backend.calls == ['save_many']
+
+        await session.delete('error')
+        await session.set('value', 1)
+        await middleware._on_stop(None)
+        stopped = True
+        # The stop saves the buffered writes.
+        assert backend.calls == ['save_many', 'save_many']
+        assert backend.data[session.session_id] == {'value': 1}
+    finally:
+        app.logger.removeHandler(records)
+        if not stopped:
+            await middleware._on_stop(None)
+
+
+@pytest.mark.async_test
+async def test_session_cache_without_load_all():
+    app = Dazzler(__name__)
+    app.config.secret_key = uuid.uuid4().hex
+    backend = MemoryBackend(app, load_all=False)
+    middleware = SessionMiddleware(app, backend=backend)
+    try:
+        session_id = uuid.uuid4().hex
+        backend.data[session_id] = {'a': 1}
+        session = Session(
+            session_id, middleware.get_query_queue(session_id), cache=True
+        )
+        assert await session.get('a') == 1
+        assert await session.get('a') == 1
+        assert await session.get('b') is UNDEFINED
+        await session.pop('a')
+        await session.flush()
+        assert backend.calls == ['get', 'get', 'save_many']
+        assert backend.data[session_id] == {}
+    finally:
+        await middleware._on_stop(None)
+
+
+@pytest.mark.async_test
+async def test_redis_session_backend():
+    app = Dazzler(__name__)
+    redis = await get_redis_pool()
+    backend = RedisSessionBackend(app, redis)
+    session_id = uuid.uuid4().hex
+    try:
+        assert await backend.get(session_id, 'a') is UNDEFINED
+        await backend.set(session_id, 'a', {'value': 1})
+        await backend.set_many(session_id, {'b': [1, 2], 'c': None})
+        assert await backend.get(session_id, 'a') == {'value': 1}
+        assert await backend.get_many(session_id, ['a', 'b', 'c', 'd']) == {
+            'a': {'value': 1}, 'b': [1, 2], 'c': None, 'd': UNDEFINED,
+        }
+        await backend.save_many(session_id, {'d': 'd'}, ['a'])
+        assert await backend.load_all(session_id) == {
+            'b': [1, 2], 'c': None, 'd': 'd',
+        }
+        assert await redis.ttl(session_id) > 100
+
+        # The reads refresh the expiration once per window.
+        await redis.expire(session_id, 100)
+        await backend.get(session_id, 'b')
+        assert await redis.ttl(session_id) <= 100
+        app.config.session.expire_refresh = 0
+        await backend.get(session_id, 'b')
+        assert await redis.ttl(session_id) > 100
+
+        # The writes always set it.
+        await backend.delete(session_id, 'b')
+        await backend.delete(session_id, 'c')
+        await backend.delete(session_id, 'd')
+        app.config.session.expire_refresh = 60
+        await backend.set(session_id, 'e', 'e')
+        assert await redis.ttl(session_id) > 100
+    finally:
+        await redis.delete(session_id)
+        redis.close()
+        await redis.wait_closed()
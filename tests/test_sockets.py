@@ -0,0 +1,44 @@
+"""Unix socket and inherited sockets listeners tests."""
+import asyncio
+import socket
+
+import aiohttp
+import pytest
+from aiohttp import client
+
+from dazzler._sockets import INHERITED_FDS_ENV
+
+
+@pytest.mark.async_test
+async def test_unix_socket(binding_app, tmp_path):
+    app, _ = binding_app
+    app.config.unix_socket = str(tmp_path / 'dazzler.sock')
+
+    await app.main(blocking=False)
+    try:
+        connector = aiohttp.UnixConnector(path=app.config.unix_socket)
+        async with client.ClientSession(connector=connector) as session:
+            async with session.ws_connect('http://localhost/bindings/ws'):
+                await asyncio.sleep(0.05)
+                assert await app.broadcast('output-1', children='unix') == 1
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_inherited_sockets(binding_app, monkeypatch):
+    app, _ = binding_app
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen()
+    port = sock.getsockname()[1]
+    # The server adopts the file descriptor.
+    monkeypatch.setenv(INHERITED_FDS_ENV, str(sock.detach()))
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.get(f'http://127.0.0.1:{port}/') as response:
+                assert response.status == 200
+    finally:
+        await app.stop()
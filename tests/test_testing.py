@@ -0,0 +1,166 @@
+"""Bindings tests with the in-process BindingTestClient."""
+# pylint: disable=redefined-outer-name
+import asyncio
+
+import pytest
+
+from dazzler import Dazzler
+from dazzler.errors import BindingError
+from dazzler.system import (
+    Page, BindingContext, CallContext, Trigger, State
+)
+from dazzler.testing import BindingTestClient
+from dazzler.components import core
+
+
+@pytest.fixture
+def testing_app():
+    app = Dazzler(__name__)
+    app.config.pages_directory = 'none'
+    page = Page(
+        'testing',
+        core.Container([
+            core.Button('click', identity='clicker'),
+            core.Input(value=10, identity='input'),
+            core.Container(identity='output'),
+            core.Container(identity='output-2'),
+        ]),
+        url='/'
+    )
+    return app, page
+
+
+@pytest.mark.async_test
+async def test_trigger_states_and_get_aspect(testing_app):
+    app, page = testing_app
+
+    @page.bind('clicks@clicker', State('input', 'value'))
+    async def on_click(ctx: BindingContext):
+        value = await ctx.get_aspect('input', 'value')
+        await ctx.set_aspect(
+            'output',
+            children=f'{ctx.trigger.value} {ctx.states["input"]["value"]} '
+                     f'{value}'
+        )
+
+    async with BindingTestClient(app, page) as client:
+        updates = await client.trigger('clicker', 'clicks', 1)
+        assert updates == [
+            {
+                'identity': 'output',
+                'payload': {'children': '1 10 10'},
+                'regex': False,
+            }
+        ]
+        client.set_aspects('input', value=20)
+        await client.trigger('clicker', 'clicks', 2)
+        assert client.get_aspect('output', 'children') == '2 20 20'
+        assert client.get_aspect('clicker', 'clicks') == 2
+        assert client.duration > 0
+
+
+@pytest.mark.async_test
+async def test_initial_and_chained_triggers(testing_app):
+    app, page = testing_app
+
+    @page.bind('value@input')
+    async def on_value(ctx: BindingContext):
+        await ctx.set_aspect('output', children=ctx.trigger.value)
+
+    @page.bind('children@output')
+    async def on_output(ctx: BindingContext):
+        await asyncio.sleep(0.01)
+        await ctx.set_aspect('output-2', children=f'{ctx.trigger.value}!')
+
+    async with BindingTestClient(app, page) as client:
+        # The layout value triggered the binding on start.
+        assert client.get_aspect('output-2', 'children') == '10!'
+        updates = await client.trigger('input', 'value', 'chained')
+        assert [x['identity'] for x in updates] == ['output', 'output-2']
+        assert client.get_aspect('output-2', 'children') == 'chained!'
+
+
+@pytest.mark.async_test
+async def test_skip_initial_and_once(testing_app):
+    app, page = testing_app
+
+    @page.bind(Trigger('input', 'value', skip_initial=True, once=True))
+    async def on_value(ctx: BindingContext):
+        await ctx.set_aspect('output', children=ctx.trigger.value)
+
+    async with BindingTestClient(app, page) as client:
+        assert client.get_aspect('output', 'children') is None
+        await client.trigger('input', 'value', 1)
+        assert client.get_aspect('output', 'children') == 1
+        with pytest.raises(BindingError):
+            await client.trigger('input', 'value', 2)
+
+
+@pytest.mark.async_test
+async def test_storage(testing_app):
+    app, page = testing_app
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        data = await ctx.get_local_storage('data') or {'clicks': 0}
+        data['clicks'] += 1
+        await ctx.set_local_storage('data', data)
+        session = await ctx.get_session_storage('data')
+        await ctx.set_aspect('output', children=session)
+
+    async with BindingTestClient(app, page) as client:
+        client.storage['session']['data'] = 'session'
+        await client.trigger('clicker', 'clicks', 1)
+        await client.trigger('clicker', 'clicks', 2)
+        assert client.storage['local']['data'] == {'clicks': 2}
+        assert client.get_aspect('output', 'children') == 'session'
+
+
+@pytest.mark.async_test
+async def test_call(testing_app):
+    app, page = testing_app
+
+    @page.call('clicks@clicker', 'value@input')
+    async def on_click(ctx: CallContext):
+        await ctx.set_aspect(
+            'output', children=ctx.states['input']['value'] * 2
+        )
+
+    async with BindingTestClient(app, page) as client:
+        updates = await client.trigger('clicker', 'clicks', 1)
+        assert updates == [
+            {'identity': 'output', 'payload': {'children': 20}, 'regex': False}
+        ]
+
+
+@pytest.mark.async_test
+async def test_binding_error(testing_app):
+    app, page = testing_app
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await ctx.get_aspect('missing', 'value')
+
+    async with BindingTestClient(app, page) as client:
+        with pytest.raises(BindingError, match='missing'):
+            await client.trigger('clicker', 'clicks', 1)
+        with pytest.raises(BindingError, match='No binding'):
+            await client.trigger('output', 'children', 1)
+
+
+@pytest.mark.async_test
+async def test_many_triggers(testing_app):
+    app, page = testing_app
+
+    @page.bind('clicks@clicker', 'value@input')
+    async def on_click(ctx: BindingContext):
+        await ctx.set_aspect(
+            'output',
+            children=ctx.trigger.value + ctx.states['input']['value']
+        )
+
+    async with BindingTestClient(app, page) as client:
+        for i in range(200):
+            await client.trigger('clicker', 'clicks', i)
+            assert client.get_aspect('output', 'children') == i + 10
+        assert len(client.updates) == 200
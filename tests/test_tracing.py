@@ -0,0 +1,58 @@
+"""Tracing spans tests."""
+import json
+
+import pytest
+from aiohttp import client
+
+from dazzler.system import BindingContext
+from tests.tools import binding_message
+
+
+@pytest.mark.async_test
+@pytest.mark.parametrize('cache, operation', [
+    (False, 'session get'),
+    # The cached sessions load all the data once.
+    (True, 'session load'),
+])
+async def test_tracing(binding_app, tmp_path, cache, operation):
+    app, page = binding_app
+    app.config.session.cache = cache
+    app.config.tracing.enable = True
+    app.config.tracing.output_directory = str(tmp_path)
+    trace_id = 'a' * 32
+    contexts = []
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        contexts.append(ctx)
+        await ctx.session.get('clicks')
+        await ctx.set_aspect('output-1', children='traced')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json({
+                    **binding_message('clicker', 'clicks', 1),
+                    'trace_id': trace_id,
+                })
+                await ws.receive_json(timeout=2)
+    finally:
+        await app.stop()
+
+    assert contexts[0].trace_id == trace_id
+    with open(app.tracer.path) as f:
+        events = json.loads(f.read().rstrip(',\n') + ']')
+    spans = {
+        event['name']: event['args']
+        for event in events if event['args']['trace_id'] == trace_id
+    }
+    binding = spans['binding clicks@clicker']
+    assert binding['parent_id'] is None
+    assert spans[operation]['parent_id'] == binding['span_id']
+    assert spans['set_aspect']['parent_id'] == binding['span_id']
+    assert any(
+        event['cat'] == 'http' and event['name'] == 'GET /bindings/ws'
+        for event in events
+    )
@@ -0,0 +1,40 @@
+"""Event loop watchdog tests."""
+import asyncio
+import time
+
+import pytest
+from aiohttp import client
+
+from dazzler.system import BindingContext
+from tests.tools import binding_message
+
+
+@pytest.mark.async_test
+async def test_loop_watchdog(binding_app):
+    app, page = binding_app
+    app.config.watchdog.enable = True
+    app.config.watchdog.threshold = 0.05
+    app.config.watchdog.interval = 0.01
+
+    def blocking_call():
+        time.sleep(0.2)
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        blocking_call()
+        await ctx.set_aspect('output-1', children='done')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await ws.receive_json(timeout=2)
+                await asyncio.sleep(0.05)
+
+        scope = ('binding clicks@clicker',)
+        assert app.watchdog.stalls.values[scope] == 1
+        assert app.watchdog.blocked.values[scope] >= 0.15
+    finally:
+        await app.stop()
@@ -0,0 +1,157 @@
+"""Prefork workers tests."""
+import asyncio
+import os
+import sys
+
+import aiohttp
+import pytest
+from aiohttp import client
+
+from dazzler import Dazzler
+from dazzler import _workers
+from dazzler._sockets import INHERITED_FDS_ENV, create_tcp_sockets
+from dazzler._workers import Workers, worker_arguments
+from dazzler.components import core
+from dazzler.system import BindingContext, Page
+from tests.tools import binding_message
+
+
+class ExitedProcess:
+    def __init__(self, pid):
+        self.pid = pid
+        self.returncode = 1
+
+    async def wait(self):
+        return self.returncode
+
+
+def test_worker_arguments():
+    app = Dazzler(__name__)
+    app.cli.raw_args = [
+        '--application', 'other', '--port', '8000', '--host', '8000',
+        '--worker', '--application=other', '--debug',
+    ]
+    assert worker_arguments(app) == [
+        sys.executable, '-m', 'dazzler',
+        '--port', '8000', '--host', '8000', '--debug',
+        '--application', __name__, '--worker',
+    ]
+
+
+@pytest.mark.async_test
+async def test_worker_start_failures(monkeypatch):
+    # A worker exiting before it is ready is restarted with a backoff.
+    monkeypatch.setattr(_workers, 'RESTART_DELAY', 0.01)
+    app = Dazzler(__name__)
+    workers = Workers(app)
+    workers.generation = 1
+    spawned = []
+
+    async def spawn():
+        spawned.append(asyncio.get_event_loop().time())
+        return ExitedProcess(len(spawned)), False
+
+    workers._spawn = spawn
+    ready = asyncio.get_event_loop().create_future()
+    await asyncio.wait_for(workers._supervise(1, ready), 2)
+
+    assert ready.result() is False
+    assert len(spawned) == _workers.MAX_START_FAILURES
+    delays = [b - a for a, b in zip(spawned, spawned[1:])]
+    assert delays == sorted(delays)
+    assert delays[-1] >= 0.01 * 2 ** (_workers.MAX_START_FAILURES - 1)
+
+
+@pytest.mark.async_test
+async def test_shutdown_drain(binding_app):
+    app, page = binding_app
+    app.config.drain_timeout = 2
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await asyncio.sleep(0.3)
+        await ctx.set_aspect('output-1', children='done')
+
+    await app.main(blocking=False)
+    try:
+        async with client.ClientSession() as session:
+            async with session.ws_connect(
+                    'ws://localhost:8150/bindings/ws') as ws:
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await asyncio.sleep(0.05)
+                shutdown = asyncio.ensure_future(app.shutdown())
+
+                # The running binding finish before the reconnect.
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': 'done'}
+                message = await ws.receive_json(timeout=2)
+                assert message['kind'] == 'reconnect'
+                message = await ws.receive(timeout=2)
+                assert message.type == aiohttp.WSMsgType.CLOSE
+                await shutdown
+    finally:
+        await app.stop()
+
+
+@pytest.mark.async_test
+async def test_drain_new_connections(binding_app, monkeypatch):
+    # Two generations of workers accepting on the socket of the master.
+    old, page = binding_app
+    old.config.drain_timeout = 2
+    new = Dazzler(__name__)
+    new.config.pages_directory = 'none'
+    new.add_page(Page('bindings', core.Container(), url='/'))
+
+    @page.bind('clicks@clicker')
+    async def on_click(ctx: BindingContext):
+        await asyncio.sleep(0.3)
+        await ctx.set_aspect('output-1', children='done')
+
+    listener, = create_tcp_sockets('127.0.0.1', 0)
+    port = listener.getsockname()[1]
+    url = f'ws://127.0.0.1:{port}/bindings/ws'
+
+    monkeypatch.setenv(INHERITED_FDS_ENV, str(os.dup(listener.fileno())))
+    await old.main(blocking=False)
+    try:
+        async with client.ClientSession() as session, \
+                client.ClientSession() as kept:
+            # A keep-alive connection accepted by the old generation.
+            async with kept.get(f'http://127.0.0.1:{port}/') as response:
+                assert response.status == 200
+                await response.read()
+
+            async with session.ws_connect(url) as ws:
+                monkeypatch.setenv(
+                    INHERITED_FDS_ENV, str(os.dup(listener.fileno()))
+                )
+                await new.main(blocking=False)
+
+                await ws.send_json(binding_message('clicker', 'clicks', 1))
+                await asyncio.sleep(0.05)
+                shutdown = asyncio.ensure_future(old.shutdown())
+                await asyncio.sleep(0.05)
+
+                # The new connections are accepted by the new generation.
+                async with client.ClientSession() as fresh:
+                    async with fresh.ws_connect(url):
+                        await asyncio.sleep(0.05)
+                        assert len(new.server.connections['bindings']) == 1
+                        assert len(old.server.connections['bindings']) == 1
+
+                # Already accepted by the draining server, told to reconnect.
+                async with kept.ws_connect(url) as late:
+                    message = await late.receive_json(timeout=2)
+                    assert message['kind'] == 'reconnect'
+                    message = await late.receive(timeout=2)
+                    assert message.type == aiohttp.WSMsgType.CLOSE
+
+                message = await ws.receive_json(timeout=2)
+                assert message['payload'] == {'children': 'done'}
+                message = await ws.receive_json(timeout=2)
+                assert message['kind'] == 'reconnect'
+                await shutdown
+    finally:
+        await new.stop()
+        await old.stop()
+        listener.close()
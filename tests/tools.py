@@ -293,3 +293,13 @@ async def kill_processes(pid):
         )
     for proc in processes + [pid]:
         os.kill(proc, signal.SIGTERM)
+
+
+def binding_message(identity, aspect, value=None, states=None):
+    """Websocket message of the renderer triggering a binding."""
+    return {
+        'kind': 'binding',
+        'key': f'{aspect}@{identity}',
+        'trigger': {'identity': identity, 'aspect': aspect, 'value': value},
+        'states': states or [],
+    }